@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from app.api.v1.endpoints import health, upload, extract
+from app.api.v1.endpoints import health, upload, extract, admin
 
 api_router = APIRouter()
 
@@ -19,4 +19,10 @@ api_router.include_router(
     extract.router,
     prefix="/documents",
     tags=["extract"]
+)
+
+api_router.include_router(
+    admin.router,
+    prefix="/admin",
+    tags=["admin"]
 )
\ No newline at end of file
@@ -0,0 +1,33 @@
+from fastapi import APIRouter, Depends, Path
+
+from app.core.auth import require_admin
+from app.services.textract.page_cache import get_page_cache
+from app.services.textract.response_cache import get_response_cache
+from app.services.textract.source_reader import get_source_reader
+
+router = APIRouter()
+
+def _get_cache(cache_name: str):
+    if cache_name == "textract":
+        return get_response_cache()
+    if cache_name == "pages":
+        return get_page_cache()
+    return get_source_reader().cache
+
+@router.post("/cache/{cache_name}/purge")
+def purge_cache(
+    cache_name: str = Path(..., regex="^(textract|pages|sources)$"),
+    admin_id: str = Depends(require_admin)
+):
+    """Drop every entry of one cache; the next request for each item goes back to the source"""
+    cache = _get_cache(cache_name)
+    if cache is None:
+        return {"cache": cache_name, "enabled": False, "purged": 0}
+
+    stats = cache.stats()
+    purged = cache.purge()
+    return {
+        "cache": cache_name,
+        "purged": purged,
+        "hit_rate_before_purge": stats.get("hit_rate")
+    }
@@ -1,14 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from typing import Dict, Any, Optional
 import json
 
+from app.core.config import settings
 from app.core.database import get_db
 from app.core.auth import get_current_user
 from app.models import Document
 from app.services.extract import SchemaValidator, ExtractEngine
 from app.services.textract.document_processor import DocumentProcessor
+from app.services.textract.page_encoder import PageEncoder
+from app.services.deadline import Deadline
 
 router = APIRouter()
 
@@ -26,9 +29,11 @@ class ExtractResponse(BaseModel):
 async def extract_with_schema(
     job_id: str,
     request: ExtractRequest,
+    pages: Optional[str] = Query(None, regex=DocumentProcessor.PAGE_SELECTION_PATTERN),
     user_id: str = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
+    deadline = Deadline(settings.EXTRACT_DEADLINE_SECONDS)
     document = db.query(Document).filter(
         Document.job_id == job_id,
         Document.user_id == user_id
@@ -43,7 +48,7 @@ async def extract_with_schema(
             }
         )
 
-    if document.status != "complete":
+    if document.status not in ("complete", "partial"):
         raise HTTPException(
             status_code=400,
             detail={
@@ -76,9 +81,14 @@ async def extract_with_schema(
 
     try:
         processor = DocumentProcessor()
-        image_bytes_list, page_count = processor.process_document(document.file_path)
+        page_number = 1
+        if pages:
+            page_count = processor.get_page_count(document.file_path, document.content_hash)
+            page_number = processor.parse_page_selection(pages, page_count)[0]
 
-        if not image_bytes_list or len(image_bytes_list) == 0:
+        first_page = processor.get_page(document.file_path, page_number, file_hash=document.content_hash)
+
+        if first_page is None:
             raise HTTPException(
                 status_code=500,
                 detail={
@@ -87,8 +97,19 @@ async def extract_with_schema(
                 }
             )
 
-        image_bytes = image_bytes_list[0]
+        page_bytes, page_encoding = first_page
+        image_bytes, encoding = PageEncoder().reencode(page_bytes, "gemini", source_dpi=page_encoding["dpi"])
 
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "error": "InvalidPageSelection",
+                "message": str(e)
+            }
+        )
     except FileNotFoundError:
         raise HTTPException(
             status_code=404,
@@ -110,15 +131,19 @@ async def extract_with_schema(
 
     textract_data = None
     if document.textract_response and isinstance(document.textract_response, dict):
-        pages = document.textract_response.get('pages', [])
-        if pages and len(pages) > 0:
-            textract_data = pages[0].get('parsed_data', {})
+        processed_pages = document.textract_response.get('pages', [])
+        matching_pages = [page for page in processed_pages if page.get('page_number') == page_number]
+        if matching_pages:
+            textract_data = matching_pages[0].get('parsed_data', {})
+        elif processed_pages and not pages:
+            textract_data = processed_pages[0].get('parsed_data', {})
 
     extracted_data, confidence = engine.extract_with_schema(
         schema=request.schema,
         image_bytes=image_bytes,
-        mime_type="image/png",
-        textract_data=textract_data
+        mime_type=encoding["mime_type"],
+        textract_data=textract_data,
+        deadline=deadline
     )
 
     document.json_output = extracted_data
@@ -1,5 +1,12 @@
 from fastapi import APIRouter
 
+from app.services.textract.page_cache import get_page_cache
+from app.services.textract.source_reader import get_source_reader
+from app.services.textract.response_cache import get_response_cache
+from app.services.rate_limiter import rate_limit_stats
+from app.services.circuit_breaker import circuit_breaker_stats, OPEN
+from app.services.stubs.backends import backend_stats
+
 router = APIRouter()
 
 @router.get("/")
@@ -19,8 +26,24 @@ def health_check():
 
 @router.get("/ready")
 def readiness_check():
+    breakers = circuit_breaker_stats()
+    degraded = [upstream for upstream, breaker in breakers.items() if breaker['state'] == OPEN]
     return {
-        "status": "ready",
+        "status": "degraded" if degraded else "ready",
         "database": "connected",
-        "storage": "available"
-    }
\ No newline at end of file
+        "storage": "available",
+        "circuit_breakers": breakers
+    }
+
+@router.get("/metrics")
+def metrics():
+    page_cache = get_page_cache()
+    source_cache = get_source_reader().cache
+    response_cache = get_response_cache()
+    return {
+        "page_cache": page_cache.stats() if page_cache else {"enabled": False},
+        "source_cache": source_cache.stats() if source_cache else {"enabled": False},
+        "textract_cache": response_cache.stats() if response_cache else {"enabled": False},
+        "rate_limits": rate_limit_stats(),
+        "backends": backend_stats()
+    }
@@ -1,13 +1,23 @@
-from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, Query, BackgroundTasks
+from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, Query, Path, BackgroundTasks
 from fastapi.responses import Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
 from app.core.database import get_db
 from app.core.auth import get_current_user
-from app.schemas import UploadResponse, DocumentStatus, DocumentResponse, DocumentListItem
+from app.schemas import (
+    UploadResponse,
+    BatchUploadResponse,
+    UploadUrlRequest,
+    UploadUrlResponse,
+    DocumentStatus,
+    DocumentResponse,
+    DocumentListItem
+)
 from app.services.upload_service import UploadService
 from app.services.textract_service import TextractService
+from app.services.textract.document_processor import DocumentProcessor
+from app.services.textract.feature_tiers import FEATURES_PATTERN
 
 router = APIRouter()
 
@@ -20,7 +30,66 @@ async def upload_document(
     background_tasks: BackgroundTasks = BackgroundTasks()
 ):
     service = UploadService(db)
-    result = await service.upload_document(file, user_id)
+    result = await service.upload_document(file, user_id, mode)
+
+    if mode and result.status != "complete":
+        background_tasks.add_task(
+            TextractService(db).process_document,
+            result.job_id,
+            user_id,
+            mode
+        )
+        result.status = "processing"
+        result.processing_mode = mode
+        result.message = "File uploaded and processing started"
+
+    return result
+
+@router.post("/upload-batch", response_model=BatchUploadResponse)
+async def upload_batch(
+    files: List[UploadFile] = File(...),
+    mode: Optional[str] = Query(None, regex="^(fast|smart)$"),
+    user_id: str = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    background_tasks: BackgroundTasks = BackgroundTasks()
+):
+    service = UploadService(db)
+    result = await service.upload_batch(files, user_id, mode)
+
+    pending_items = [item for item in result.items if item.status == "uploaded"]
+    if mode and pending_items:
+        background_tasks.add_task(
+            TextractService(db).process_batch,
+            [item.job_id for item in pending_items],
+            user_id,
+            mode
+        )
+        for item in pending_items:
+            item.status = "processing"
+            item.message = "File uploaded and processing started"
+        result.processing_mode = mode
+
+    return result
+
+@router.post("/upload-url", response_model=UploadUrlResponse)
+def create_upload_url(
+    request: UploadUrlRequest,
+    user_id: str = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    service = UploadService(db)
+    return service.create_upload_url(request, user_id)
+
+@router.post("/upload-complete/{job_id}", response_model=UploadResponse)
+def complete_upload(
+    job_id: str,
+    mode: Optional[str] = Query(None, regex="^(fast|smart)$"),
+    user_id: str = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    background_tasks: BackgroundTasks = BackgroundTasks()
+):
+    service = UploadService(db)
+    result = service.complete_upload(job_id, user_id)
 
     if mode:
         background_tasks.add_task(
@@ -39,11 +108,14 @@ async def upload_document(
 async def process_document(
     job_id: str,
     mode: str = Query(default="fast", regex="^(fast|smart)$"),
+    pages: Optional[str] = Query(None, regex=DocumentProcessor.PAGE_SELECTION_PATTERN),
+    features: Optional[str] = Query(None, regex=FEATURES_PATTERN),
+    resume: bool = Query(False),
     user_id: str = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     textract_service = TextractService(db)
-    return textract_service.process_document(job_id, user_id, mode)
+    return textract_service.process_document(job_id, user_id, mode, pages, features, resume)
 
 @router.get("/status/{job_id}", response_model=DocumentStatus)
 async def get_document_status(
@@ -90,6 +162,41 @@ async def get_document_image(
 
     return {"url": document.file_path}
 
+@router.get("/image/{job_id}/pages/{page_number}")
+def get_document_page_image(
+    job_id: str,
+    page_number: int = Path(..., ge=1),
+    user_id: str = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get a rendered page image, served from the page cache when available"""
+    service = UploadService(db)
+    document = service.get_document(job_id, user_id)
+
+    try:
+        page = None
+        if page_number <= DocumentProcessor.get_page_count(document.file_path, document.content_hash):
+            page = DocumentProcessor.get_page(document.file_path, page_number, file_hash=document.content_hash)
+    except FileNotFoundError:
+        raise HTTPException(
+            status_code=404,
+            detail={"error": "FileNotFound", "message": "Document file not found"}
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail={"error": "ImageProcessingError", "message": f"Failed to render page: {str(e)}"}
+        )
+
+    if page is None:
+        raise HTTPException(
+            status_code=404,
+            detail={"error": "PageNotFound", "message": f"Document has no page {page_number}"}
+        )
+
+    image_bytes, encoding = page
+    return Response(content=image_bytes, media_type=encoding["mime_type"])
+
 @router.get("/markdown/{job_id}")
 async def get_markdown(
     job_id: str,
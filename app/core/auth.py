@@ -45,6 +45,14 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+async def require_admin(user_id: str = Depends(get_current_user)) -> str:
+    if user_id not in settings.ADMIN_USER_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+    return user_id
+
 async def get_current_user_optional(
     credentials: HTTPAuthorizationCredentials = Depends(HTTPBearer(auto_error=False))
 ) -> Optional[str]:
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Optional
 import os
 
 class Settings(BaseSettings):
@@ -11,6 +11,9 @@ class Settings(BaseSettings):
 
     UPLOAD_DIR: str = "./uploads"
     MAX_FILE_SIZE_MB: int = 10
+    UPLOAD_CHUNK_SIZE_KB: int = 1024
+    MAX_BATCH_FILES: int = 50
+    UPLOAD_BATCH_CONCURRENCY: int = 4
 
     ALLOWED_MIME_TYPES: List[str] = [
         "application/pdf",
@@ -25,17 +28,102 @@ class Settings(BaseSettings):
         ".png",
         ".jpeg",
         ".jpg",
-        ".tiff"
+        ".tiff",
+        ".tif"
     ]
 
+    PDF_RASTER_DPI: int = 300
+    PDF_RASTER_WORKERS: int = 2
+    PDF_MAX_PAGES_IN_FLIGHT: int = 4
+    NATIVE_TEXT_ENABLED: bool = True
+    NATIVE_TEXT_MIN_WORDS: int = 10
+    NATIVE_TEXT_MIN_ALNUM_RATIO: float = 0.6
+    TEXTRACT_PAGE_BYTE_BUDGET_KB: int = 4096
+    TEXTRACT_PAGE_MIN_DPI: int = 150
+    GEMINI_PAGE_BYTE_BUDGET_KB: int = 1536
+    GEMINI_PAGE_DPI: int = 150
+    GEMINI_PAGE_MIN_DPI: int = 96
+
+    PAGE_CACHE_ENABLED: bool = True
+    PAGE_CACHE_BACKEND: str = "disk"
+    PAGE_CACHE_DIR: str = "./cache/pages"
+    PAGE_CACHE_MAX_MB: int = 1024
+
+    TEXTRACT_CACHE_ENABLED: bool = True
+    TEXTRACT_CACHE_BACKEND: str = "disk"
+    TEXTRACT_CACHE_DIR: str = "./cache/textract"
+    TEXTRACT_CACHE_MAX_MB: int = 512
+    # Textract's API version never changes when the model behind it does; bump this to retire cached responses.
+    TEXTRACT_CACHE_SALT: str = "1"
+
+    SOURCE_CACHE_ENABLED: bool = True
+    SOURCE_CACHE_DIR: str = "./cache/sources"
+    SOURCE_CACHE_MAX_MB: int = 2048
+    DOWNLOAD_TIMEOUT_SECONDS: int = 30
+    DOWNLOAD_POOL_SIZE: int = 10
+
+    DEDUP_ENABLED: bool = True
+    DEDUP_ACROSS_USERS: bool = False
+
+    PAGE_FILTER_ENABLED: bool = True
+    PAGE_BLANK_INK_RATIO: float = 0.002
+    PAGE_BLANK_CONTRAST: int = 64
+    PAGE_HASH_SIZE: int = 32
+    PAGE_DUPLICATE_MAX_DISTANCE: int = 10
+    PAGE_DUPLICATE_ACROSS_HISTORY: bool = False
+    PAGE_DUPLICATE_HISTORY_DOCS: int = 20
+
     AWS_ACCESS_KEY_ID: str = ""
     AWS_SECRET_ACCESS_KEY: str = ""
     AWS_REGION: str = "us-east-1"
+    AWS_MAX_POOL_CONNECTIONS: int = 50
+    AWS_TCP_KEEPALIVE: bool = True
+
+    TEXTRACT_MAX_CONCURRENCY: int = 8
+    TEXTRACT_INITIAL_CONCURRENCY: int = 4
+    TEXTRACT_MIN_CONCURRENCY: int = 1
+    TEXTRACT_JOB_CONCURRENCY: int = 8
+    TEXTRACT_PAGE_RETRIES: int = 3
+    TEXTRACT_RETRY_BASE_SECONDS: float = 0.5
+    TEXTRACT_RETRY_MAX_SECONDS: float = 10.0
+    TEXTRACT_DEFAULT_FEATURES: str = "all"
+    TEXTRACT_TPS: float = 10.0
+    TEXTRACT_MAX_CONCURRENT_REQUESTS: int = 20
+
+    TEXTRACT_READ_TIMEOUT_SECONDS: int = 30
+    TEXTRACT_CONNECT_TIMEOUT_SECONDS: int = 5
+
+    CIRCUIT_FAILURE_RATE: float = 0.5
+    CIRCUIT_WINDOW_SIZE: int = 20
+    CIRCUIT_MIN_CALLS: int = 5
+    CIRCUIT_OPEN_SECONDS: float = 30.0
+    CIRCUIT_HALF_OPEN_CALLS: int = 1
+    JOB_DEADLINE_SECONDS: float = 600.0
+    EXTRACT_DEADLINE_SECONDS: float = 120.0
+
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_DIR: str = "/tmp/lanidrac-ratelimit"
+    RATE_LIMIT_MAX_WAIT_SECONDS: float = 30.0
+    RATE_LIMIT_LEASE_SECONDS: float = 120.0
+    TEXTRACT_ASYNC_ENABLED: bool = True
+    TEXTRACT_ASYNC_MIN_PAGES: int = 20
+    TEXTRACT_ASYNC_MIN_SIZE_MB: int = 25
+    TEXTRACT_ASYNC_POLL_SECONDS: float = 1.0
+    TEXTRACT_ASYNC_POLL_MAX_SECONDS: float = 15.0
+    TEXTRACT_ASYNC_TIMEOUT_SECONDS: int = 900
+    TEXTRACT_SNS_TOPIC_ARN: str = ""
+    TEXTRACT_SNS_ROLE_ARN: str = ""
+    TEXTRACT_SQS_QUEUE_URL: str = ""
 
     S3_BUCKET_NAME: str = ""
     S3_REGION: str = "eu-north-1"
     S3_ACCESS_KEY_ID: str = ""
     S3_SECRET_ACCESS_KEY: str = ""
+    S3_ENDPOINT_URL: str = ""
+    S3_MULTIPART_PART_SIZE_MB: int = 8
+    S3_PRESIGNED_URL_EXPIRY_SECONDS: int = 900
+    S3_TRANSFER_MULTIPART_THRESHOLD_MB: int = 8
+    S3_TRANSFER_MAX_CONCURRENCY: int = 10
 
     GEMINI_API_KEY: str = ""
     GEMINI_MODEL: str = "gemini-2.5-pro"
@@ -43,6 +131,27 @@ class Settings(BaseSettings):
     GEMINI_MAX_FILE_SIZE_MB: int = 5
     GEMINI_MAX_PAGES: int = 5
     GEMINI_TIMEOUT_SECONDS: int = 90
+    GEMINI_RPM: int = 60
+    GEMINI_MAX_CONCURRENT_REQUESTS: int = 4
+
+    # Upstream backends: live, record (live + save responses), replay (saved responses) or synthetic.
+    SERVICE_BACKEND: str = "live"
+    TEXTRACT_BACKEND: str = ""
+    GEMINI_BACKEND: str = ""
+    S3_BACKEND: str = ""
+    STUB_DIR: str = "./stubdata"
+    STUB_REPLAY_FALLBACK: bool = True
+    STUB_LATENCY_DISTRIBUTION: str = "lognormal"
+    STUB_ERROR_RATE: float = 0.0
+    STUB_THROTTLE_RATE: float = 0.0
+    STUB_SEED: Optional[int] = None
+    TEXTRACT_STUB_LATENCY_MS: float = 400
+    TEXTRACT_STUB_JITTER_MS: float = 150
+    TEXTRACT_STUB_CAPACITY: int = 0
+    GEMINI_STUB_LATENCY_MS: float = 4000
+    GEMINI_STUB_JITTER_MS: float = 1500
+    S3_STUB_LATENCY_MS: float = 20
+    S3_STUB_JITTER_MS: float = 10
 
     FAST_MODE_ENABLED: bool = True
     SMART_MODE_ENABLED: bool = True
@@ -50,6 +159,7 @@ class Settings(BaseSettings):
 
     SUPABASE_URL: str = ""
     SUPABASE_ANON_KEY: str = ""
+    ADMIN_USER_IDS: List[str] = []
 
     CORS_ORIGINS: List[str] = ["*"]
 
@@ -59,4 +169,6 @@ class Settings(BaseSettings):
 
 settings = Settings()
 
-MAX_FILE_SIZE_BYTES = settings.MAX_FILE_SIZE_MB * 1024 * 1024
\ No newline at end of file
+MAX_FILE_SIZE_BYTES = settings.MAX_FILE_SIZE_MB * 1024 * 1024
+UPLOAD_CHUNK_SIZE_BYTES = settings.UPLOAD_CHUNK_SIZE_KB * 1024
+S3_MULTIPART_PART_SIZE_BYTES = max(settings.S3_MULTIPART_PART_SIZE_MB, 5) * 1024 * 1024
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
@@ -9,6 +9,14 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+# create_all() does not alter existing tables, so columns added after the
+# initial deploy are applied here.
+SCHEMA_UPGRADES = [
+    "ALTER TABLE documents ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64)",
+    "CREATE INDEX IF NOT EXISTS ix_documents_content_hash ON documents (content_hash)",
+    "ALTER TABLE documents ADD COLUMN IF NOT EXISTS textract_features VARCHAR(64)",
+]
+
 def get_db():
     db = SessionLocal()
     try:
@@ -17,4 +25,7 @@ def get_db():
         db.close()
 
 def init_db():
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        for statement in SCHEMA_UPGRADES:
+            connection.execute(text(statement))
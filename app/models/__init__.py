@@ -1,3 +1,5 @@
 from app.models.document import Document
+from app.models.document_page import DocumentPage
+from app.models.cache_entry import CacheEntry
 
-__all__ = ["Document"]
\ No newline at end of file
+__all__ = ["Document", "DocumentPage", "CacheEntry"]
\ No newline at end of file
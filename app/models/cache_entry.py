@@ -0,0 +1,17 @@
+from sqlalchemy import Column, String, Integer, DateTime, LargeBinary
+from datetime import datetime, timezone
+
+from app.core.database import Base
+
+class CacheEntry(Base):
+    __tablename__ = "cache_entries"
+
+    key = Column(String(128), primary_key=True)
+    namespace = Column(String(50), nullable=False, index=True)
+    data = Column(LargeBinary, nullable=False)
+    size_bytes = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    accessed_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), index=True)
+
+    def __repr__(self):
+        return f"<CacheEntry(namespace={self.namespace}, key={self.key}, size_bytes={self.size_bytes})>"
\ No newline at end of file
@@ -16,8 +16,10 @@ class Document(Base):
     file_path = Column(Text, nullable=False)
     file_size_bytes = Column(Integer, nullable=False)
     mime_type = Column(String(100), nullable=False)
+    content_hash = Column(String(64), nullable=True, index=True)
     status = Column(String(50), nullable=False, default="uploaded", index=True)
     processing_mode = Column(String(10), nullable=True)
+    textract_features = Column(String(64), nullable=True)
     created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), index=True)
     updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
 
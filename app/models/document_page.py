@@ -0,0 +1,25 @@
+from sqlalchemy import Column, String, Integer, DateTime, Text, ForeignKey, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID, JSON
+import uuid
+from datetime import datetime, timezone
+
+from app.core.database import Base
+
+class DocumentPage(Base):
+    __tablename__ = "document_pages"
+    __table_args__ = (UniqueConstraint("document_id", "page_number", name="uq_document_pages_document_page"),)
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    document_id = Column(UUID(as_uuid=True), ForeignKey("documents.id", ondelete="CASCADE"), nullable=False, index=True)
+    page_number = Column(Integer, nullable=False)
+    status = Column(String(20), nullable=False)
+    engine = Column(String(20), nullable=True)
+    feature_types = Column(JSON, nullable=True)
+    raw_response = Column(JSON, nullable=True)
+    duplicate_of = Column(String(100), nullable=True)
+    attempts = Column(Integer, nullable=False, default=1)
+    error = Column(Text, nullable=True)
+    updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+
+    def __repr__(self):
+        return f"<DocumentPage(document_id={self.document_id}, page_number={self.page_number}, status={self.status})>"
\ No newline at end of file
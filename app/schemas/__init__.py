@@ -1,6 +1,10 @@
 from app.schemas.document import (
     DocumentBase,
     UploadResponse,
+    BatchUploadItem,
+    BatchUploadResponse,
+    UploadUrlRequest,
+    UploadUrlResponse,
     DocumentStatus,
     DocumentListItem,
     DocumentResponse,
@@ -11,6 +15,10 @@ from app.schemas.document import (
 __all__ = [
     "DocumentBase",
     "UploadResponse",
+    "BatchUploadItem",
+    "BatchUploadResponse",
+    "UploadUrlRequest",
+    "UploadUrlResponse",
     "DocumentStatus",
     "DocumentListItem",
     "DocumentResponse",
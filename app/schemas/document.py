@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field, field_validator
 from datetime import datetime
-from typing import Optional, Union
+from typing import Optional, Union, Dict, List
 from uuid import UUID
 import json
 
@@ -16,12 +16,41 @@ class UploadResponse(BaseModel):
     mime_type: str
     status: str
     processing_mode: Optional[str] = None
+    duplicate_of: Optional[str] = None
     created_at: datetime
     message: str = "File uploaded successfully"
 
     class Config:
         from_attributes = True
 
+class BatchUploadItem(BaseModel):
+    filename: str
+    job_id: Optional[str] = None
+    status: str
+    file_size_bytes: Optional[int] = None
+    duplicate_of: Optional[str] = None
+    message: Optional[str] = None
+    error: Optional[dict] = None
+
+class BatchUploadResponse(BaseModel):
+    total: int
+    succeeded: int
+    failed: int
+    processing_mode: Optional[str] = None
+    items: List[BatchUploadItem]
+
+class UploadUrlRequest(BaseModel):
+    filename: str
+    content_type: str
+    file_size_bytes: Optional[int] = None
+
+class UploadUrlResponse(BaseModel):
+    job_id: str
+    upload_url: str
+    method: str = "POST"
+    fields: Dict[str, str]
+    expires_in: int
+
 class DocumentStatus(BaseModel):
     job_id: str
     filename: str
@@ -59,9 +88,11 @@ class DocumentResponse(BaseModel):
     mime_type: str
     status: str
     processing_mode: Optional[str] = None
+    textract_features: Optional[str] = None
     created_at: datetime
     updated_at: datetime
     file_path: Optional[str] = None
+    content_hash: Optional[str] = None
     markdown_output: Optional[str] = None
     json_output: Optional[Union[dict, str]] = None
     textract_response: Optional[Union[dict, str]] = None
@@ -0,0 +1,109 @@
+import threading
+from typing import Optional
+
+import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+
+from app.core.config import settings
+from app.services.stubs.backends import backend_for, get_backend_client, reset_backends
+
+# boto3 clients are thread-safe once created, but sessions are not, so each
+# client is built once per process under a lock and then shared.
+_lock = threading.Lock()
+_clients = {}
+_transfer_config = None
+
+# Calls that must end inside a job deadline get a client with a shorter read timeout,
+# rounded down to one of these steps so only a few extra clients are ever built.
+TEXTRACT_READ_TIMEOUT_STEPS = (1, 2, 5, 10, 20)
+
+def _client_config(**kwargs) -> Config:
+    return Config(
+        max_pool_connections=settings.AWS_MAX_POOL_CONNECTIONS,
+        tcp_keepalive=settings.AWS_TCP_KEEPALIVE,
+        **kwargs
+    )
+
+def _build_s3_client():
+    kwargs = {'region_name': settings.S3_REGION}
+
+    if settings.S3_ACCESS_KEY_ID and settings.S3_SECRET_ACCESS_KEY:
+        kwargs['aws_access_key_id'] = settings.S3_ACCESS_KEY_ID
+        kwargs['aws_secret_access_key'] = settings.S3_SECRET_ACCESS_KEY
+
+    if settings.S3_ENDPOINT_URL:
+        kwargs['endpoint_url'] = settings.S3_ENDPOINT_URL
+
+    return boto3.session.Session().client('s3', config=_client_config(), **kwargs)
+
+def _build_textract_client(read_timeout: Optional[float] = None):
+    # TextractClient retries transient errors itself, within the job deadline, so
+    # botocore makes a single attempt instead of stacking its own retries on top.
+    read_timeout = read_timeout or settings.TEXTRACT_READ_TIMEOUT_SECONDS
+    boto_config = _client_config(
+        read_timeout=read_timeout,
+        connect_timeout=min(settings.TEXTRACT_CONNECT_TIMEOUT_SECONDS, read_timeout),
+        retries={'max_attempts': 1, 'mode': 'standard'}
+    )
+
+    return boto3.session.Session().client(
+        'textract',
+        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+        region_name=settings.AWS_REGION,
+        config=boto_config
+    )
+
+def _build_sqs_client():
+    return boto3.session.Session().client(
+        'sqs',
+        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+        region_name=settings.AWS_REGION,
+        config=_client_config()
+    )
+
+def _get_client(name: str, factory):
+    client = _clients.get(name)
+    if client is None:
+        with _lock:
+            client = _clients.get(name)
+            if client is None:
+                client = factory()
+                _clients[name] = client
+    return client
+
+def get_s3_client():
+    return _get_client('s3', lambda: get_backend_client('s3', _build_s3_client))
+
+def get_textract_client(read_timeout: Optional[float] = None):
+    """The shared Textract client; with `read_timeout`, one whose calls give up within that many seconds"""
+    if read_timeout is None or read_timeout >= settings.TEXTRACT_READ_TIMEOUT_SECONDS or backend_for('textract') != 'live':
+        return _get_client('textract', lambda: get_backend_client('textract', _build_textract_client))
+
+    step = max((step for step in TEXTRACT_READ_TIMEOUT_STEPS if step <= read_timeout), default=TEXTRACT_READ_TIMEOUT_STEPS[0])
+    return _get_client(f'textract:{step}', lambda: _build_textract_client(step))
+
+def get_sqs_client():
+    return _get_client('sqs', _build_sqs_client)
+
+def get_s3_transfer_config() -> TransferConfig:
+    global _transfer_config
+    if _transfer_config is None:
+        with _lock:
+            if _transfer_config is None:
+                _transfer_config = TransferConfig(
+                    multipart_threshold=settings.S3_TRANSFER_MULTIPART_THRESHOLD_MB * 1024 * 1024,
+                    multipart_chunksize=settings.S3_MULTIPART_PART_SIZE_MB * 1024 * 1024,
+                    max_concurrency=settings.S3_TRANSFER_MAX_CONCURRENCY,
+                    use_threads=True
+                )
+    return _transfer_config
+
+def reset_clients() -> None:
+    global _transfer_config
+    with _lock:
+        _clients.clear()
+        _transfer_config = None
+    reset_backends()
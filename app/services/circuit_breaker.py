@@ -0,0 +1,163 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator
+
+from app.core.config import settings
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class CircuitOpenError(Exception):
+    pass
+
+class CircuitBreaker:
+    """Per-upstream breaker over a sliding window of recent call outcomes.
+
+    Closed lets everything through and opens once at least `min_calls` of the
+    last `window_size` calls were seen and `failure_rate` of them failed. Open
+    rejects calls immediately for `open_seconds`, then half-open admits
+    `half_open_calls` probes: all succeeding closes it, any failing reopens it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate: float,
+        window_size: int,
+        min_calls: int,
+        open_seconds: float,
+        half_open_calls: int = 1
+    ):
+        self.name = name
+        self.failure_rate = failure_rate
+        self.window_size = max(1, window_size)
+        self.min_calls = max(1, min(min_calls, self.window_size))
+        self.open_seconds = open_seconds
+        self.half_open_calls = max(1, half_open_calls)
+        self._lock = threading.Lock()
+        self._outcomes = deque(maxlen=self.window_size)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probes_started = 0
+        self._probes_passed = 0
+        self.rejected = 0
+        self.opened = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self._state = HALF_OPEN
+            self._probes_started = 0
+            self._probes_passed = 0
+        return self._state
+
+    def _open(self) -> None:
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        self.opened += 1
+
+    def allow(self) -> None:
+        """Raise CircuitOpenError unless a call may go out now"""
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return
+            if state == HALF_OPEN and self._probes_started < self.half_open_calls:
+                self._probes_started += 1
+                return
+            self.rejected += 1
+            retry_in = max(0.0, self.open_seconds - (time.monotonic() - self._opened_at))
+        raise CircuitOpenError(f"{self.name} circuit open, retry in {retry_in:.0f}s")
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._probes_passed += 1
+                if self._probes_passed >= self.half_open_calls:
+                    self._state = CLOSED
+                    self._outcomes.clear()
+                return
+            self._outcomes.append(True)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._open()
+                return
+            if self._state == OPEN:
+                return
+            self._outcomes.append(False)
+            failures = self._outcomes.count(False)
+            if len(self._outcomes) >= self.min_calls and failures / len(self._outcomes) >= self.failure_rate:
+                self._open()
+
+    def record_ignored(self) -> None:
+        """The call never reached the upstream; hand a half-open probe back"""
+        with self._lock:
+            if self._state == HALF_OPEN and self._probes_started > self._probes_passed:
+                self._probes_started -= 1
+
+    @contextmanager
+    def guard(self, failures=(Exception,), ignore=()) -> Iterator[None]:
+        """Admit one call; `failures` count against the upstream, `ignore` counts as neither, anything else as success"""
+        self.allow()
+        try:
+            yield
+        except BaseException as e:
+            if isinstance(e, ignore):
+                self.record_ignored()
+            elif isinstance(e, failures):
+                self.record_failure()
+            else:
+                self.record_success()
+            raise
+        self.record_success()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            state = self._current_state()
+            failures = self._outcomes.count(False)
+            return {
+                'state': state,
+                'window_calls': len(self._outcomes),
+                'window_failures': failures,
+                'failure_rate': round(failures / len(self._outcomes), 3) if self._outcomes else 0.0,
+                'opened': self.opened,
+                'rejected': self.rejected,
+                'retry_in_seconds': round(max(0.0, self.open_seconds - (time.monotonic() - self._opened_at)), 1)
+                if state == OPEN else 0.0
+            }
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+def get_circuit_breaker(upstream: str) -> CircuitBreaker:
+    """Process-wide breaker for 'textract' or 'gemini'"""
+    breaker = _breakers.get(upstream)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.get(upstream)
+            if breaker is None:
+                if upstream not in ('textract', 'gemini'):
+                    raise ValueError(f"Unknown upstream: {upstream}")
+                breaker = CircuitBreaker(
+                    upstream,
+                    failure_rate=settings.CIRCUIT_FAILURE_RATE,
+                    window_size=settings.CIRCUIT_WINDOW_SIZE,
+                    min_calls=settings.CIRCUIT_MIN_CALLS,
+                    open_seconds=settings.CIRCUIT_OPEN_SECONDS,
+                    half_open_calls=settings.CIRCUIT_HALF_OPEN_CALLS
+                )
+                _breakers[upstream] = breaker
+    return breaker
+
+def circuit_breaker_stats() -> Dict[str, Any]:
+    return {upstream: get_circuit_breaker(upstream).stats() for upstream in ('textract', 'gemini')}
@@ -0,0 +1,122 @@
+import hashlib
+import threading
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any
+from sqlalchemy import func
+
+from app.core.database import SessionLocal
+from app.models import CacheEntry
+
+class DatabaseCache:
+    """Key/value cache in the cache_entries table, shared by every worker on the same database"""
+
+    def __init__(self, namespace: str, max_bytes: int):
+        self.namespace = namespace
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{hashlib.sha256(key.encode('utf-8')).hexdigest()}"
+
+    def get(self, key: str) -> Optional[bytes]:
+        data = None
+        db = SessionLocal()
+        try:
+            entry = db.get(CacheEntry, self._key(key))
+            if entry is not None:
+                data = entry.data
+                entry.accessed_at = datetime.now(timezone.utc)
+                db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"⚠️ Database cache read failed: {str(e)}")
+        finally:
+            db.close()
+
+        with self._lock:
+            if data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return data
+
+    def set(self, key: str, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+
+        db = SessionLocal()
+        try:
+            db.merge(CacheEntry(
+                key=self._key(key),
+                namespace=self.namespace,
+                data=data,
+                size_bytes=len(data),
+                accessed_at=datetime.now(timezone.utc)
+            ))
+            db.commit()
+            self._evict(db)
+        except Exception as e:
+            db.rollback()
+            print(f"⚠️ Database cache write failed: {str(e)}")
+        finally:
+            db.close()
+
+    def _evict(self, db) -> None:
+        total = db.query(func.coalesce(func.sum(CacheEntry.size_bytes), 0)).filter(
+            CacheEntry.namespace == self.namespace
+        ).scalar()
+        if total <= self.max_bytes:
+            return
+
+        # Drop least recently used entries in batches until the namespace fits again.
+        for entry_key, size in db.query(CacheEntry.key, CacheEntry.size_bytes).filter(
+            CacheEntry.namespace == self.namespace
+        ).order_by(CacheEntry.accessed_at.asc()).limit(500).all():
+            if total <= self.max_bytes:
+                break
+            db.query(CacheEntry).filter(CacheEntry.key == entry_key).delete(synchronize_session=False)
+            total -= size
+        db.commit()
+
+    def delete(self, key: str) -> None:
+        db = SessionLocal()
+        try:
+            db.query(CacheEntry).filter(CacheEntry.key == self._key(key)).delete(synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+    def purge(self) -> int:
+        db = SessionLocal()
+        try:
+            removed = db.query(CacheEntry).filter(CacheEntry.namespace == self.namespace).delete(synchronize_session=False)
+            db.commit()
+            return removed
+        finally:
+            db.close()
+
+    def stats(self) -> Dict[str, Any]:
+        db = SessionLocal()
+        try:
+            entries, size_bytes = db.query(
+                func.count(CacheEntry.key),
+                func.coalesce(func.sum(CacheEntry.size_bytes), 0)
+            ).filter(CacheEntry.namespace == self.namespace).one()
+        except Exception:
+            entries, size_bytes = None, None
+        finally:
+            db.close()
+
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'backend': 'postgres',
+                'entries': entries,
+                'size_bytes': size_bytes,
+                'max_bytes': self.max_bytes
+            }
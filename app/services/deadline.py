@@ -0,0 +1,33 @@
+import time
+from typing import Optional
+
+class DeadlineExceeded(Exception):
+    pass
+
+class Deadline:
+    """Wall-clock budget for one job; each stage checks it and fits its own timeout inside what is left"""
+
+    def __init__(self, seconds: Optional[float]):
+        self.seconds = seconds
+        self._expires_at = time.monotonic() + seconds if seconds else None
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left, or None when the job has no deadline"""
+        if self._expires_at is None:
+            return None
+        return max(0.0, self._expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0
+
+    def check(self, stage: str) -> None:
+        if self.expired:
+            raise DeadlineExceeded(f"Processing deadline of {self.seconds:.0f}s exceeded before {stage}")
+
+    def timeout(self, default: float, stage: str) -> float:
+        """`default` shrunk to the time left; raises DeadlineExceeded when nothing is left"""
+        self.check(stage)
+        remaining = self.remaining()
+        return default if remaining is None else min(default, remaining)
@@ -0,0 +1,77 @@
+from typing import Dict, List, Optional
+from sqlalchemy.orm import Session
+
+from app.models import Document
+from app.core.config import settings
+from app.services.textract.feature_tiers import parse_features, features_cover
+
+class DedupService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _duplicates_query(self, content_hash: str, user_id: str):
+        query = self.db.query(Document).filter(Document.content_hash == content_hash)
+        if not settings.DEDUP_ACROSS_USERS:
+            query = query.filter(Document.user_id == user_id)
+        return query
+
+    def find_stored_duplicate(self, content_hash: str, user_id: str) -> Optional[Document]:
+        if not settings.DEDUP_ENABLED or not content_hash:
+            return None
+
+        return self._duplicates_query(content_hash, user_id).order_by(
+            (Document.status == "complete").desc(),
+            Document.created_at.desc()
+        ).first()
+
+    def find_stored_duplicates(self, content_hashes: List[str], user_id: str) -> Dict[str, Document]:
+        """find_stored_duplicate for many hashes in one query"""
+        content_hashes = sorted({content_hash for content_hash in content_hashes if content_hash})
+        if not settings.DEDUP_ENABLED or not content_hashes:
+            return {}
+
+        query = self.db.query(Document).filter(Document.content_hash.in_(content_hashes))
+        if not settings.DEDUP_ACROSS_USERS:
+            query = query.filter(Document.user_id == user_id)
+
+        # Same preference as find_stored_duplicate: a completed copy first, then the newest.
+        duplicates = {}
+        for document in query.order_by((Document.status == "complete").desc(), Document.created_at.desc()):
+            duplicates.setdefault(document.content_hash, document)
+        return duplicates
+
+    def find_processed_duplicate(
+        self,
+        document: Document,
+        mode: str,
+        feature_types: Optional[List[str]] = None
+    ) -> Optional[Document]:
+        if not settings.DEDUP_ENABLED or not document.content_hash:
+            return None
+
+        candidates = self._duplicates_query(document.content_hash, document.user_id).filter(
+            Document.id != document.id,
+            Document.status == "complete",
+            Document.processing_mode == mode,
+            Document.textract_response.isnot(None)
+        ).order_by(Document.created_at.desc()).limit(5).all()
+
+        # Results from a partial (page-range) run, or from a cheaper feature tier than
+        # the one requested, can't stand in for this run.
+        for candidate in candidates:
+            if not isinstance(candidate.textract_response, dict) or candidate.textract_response.get('page_selection'):
+                continue
+            if features_cover(parse_features(candidate.textract_features), feature_types):
+                return candidate
+        return None
+
+    def reuse_results(self, document: Document, source: Document) -> None:
+        document.processing_mode = source.processing_mode
+        document.textract_features = source.textract_features
+        document.textract_response = source.textract_response
+        document.raw_text = source.raw_text
+        document.markdown_output = source.markdown_output
+        document.gemini_response = source.gemini_response
+        document.bbox_image_url = source.bbox_image_url
+        document.error_message = None
+        document.status = "complete"
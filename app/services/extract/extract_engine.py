@@ -4,6 +4,7 @@ import re
 import logging
 from app.services.gemini.gemini_client import GeminiClient
 from app.services.extract.schema_validator import SchemaValidator
+from app.services.deadline import Deadline
 
 logger = logging.getLogger(__name__)
 
@@ -17,7 +18,8 @@ class ExtractEngine:
         schema: Dict[str, Any],
         image_bytes: bytes,
         mime_type: str = "image/png",
-        textract_data: Optional[Dict] = None
+        textract_data: Optional[Dict] = None,
+        deadline: Optional[Deadline] = None
     ) -> Tuple[Dict[str, Any], float]:
         extraction_prompt = self._build_extraction_prompt(schema)
 
@@ -25,7 +27,8 @@ class ExtractEngine:
             response = self.gemini_client.generate_with_image(
                 prompt=extraction_prompt,
                 image_bytes=image_bytes,
-                mime_type=mime_type
+                mime_type=mime_type,
+                deadline=deadline
             )
 
             extracted_json = self._parse_json_response(response)
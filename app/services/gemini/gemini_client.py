@@ -1,13 +1,31 @@
 import google.generativeai as genai
 import base64
+import math
 import signal
-from typing import Dict, Any
+import requests
+from google.api_core import exceptions as google_exceptions
+from typing import Dict, Any, Iterator, Optional
 from contextlib import contextmanager
 from app.core.config import settings
+from app.services.rate_limiter import get_rate_limiter, RateLimitTimeout
+from app.services.circuit_breaker import get_circuit_breaker, CircuitOpenError
+from app.services.deadline import Deadline, DeadlineExceeded
+from app.services.stubs.backends import get_backend_client
 
 class TimeoutException(Exception):
     pass
 
+# What counts against the breaker: 5xx, exhausted retries, a broken transport and our own call timeout.
+# Client errors (4xx) and local errors say nothing about whether Gemini is up.
+GEMINI_FAILURES = (
+    google_exceptions.ServerError,
+    google_exceptions.RetryError,
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    ConnectionError,
+    TimeoutException
+)
+
 @contextmanager
 def timeout_handler(seconds):
     def _timeout_handler(signum, frame):
@@ -21,17 +39,36 @@ def timeout_handler(seconds):
         signal.alarm(0)
         signal.signal(signal.SIGALRM, original_handler)
 
+def _build_model():
+    genai.configure(api_key=settings.GEMINI_API_KEY)
+    return genai.GenerativeModel(settings.GEMINI_MODEL)
+
 class GeminiClient:
     def __init__(self):
-        genai.configure(api_key=settings.GEMINI_API_KEY)
-        self.model = genai.GenerativeModel(settings.GEMINI_MODEL)
+        self.model = get_backend_client('gemini', _build_model)
         self.timeout = settings.GEMINI_TIMEOUT_SECONDS
+        self.rate_limiter = get_rate_limiter('gemini')
+        self.breaker = get_circuit_breaker('gemini')
+
+    @contextmanager
+    def _guarded_call(self, deadline: Optional[Deadline]) -> Iterator[Dict]:
+        """Breaker, shared rate limit and a timeout shrunk to what is left of the job's deadline"""
+        deadline = deadline or Deadline(None)
+        max_wait = deadline.timeout(settings.RATE_LIMIT_MAX_WAIT_SECONDS, "AI refinement")
+        with self.rate_limiter.slot(max_wait):
+            timeout = math.ceil(deadline.timeout(self.timeout, "AI refinement"))
+            # The alarm is installed outside the breaker, so failing to set it up (off the main thread) is not an upstream failure.
+            with timeout_handler(timeout), self.breaker.guard(
+                failures=GEMINI_FAILURES, ignore=(google_exceptions.TooManyRequests,)
+            ):
+                yield {"timeout": timeout}
 
     def generate_with_image(
         self,
         prompt: str,
         image_bytes: bytes,
-        mime_type: str = "image/png"
+        mime_type: str = "image/png",
+        deadline: Optional[Deadline] = None
     ) -> str:
         try:
             image_part = {
@@ -39,14 +76,20 @@ class GeminiClient:
                 "data": image_bytes
             }
 
-            with timeout_handler(self.timeout):
+            with self._guarded_call(deadline) as call:
                 response = self.model.generate_content(
                     [prompt, image_part],
-                    request_options={"timeout": self.timeout}
+                    request_options={"timeout": call["timeout"]}
                 )
 
             return response.text
 
+        except RateLimitTimeout:
+            raise Exception("AI service busy. Using standard OCR.")
+        except CircuitOpenError:
+            raise Exception("AI service temporarily unavailable. Using standard OCR.")
+        except DeadlineExceeded:
+            raise Exception("Processing deadline reached. Using standard OCR.")
         except TimeoutException:
             raise Exception(f"AI refinement timeout. Document may be too complex. Please try a smaller file.")
         except Exception as e:
@@ -63,7 +106,8 @@ class GeminiClient:
         prompt: str,
         markdown: str,
         image_bytes: bytes,
-        mime_type: str = "image/png"
+        mime_type: str = "image/png",
+        deadline: Optional[Deadline] = None
     ) -> str:
         try:
             image_part = {
@@ -73,14 +117,20 @@ class GeminiClient:
 
             full_prompt = f"{prompt}\n\nCurrent Markdown:\n```markdown\n{markdown}\n```"
 
-            with timeout_handler(self.timeout):
+            with self._guarded_call(deadline) as call:
                 response = self.model.generate_content(
                     [full_prompt, image_part],
-                    request_options={"timeout": self.timeout}
+                    request_options={"timeout": call["timeout"]}
                 )
 
             return response.text
 
+        except RateLimitTimeout:
+            raise Exception("AI service busy. Using standard OCR.")
+        except CircuitOpenError:
+            raise Exception("AI service temporarily unavailable. Using standard OCR.")
+        except DeadlineExceeded:
+            raise Exception("Processing deadline reached. Using standard OCR.")
         except TimeoutException:
             raise Exception(f"AI refinement timeout. Document may be too complex. Please try a smaller file.")
         except Exception as e:
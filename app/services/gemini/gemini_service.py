@@ -1,6 +1,7 @@
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from app.core.config import settings
 from app.services.gemini.refinement_engine import RefinementEngine
+from app.services.deadline import Deadline
 
 class GeminiService:
     def __init__(self):
@@ -12,7 +13,8 @@ class GeminiService:
         image_bytes: bytes,
         file_size_bytes: int,
         page_count: int,
-        mime_type: str = "image/png"
+        mime_type: str = "image/png",
+        deadline: Optional[Deadline] = None
     ) -> Dict[str, Any]:
         if not self._is_eligible(file_size_bytes, page_count):
             return {
@@ -27,7 +29,8 @@ class GeminiService:
             refinement_result = self.refinement_engine.refine_markdown(
                 textract_markdown=textract_markdown,
                 image_bytes=image_bytes,
-                mime_type=mime_type
+                mime_type=mime_type,
+                deadline=deadline
             )
 
             if not refinement_result["success"]:
@@ -1,6 +1,7 @@
 import re
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from app.services.gemini.gemini_client import GeminiClient
+from app.services.deadline import Deadline
 
 class RefinementEngine:
     def __init__(self):
@@ -10,7 +11,8 @@ class RefinementEngine:
         self,
         textract_markdown: str,
         image_bytes: bytes,
-        mime_type: str = "image/png"
+        mime_type: str = "image/png",
+        deadline: Optional[Deadline] = None
     ) -> Dict[str, Any]:
         prompt = self._build_refinement_prompt()
 
@@ -19,7 +21,8 @@ class RefinementEngine:
                 prompt=prompt,
                 markdown=textract_markdown,
                 image_bytes=image_bytes,
-                mime_type=mime_type
+                mime_type=mime_type,
+                deadline=deadline
             )
 
             refined_markdown = self._extract_markdown(response)
@@ -1,21 +1,31 @@
 from typing import List, Dict, Tuple, Optional
 
+from app.services.markdown.utils.spatial_index import SpatialIndex
+from app.services.textract.geometry_store import GeometryStore
+
 class CheckboxConverter:
-    def convert(self, checkboxes: List[Dict], bounding_boxes: List[Dict]) -> str:
+    def convert(
+        self,
+        checkboxes: List[Dict],
+        bounding_boxes: List[Dict],
+        geometry: Optional[GeometryStore] = None,
+        line_index: Optional[SpatialIndex] = None
+    ) -> str:
         if not checkboxes:
             return ""
 
-        text_blocks = [bb for bb in bounding_boxes if bb.get('type') == 'LINE']
+        if line_index is None:
+            line_index = SpatialIndex.for_lines(geometry or GeometryStore.from_blocks(bounding_boxes))
 
         checkbox_items = []
         for checkbox in checkboxes:
             is_selected = checkbox.get('status') == 'SELECTED'
-            label = self._find_checkbox_label(checkbox, text_blocks)
+            label = self._find_checkbox_label(checkbox, line_index)
             checkbox_items.append((label, is_selected))
 
         return self._format_checklist(checkbox_items)
 
-    def _find_checkbox_label(self, checkbox: Dict, text_blocks: List[Dict]) -> str:
+    def _find_checkbox_label(self, checkbox: Dict, line_index: SpatialIndex) -> str:
         checkbox_bbox = checkbox.get('bbox', {})
         checkbox_left = checkbox_bbox.get('Left', 0)
         checkbox_top = checkbox_bbox.get('Top', 0)
@@ -24,35 +34,13 @@ class CheckboxConverter:
         vertical_threshold = 0.02
         above_threshold = 0.05
 
-        horizontal_candidates = []
-        vertical_candidates = []
-
-        for block in text_blocks:
-            block_bbox = block.get('bbox', {})
-            block_left = block_bbox.get('Left', 0)
-            block_top = block_bbox.get('Top', 0)
-            text = block.get('text', '').strip()
-
-            if not text:
-                continue
-
-            if abs(block_top - checkbox_top) < vertical_threshold:
-                if block_left > checkbox_left and block_left - checkbox_left < horizontal_threshold:
-                    distance = abs(block_left - checkbox_left)
-                    horizontal_candidates.append((distance, text))
-
-            if block_top < checkbox_top and checkbox_top - block_top < above_threshold:
-                if abs(block_left - checkbox_left) < horizontal_threshold:
-                    distance = checkbox_top - block_top
-                    vertical_candidates.append((distance, text))
-
-        if horizontal_candidates:
-            horizontal_candidates.sort(key=lambda x: x[0])
-            return horizontal_candidates[0][1]
+        # A label on the same line to the right wins over one just above.
+        label_index = line_index.nearest_right(checkbox_left, checkbox_top, horizontal_threshold, vertical_threshold)
+        if label_index is None:
+            label_index = line_index.nearest_above(checkbox_left, checkbox_top, above_threshold, horizontal_threshold)
 
-        if vertical_candidates:
-            vertical_candidates.sort(key=lambda x: x[0])
-            return vertical_candidates[0][1]
+        if label_index is not None:
+            return line_index.geometry.text(label_index).strip()
 
         return "Checkbox"
 
@@ -1,70 +1,47 @@
 from typing import List, Dict, Optional
+import numpy as np
+
+from app.services.textract.geometry_store import GeometryStore
 
 class TextConverter:
-    def convert(self, text: str, bounding_boxes: List[Dict]) -> str:
+    def convert(self, text: str, bounding_boxes: List[Dict], geometry: Optional[GeometryStore] = None) -> str:
         if not text:
             return ""
 
-        line_blocks = [bb for bb in bounding_boxes if bb.get('type') == 'LINE']
-        if not line_blocks:
+        if geometry is None:
+            geometry = GeometryStore.from_blocks(bounding_boxes)
+
+        line_indices = geometry.select('LINE')
+        if len(line_indices) == 0:
             return text
 
-        paragraphs = self._detect_paragraphs(line_blocks)
+        paragraphs = self._detect_paragraphs(geometry, line_indices)
 
         output_lines = []
         for para in paragraphs:
-            heading_level = self._detect_heading(para[0])
+            first_top = geometry.column('top', 1.0, indices=para[:1])[0]
+            heading_level = self._detect_heading(geometry.text(para[0]), first_top)
 
             if heading_level:
-                para_text = " ".join([block.get('text', '').strip() for block in para])
+                para_text = " ".join([line.strip() for line in geometry.texts(para)])
                 output_lines.append(f"{'#' * heading_level} {para_text}")
             else:
-                formatted_para = self._format_with_hierarchy(para)
+                formatted_para = self._format_with_hierarchy(geometry, para)
                 output_lines.append(formatted_para)
 
         return "\n\n".join(output_lines)
 
-    def _detect_paragraphs(self, blocks: List[Dict]) -> List[List[Dict]]:
-        if not blocks:
-            return []
-
-        sorted_blocks = sorted(blocks, key=lambda b: (
-            b.get('bbox', {}).get('Top', 0),
-            b.get('bbox', {}).get('Left', 0)
-        ))
-
-        paragraphs = []
-        current_paragraph = [sorted_blocks[0]]
-        prev_bottom = sorted_blocks[0].get('bbox', {}).get('Top', 0) + \
-                      sorted_blocks[0].get('bbox', {}).get('Height', 0.02)
-
+    def _detect_paragraphs(self, geometry: GeometryStore, indices: np.ndarray) -> List[np.ndarray]:
         paragraph_gap_threshold = 0.03
 
-        for block in sorted_blocks[1:]:
-            current_top = block.get('bbox', {}).get('Top', 0)
-            gap = current_top - prev_bottom
-
-            if gap > paragraph_gap_threshold:
-                paragraphs.append(current_paragraph)
-                current_paragraph = [block]
-            else:
-                current_paragraph.append(block)
-
-            prev_bottom = current_top + block.get('bbox', {}).get('Height', 0.02)
-
-        if current_paragraph:
-            paragraphs.append(current_paragraph)
-
-        return paragraphs
+        return geometry.split_on_gaps(geometry.reading_order(indices), paragraph_gap_threshold)
 
-    def _detect_heading(self, block: Dict) -> Optional[int]:
-        text = block.get('text', '').strip()
-        bbox = block.get('bbox', {})
+    def _detect_heading(self, text: str, top_position: float) -> Optional[int]:
+        text = text.strip()
 
         if not text:
             return None
 
-        top_position = bbox.get('Top', 1.0)
         text_length = len(text)
         is_uppercase = text.isupper() and len(text) > 3
         is_short = text_length < 50
@@ -81,19 +58,18 @@ class TextConverter:
 
         return None
 
-    def _format_with_hierarchy(self, para: List[Dict]) -> str:
+    def _format_with_hierarchy(self, geometry: GeometryStore, para: np.ndarray) -> str:
         if len(para) == 1:
-            return para[0].get('text', '').strip()
+            return geometry.text(para[0]).strip()
 
-        left_positions = [block.get('bbox', {}).get('Left', 0) for block in para]
-        min_left = min(left_positions)
+        left_positions = geometry.column('left', indices=para)
+        min_left = left_positions.min()
 
         indentation_threshold = 0.02
 
         lines = []
-        for block in para:
-            text = block.get('text', '').strip()
-            left = block.get('bbox', {}).get('Left', 0)
+        for index, left in zip(para, left_positions):
+            text = geometry.text(index).strip()
             indent_diff = left - min_left
 
             if indent_diff > indentation_threshold:
@@ -5,6 +5,8 @@ from app.services.markdown.converters.checkbox_converter import CheckboxConverte
 from app.services.markdown.converters.text_converter import TextConverter
 from app.services.markdown.utils.layout_analyzer import LayoutAnalyzer
 from app.services.markdown.utils.markdown_formatter import MarkdownFormatter
+from app.services.markdown.utils.spatial_index import SpatialIndex
+from app.services.textract.geometry_store import GeometryStore
 
 class MarkdownConverter:
     def __init__(self, parsed_data: Dict[str, Any], page_number: int = 1):
@@ -17,7 +19,8 @@ class MarkdownConverter:
         self.layout_analyzer = LayoutAnalyzer()
 
     def convert(self) -> str:
-        elements = self.layout_analyzer.analyze(self.parsed_data)
+        geometry = GeometryStore.from_blocks(self.parsed_data.get('bounding_boxes', []))
+        elements = self.layout_analyzer.analyze(self.parsed_data, geometry)
 
         markdown_parts = []
         full_text = self.parsed_data.get('text', '')
@@ -39,14 +42,15 @@ class MarkdownConverter:
 
             elif element_type == 'checkbox':
                 bounding_boxes = self.parsed_data.get('bounding_boxes', [])
-                checkbox_md = self.checkbox_converter.convert(element_data, bounding_boxes)
+                line_index = SpatialIndex.for_lines(geometry)
+                checkbox_md = self.checkbox_converter.convert(element_data, bounding_boxes, geometry, line_index)
                 if checkbox_md:
                     markdown_parts.append(checkbox_md)
 
             elif element_type == 'text':
                 text = element_data.get('text', '')
                 bounding_boxes = element_data.get('bounding_boxes', [])
-                text_md = self.text_converter.convert(text, bounding_boxes)
+                text_md = self.text_converter.convert(text, bounding_boxes, element_data.get('geometry'))
                 if text_md:
                     markdown_parts.append(text_md)
 
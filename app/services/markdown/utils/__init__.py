@@ -1,4 +1,5 @@
 from app.services.markdown.utils.layout_analyzer import LayoutAnalyzer
 from app.services.markdown.utils.markdown_formatter import MarkdownFormatter
+from app.services.markdown.utils.spatial_index import SpatialIndex
 
-__all__ = ['LayoutAnalyzer', 'MarkdownFormatter']
+__all__ = ['LayoutAnalyzer', 'MarkdownFormatter', 'SpatialIndex']
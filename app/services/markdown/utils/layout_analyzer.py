@@ -1,7 +1,8 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from app.services.textract.geometry_store import GeometryStore
 
 class LayoutAnalyzer:
-    def analyze(self, parsed_data: Dict[str, Any]) -> List[Dict]:
+    def analyze(self, parsed_data: Dict[str, Any], geometry: Optional[GeometryStore] = None) -> List[Dict]:
         elements = []
 
         tables = parsed_data.get('tables', [])
@@ -42,7 +43,7 @@ class LayoutAnalyzer:
         if text:
             elements.append({
                 'type': 'text',
-                'data': {'text': text, 'bounding_boxes': bounding_boxes},
+                'data': {'text': text, 'bounding_boxes': bounding_boxes, 'geometry': geometry},
                 'bbox': {'Top': 0, 'Left': 0},
                 'top': 0,
                 'left': 0
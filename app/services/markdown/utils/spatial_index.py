@@ -0,0 +1,115 @@
+import math
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.services.textract.geometry_store import GeometryStore
+
+# Page coordinates are fractions of the page, so a 0.05 cell gives a 20 x 20 grid.
+DEFAULT_CELL_SIZE = 0.05
+# Widens query windows so a row exactly on a cell edge is never missed to rounding.
+EDGE_TOLERANCE = 1e-9
+
+class SpatialIndex:
+    """Uniform grid over a page's blocks, keyed by each block's top-left corner.
+
+    Built once per page from the parser's geometry store. A query only scans the
+    cells its window touches; ties on distance go to the block that comes first
+    in the response, matching a stable sort over all candidates.
+    """
+
+    def __init__(self, geometry: GeometryStore, indices: np.ndarray, cell_size: float = DEFAULT_CELL_SIZE):
+        self.geometry = geometry
+        self.cell_size = cell_size
+        self.cells_per_side = max(1, math.ceil(1 / cell_size))
+
+        lefts = geometry.column('left', indices=indices)
+        tops = geometry.column('top', indices=indices)
+        self._rows = [int(index) for index in indices]
+        self._lefts = lefts.tolist()
+        self._tops = tops.tolist()
+        self._widths = geometry.column('width', indices=indices).tolist()
+        self._heights = geometry.column('height', indices=indices).tolist()
+        # Overlap queries widen their window by the largest box so every intersecting anchor is scanned.
+        self._max_width = max(self._widths, default=0.0)
+        self._max_height = max(self._heights, default=0.0)
+
+        self._grid: Dict[int, List[int]] = {}
+        cell_ids = self._cells(tops) * self.cells_per_side + self._cells(lefts)
+        for position, cell_id in enumerate(cell_ids.tolist()):
+            self._grid.setdefault(cell_id, []).append(position)
+
+    @classmethod
+    def for_lines(cls, geometry: GeometryStore, cell_size: float = DEFAULT_CELL_SIZE) -> 'SpatialIndex':
+        """Index of the page's LINE blocks that have text"""
+        return cls(geometry, geometry.select('LINE', non_empty=True), cell_size)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def _cells(self, values: np.ndarray) -> np.ndarray:
+        # Out-of-page coordinates land in the border cells, which keeps window lookups monotonic.
+        return np.clip(np.floor(values / self.cell_size), 0, self.cells_per_side - 1).astype(np.int64)
+
+    def _cell(self, value: float) -> int:
+        """Scalar twin of _cells for query windows, where NumPy call overhead would dominate"""
+        return min(max(math.floor(value / self.cell_size), 0), self.cells_per_side - 1)
+
+    def _positions(self, left: float, top: float, right: float, bottom: float) -> List[int]:
+        """Positions whose anchor may lie in the window, in response order"""
+        first_col = self._cell(left - EDGE_TOLERANCE)
+        last_col = self._cell(right + EDGE_TOLERANCE)
+        first_row = self._cell(top - EDGE_TOLERANCE)
+        last_row = self._cell(bottom + EDGE_TOLERANCE)
+        positions = []
+        for row in range(first_row, last_row + 1):
+            base = row * self.cells_per_side
+            for col in range(first_col, last_col + 1):
+                positions.extend(self._grid.get(base + col, ()))
+        positions.sort()
+        return positions
+
+    def _closest(self, candidates: List[Tuple[float, int]]) -> Optional[int]:
+        if not candidates:
+            return None
+        _, position = min(candidates)
+        return self._rows[position]
+
+    def nearest_right(self, left: float, top: float, max_dx: float, max_dy: float) -> Optional[int]:
+        """Closest block starting right of (left, top) on roughly the same line"""
+        candidates = []
+        for position in self._positions(left, top - max_dy, left + max_dx, top + max_dy):
+            block_left = self._lefts[position]
+            if abs(self._tops[position] - top) < max_dy and block_left > left and block_left - left < max_dx:
+                candidates.append((abs(block_left - left), position))
+        return self._closest(candidates)
+
+    def nearest_above(self, left: float, top: float, max_dy: float, max_dx: float) -> Optional[int]:
+        """Closest block starting above (left, top) in roughly the same column"""
+        candidates = []
+        for position in self._positions(left - max_dx, top - max_dy, left + max_dx, top):
+            block_top = self._tops[position]
+            if block_top < top and top - block_top < max_dy and abs(self._lefts[position] - left) < max_dx:
+                candidates.append((top - block_top, position))
+        return self._closest(candidates)
+
+    def region(self, left: float, top: float, right: float, bottom: float) -> List[int]:
+        """Blocks whose top-left corner lies inside the rectangle, in response order"""
+        return [
+            self._rows[position]
+            for position in self._positions(left, top, right, bottom)
+            if left <= self._lefts[position] <= right and top <= self._tops[position] <= bottom
+        ]
+
+    def overlapping(self, bbox: Dict) -> List[int]:
+        """Blocks whose box intersects `bbox` (a Textract BoundingBox dict), in response order"""
+        left = bbox.get('Left', 0)
+        top = bbox.get('Top', 0)
+        right = left + bbox.get('Width', 0)
+        bottom = top + bbox.get('Height', 0)
+        return [
+            self._rows[position]
+            for position in self._positions(left - self._max_width, top - self._max_height, right, bottom)
+            if self._lefts[position] < right and self._lefts[position] + self._widths[position] > left
+            and self._tops[position] < bottom and self._tops[position] + self._heights[position] > top
+        ]
@@ -0,0 +1,164 @@
+import fcntl
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, Optional
+
+from app.core.config import settings
+
+class RateLimitTimeout(Exception):
+    pass
+
+class SharedRateLimiter:
+    """Token bucket plus concurrency ceiling shared by every worker process on the host.
+
+    State lives in a small JSON file guarded by an exclusive flock, so uvicorn
+    workers draw from one budget per upstream. Each call holds a lease that
+    expires after RATE_LIMIT_LEASE_SECONDS, so a crashed worker cannot pin slots.
+    """
+
+    POLL_SECONDS = 0.05
+
+    def __init__(self, name: str, rate_per_second: float, max_concurrent: int, burst: Optional[float] = None):
+        self.name = name
+        self.rate_per_second = rate_per_second
+        self.max_concurrent = max(1, max_concurrent)
+        self.burst = burst if burst is not None else max(1.0, rate_per_second)
+        os.makedirs(settings.RATE_LIMIT_DIR, exist_ok=True)
+        self.path = os.path.join(settings.RATE_LIMIT_DIR, f"{name}.json")
+        self._lock = threading.Lock()
+        self.acquired = 0
+        self.waited = 0
+        self.timeouts = 0
+        self.wait_seconds = 0.0
+
+    @contextmanager
+    def _locked_state(self) -> Iterator[Dict]:
+        with open(self.path, 'a+') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                raw = f.read()
+                try:
+                    state = json.loads(raw) if raw else {}
+                except ValueError:
+                    state = {}
+                state.setdefault('tokens', self.burst)
+                state.setdefault('updated', time.time())
+                state.setdefault('leases', {})
+
+                yield state
+
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps(state))
+                f.flush()
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _try_acquire(self, lease_id: str) -> float:
+        """Take a token and a lease if both are free; otherwise return how long to wait before retrying"""
+        now = time.time()
+        with self._locked_state() as state:
+            state['tokens'] = min(self.burst, state['tokens'] + (now - state['updated']) * self.rate_per_second)
+            state['updated'] = now
+            state['leases'] = {lease: expiry for lease, expiry in state['leases'].items() if expiry > now}
+
+            if len(state['leases']) >= self.max_concurrent:
+                return self.POLL_SECONDS
+            if state['tokens'] < 1:
+                return max(self.POLL_SECONDS, (1 - state['tokens']) / self.rate_per_second)
+
+            state['tokens'] -= 1
+            state['leases'][lease_id] = now + settings.RATE_LIMIT_LEASE_SECONDS
+            return 0.0
+
+    def acquire(self, max_wait: Optional[float] = None) -> str:
+        max_wait = settings.RATE_LIMIT_MAX_WAIT_SECONDS if max_wait is None else max_wait
+        lease_id = uuid.uuid4().hex
+        start = time.monotonic()
+
+        while True:
+            delay = self._try_acquire(lease_id)
+            waited = time.monotonic() - start
+            if delay == 0:
+                with self._lock:
+                    self.acquired += 1
+                    if waited > 0:
+                        self.waited += 1
+                        self.wait_seconds += waited
+                return lease_id
+
+            if waited + delay > max_wait:
+                with self._lock:
+                    self.timeouts += 1
+                raise RateLimitTimeout(f"{self.name} rate limit: no slot free after {waited:.1f}s")
+            time.sleep(delay)
+
+    def release(self, lease_id: str) -> None:
+        with self._locked_state() as state:
+            state['leases'].pop(lease_id, None)
+
+    @contextmanager
+    def slot(self, max_wait: Optional[float] = None) -> Iterator[None]:
+        lease_id = self.acquire(max_wait)
+        try:
+            yield
+        finally:
+            self.release(lease_id)
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.time()
+        try:
+            with self._locked_state() as state:
+                in_flight = sum(1 for expiry in state['leases'].values() if expiry > now)
+                tokens = min(self.burst, state['tokens'] + (now - state['updated']) * self.rate_per_second)
+        except OSError:
+            in_flight, tokens = None, None
+
+        with self._lock:
+            return {
+                'rate_per_second': self.rate_per_second,
+                'max_concurrent': self.max_concurrent,
+                'in_flight': in_flight,
+                'tokens': round(tokens, 2) if tokens is not None else None,
+                'acquired': self.acquired,
+                'waited': self.waited,
+                'timeouts': self.timeouts,
+                'avg_wait_ms': round(self.wait_seconds / self.waited * 1000, 1) if self.waited else 0.0
+            }
+
+class _NoLimit:
+    @contextmanager
+    def slot(self, max_wait: Optional[float] = None) -> Iterator[None]:
+        yield
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+def get_rate_limiter(upstream: str):
+    """Shared limiter for 'textract' or 'gemini'; a no-op when RATE_LIMIT_ENABLED is off"""
+    if not settings.RATE_LIMIT_ENABLED:
+        return _NoLimit()
+
+    limiter = _limiters.get(upstream)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.get(upstream)
+            if limiter is None:
+                if upstream == 'textract':
+                    limiter = SharedRateLimiter('textract', settings.TEXTRACT_TPS, settings.TEXTRACT_MAX_CONCURRENT_REQUESTS)
+                elif upstream == 'gemini':
+                    limiter = SharedRateLimiter('gemini', settings.GEMINI_RPM / 60, settings.GEMINI_MAX_CONCURRENT_REQUESTS)
+                else:
+                    raise ValueError(f"Unknown upstream: {upstream}")
+                _limiters[upstream] = limiter
+    return limiter
+
+def rate_limit_stats() -> Dict[str, Any]:
+    if not settings.RATE_LIMIT_ENABLED:
+        return {"enabled": False}
+    return {upstream: get_rate_limiter(upstream).stats() for upstream in ('textract', 'gemini')}
@@ -0,0 +1,55 @@
+import hashlib
+import threading
+from typing import Optional, Dict, Any
+
+from app.services.s3_service import S3Service
+
+class S3Cache:
+    """Key/value cache stored under an S3 prefix; expiry is left to the bucket's lifecycle rules"""
+
+    def __init__(self, prefix: str):
+        self.prefix = prefix.rstrip('/') + '/'
+        self.s3_service = S3Service()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _key(self, key: str) -> str:
+        return self.prefix + hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            data = self.s3_service.get_object(self._key(key))
+        except Exception as e:
+            print(f"⚠️ S3 cache read failed: {str(e)}")
+            data = None
+
+        with self._lock:
+            if data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return data
+
+    def set(self, key: str, data: bytes) -> None:
+        try:
+            self.s3_service.put_object(self._key(key), data, 'application/octet-stream')
+        except Exception as e:
+            print(f"⚠️ S3 cache write failed: {str(e)}")
+
+    def delete(self, key: str) -> None:
+        self.s3_service.delete_file(self._key(key))
+
+    def purge(self) -> int:
+        return self.s3_service.delete_prefix(self.prefix)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'backend': 's3',
+                'prefix': self.prefix
+            }
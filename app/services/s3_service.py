@@ -1,19 +1,14 @@
-import boto3
 from botocore.exceptions import ClientError
-from typing import Optional
+from typing import Optional, List, Dict, Iterator
+from urllib.parse import unquote
 
 from app.core.config import settings
+from app.services.aws_clients import get_s3_client, get_s3_transfer_config
 
 
 class S3Service:
     def __init__(self):
-        kwargs = {'region_name': settings.S3_REGION}
-
-        if settings.S3_ACCESS_KEY_ID and settings.S3_SECRET_ACCESS_KEY:
-            kwargs['aws_access_key_id'] = settings.S3_ACCESS_KEY_ID
-            kwargs['aws_secret_access_key'] = settings.S3_SECRET_ACCESS_KEY
-
-        self.s3_client = boto3.client('s3', **kwargs)
+        self.s3_client = get_s3_client()
         self.bucket_name = settings.S3_BUCKET_NAME
 
     def upload_file(self, file_path: str, s3_key: str, content_type: str) -> str:
@@ -26,17 +21,168 @@ class S3Service:
                     ExtraArgs={
                         'ContentType': content_type,
                         'CacheControl': 'max-age=31536000'
-                    }
+                    },
+                    Config=get_s3_transfer_config()
                 )
 
-            url = f"https://{self.bucket_name}.s3.{settings.S3_REGION}.amazonaws.com/{s3_key}"
-            return url
+            return self.get_public_url(s3_key)
 
         except ClientError as e:
             raise Exception(f"S3 upload failed: {str(e)}")
         except FileNotFoundError:
             raise Exception(f"File not found: {file_path}")
 
+    def put_object(self, s3_key: str, data: bytes, content_type: str) -> str:
+        try:
+            self.s3_client.put_object(
+                Bucket=self.bucket_name,
+                Key=s3_key,
+                Body=data,
+                ContentType=content_type,
+                CacheControl='max-age=31536000'
+            )
+            return self.get_public_url(s3_key)
+        except ClientError as e:
+            raise Exception(f"S3 upload failed: {str(e)}")
+
+    def create_multipart_upload(self, s3_key: str, content_type: str) -> str:
+        try:
+            response = self.s3_client.create_multipart_upload(
+                Bucket=self.bucket_name,
+                Key=s3_key,
+                ContentType=content_type,
+                CacheControl='max-age=31536000'
+            )
+            return response['UploadId']
+        except ClientError as e:
+            raise Exception(f"S3 multipart upload failed to start: {str(e)}")
+
+    def upload_part(self, s3_key: str, upload_id: str, part_number: int, data: bytes) -> Dict:
+        try:
+            response = self.s3_client.upload_part(
+                Bucket=self.bucket_name,
+                Key=s3_key,
+                UploadId=upload_id,
+                PartNumber=part_number,
+                Body=data
+            )
+            return {'PartNumber': part_number, 'ETag': response['ETag']}
+        except ClientError as e:
+            raise Exception(f"S3 upload of part {part_number} failed: {str(e)}")
+
+    def complete_multipart_upload(self, s3_key: str, upload_id: str, parts: List[Dict]) -> str:
+        try:
+            self.s3_client.complete_multipart_upload(
+                Bucket=self.bucket_name,
+                Key=s3_key,
+                UploadId=upload_id,
+                MultipartUpload={'Parts': parts}
+            )
+            return self.get_public_url(s3_key)
+        except ClientError as e:
+            raise Exception(f"S3 multipart upload failed to complete: {str(e)}")
+
+    def abort_multipart_upload(self, s3_key: str, upload_id: str) -> None:
+        try:
+            self.s3_client.abort_multipart_upload(
+                Bucket=self.bucket_name,
+                Key=s3_key,
+                UploadId=upload_id
+            )
+        except ClientError as e:
+            print(f"S3 multipart abort failed: {str(e)}")
+
+    def generate_presigned_upload_post(
+        self,
+        s3_key: str,
+        content_type: str,
+        metadata: Dict[str, str],
+        max_size_bytes: int
+    ) -> Dict:
+        """Presigned POST whose policy pins the type and metadata and caps the size at max_size_bytes"""
+        fields = {'Content-Type': content_type}
+        fields.update({f"x-amz-meta-{name}": value for name, value in metadata.items()})
+        conditions = [{name: value} for name, value in fields.items()]
+        conditions.append(['content-length-range', 1, max_size_bytes])
+
+        try:
+            return self.s3_client.generate_presigned_post(
+                Bucket=self.bucket_name,
+                Key=s3_key,
+                Fields=fields,
+                Conditions=conditions,
+                ExpiresIn=settings.S3_PRESIGNED_URL_EXPIRY_SECONDS
+            )
+        except ClientError as e:
+            raise Exception(f"Failed to create presigned upload URL: {str(e)}")
+
+    def find_object_key(self, prefix: str) -> Optional[str]:
+        try:
+            response = self.s3_client.list_objects_v2(
+                Bucket=self.bucket_name,
+                Prefix=prefix,
+                MaxKeys=1
+            )
+        except ClientError as e:
+            raise Exception(f"S3 listing failed: {str(e)}")
+
+        contents = response.get('Contents', [])
+        return contents[0]['Key'] if contents else None
+
+    def head_object(self, s3_key: str) -> Dict:
+        try:
+            return self.s3_client.head_object(Bucket=self.bucket_name, Key=s3_key)
+        except ClientError as e:
+            raise Exception(f"S3 head request failed: {str(e)}")
+
+    def read_object_range(self, s3_key: str, length: int) -> bytes:
+        try:
+            response = self.s3_client.get_object(
+                Bucket=self.bucket_name,
+                Key=s3_key,
+                Range=f"bytes=0-{length - 1}"
+            )
+            return response['Body'].read()
+        except ClientError as e:
+            raise Exception(f"S3 read failed: {str(e)}")
+
+    def get_object(self, s3_key: str) -> Optional[bytes]:
+        try:
+            response = self.s3_client.get_object(Bucket=self.bucket_name, Key=s3_key)
+            return response['Body'].read()
+        except ClientError as e:
+            if e.response['Error']['Code'] in ('NoSuchKey', '404'):
+                return None
+            raise Exception(f"S3 read failed: {str(e)}")
+
+    def iter_object_chunks(self, s3_key: str, chunk_size: int) -> Iterator[bytes]:
+        try:
+            response = self.s3_client.get_object(Bucket=self.bucket_name, Key=s3_key)
+            yield from response['Body'].iter_chunks(chunk_size)
+        except ClientError as e:
+            if e.response['Error']['Code'] in ('NoSuchKey', '404'):
+                raise FileNotFoundError(f"S3 object not found: {s3_key}")
+            raise Exception(f"S3 read failed: {str(e)}")
+
+    def key_from_url(self, url: str) -> Optional[str]:
+        prefix = self.get_public_url('')
+        if self.bucket_name and url.startswith(prefix):
+            return unquote(url[len(prefix):].split('?')[0])
+        return None
+
+    def delete_prefix(self, prefix: str) -> int:
+        deleted = 0
+        try:
+            paginator = self.s3_client.get_paginator('list_objects_v2')
+            for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix):
+                keys = [{'Key': item['Key']} for item in page.get('Contents', [])]
+                if keys:
+                    self.s3_client.delete_objects(Bucket=self.bucket_name, Delete={'Objects': keys})
+                    deleted += len(keys)
+        except ClientError as e:
+            raise Exception(f"S3 delete failed: {str(e)}")
+        return deleted
+
     def delete_file(self, s3_key: str) -> bool:
         try:
             self.s3_client.delete_object(Bucket=self.bucket_name, Key=s3_key)
@@ -46,4 +192,6 @@ class S3Service:
             return False
 
     def get_public_url(self, s3_key: str) -> str:
+        if settings.S3_ENDPOINT_URL:
+            return f"{settings.S3_ENDPOINT_URL.rstrip('/')}/{self.bucket_name}/{s3_key}"
         return f"https://{self.bucket_name}.s3.{settings.S3_REGION}.amazonaws.com/{s3_key}"
@@ -0,0 +1,134 @@
+import os
+import threading
+from typing import Any, Callable, Dict
+
+from app.core.config import settings
+from app.services.stubs.behaviour import StubBehaviour
+from app.services.stubs.gemini_stub import FakeGeminiModel, FakeGeminiResponse
+from app.services.stubs.recordings import RecordingStore, RecordingClient, ReplayClient
+from app.services.stubs.s3_stub import FakeS3Client
+from app.services.stubs.textract_stub import FakeTextractClient
+
+BACKENDS = ('live', 'record', 'replay', 'synthetic')
+UPSTREAMS = ('textract', 'gemini', 's3')
+
+RECORDED_OPERATIONS = {
+    'textract': (
+        'analyze_document', 'detect_document_text',
+        'start_document_analysis', 'get_document_analysis',
+        'start_document_text_detection', 'get_document_text_detection'
+    ),
+    'gemini': ('generate_content',)
+}
+
+_clients: Dict[str, Any] = {}
+_stores: Dict[str, RecordingStore] = {}
+_lock = threading.Lock()
+
+def backend_for(upstream: str) -> str:
+    """The upstream's own setting (TEXTRACT_BACKEND, ...) wins over SERVICE_BACKEND"""
+    backend = (getattr(settings, f"{upstream.upper()}_BACKEND") or settings.SERVICE_BACKEND).lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown {upstream} backend: {backend}. Use {', '.join(BACKENDS)}")
+    return backend
+
+def _behaviour(upstream: str) -> StubBehaviour:
+    prefix = upstream.upper()
+    return StubBehaviour(
+        latency_ms=getattr(settings, f"{prefix}_STUB_LATENCY_MS"),
+        jitter_ms=getattr(settings, f"{prefix}_STUB_JITTER_MS"),
+        distribution=settings.STUB_LATENCY_DISTRIBUTION,
+        error_rate=settings.STUB_ERROR_RATE,
+        throttle_rate=settings.STUB_THROTTLE_RATE,
+        capacity=settings.TEXTRACT_STUB_CAPACITY if upstream == 'textract' else None,
+        seed=settings.STUB_SEED
+    )
+
+def _read_stored_object(bucket: str, key: str) -> bytes:
+    from app.services.aws_clients import get_s3_client
+    return get_s3_client().get_object(Bucket=bucket, Key=key)['Body'].read()
+
+def _stand_in(upstream: str) -> Any:
+    if upstream == 'textract':
+        return FakeTextractClient(
+            behaviour=_behaviour('textract'),
+            object_reader=_read_stored_object,
+            async_job_ms=settings.TEXTRACT_STUB_LATENCY_MS * 5,
+            lines=30
+        )
+    if upstream == 'gemini':
+        return FakeGeminiModel(behaviour=_behaviour('gemini'))
+    return FakeS3Client(os.path.join(settings.STUB_DIR, 's3'), behaviour=_behaviour('s3'))
+
+def _store(upstream: str) -> RecordingStore:
+    if upstream not in _stores:
+        _stores[upstream] = RecordingStore(settings.STUB_DIR, upstream)
+    return _stores[upstream]
+
+def _build(upstream: str, backend: str, live_factory: Callable[[], Any]) -> Any:
+    # S3 holds what the pipeline itself uploads, so replay uses the local object store
+    # and record talks to the real bucket; there is no response to replay by hash.
+    if upstream == 's3':
+        return live_factory() if backend == 'record' else _stand_in('s3')
+
+    if backend == 'synthetic':
+        return _stand_in(upstream)
+    if upstream == 'gemini':
+        encode = lambda response: {'text': response.text}
+        decode = lambda recorded: FakeGeminiResponse(recorded['text'])
+        object_reader = None
+    else:
+        encode = None
+        decode = None
+        # Async jobs point at an upload key with a fresh UUID; key them by the object's bytes instead.
+        object_reader = _read_stored_object
+
+    if backend == 'record':
+        kwargs = {'encode': encode} if encode else {}
+        return RecordingClient(
+            live_factory(), _store(upstream), RECORDED_OPERATIONS[upstream], object_reader=object_reader, **kwargs
+        )
+
+    kwargs = {'decode': decode} if decode else {}
+    return ReplayClient(
+        _stand_in(upstream),
+        _store(upstream),
+        RECORDED_OPERATIONS[upstream],
+        synthesize_misses=settings.STUB_REPLAY_FALLBACK,
+        object_reader=object_reader,
+        **kwargs
+    )
+
+def get_backend_client(upstream: str, live_factory: Callable[[], Any]) -> Any:
+    """Client for `upstream` per its backend setting; `live_factory` builds the real one"""
+    backend = backend_for(upstream)
+    if backend == 'live':
+        return live_factory()
+
+    client = _clients.get(upstream)
+    if client is None:
+        with _lock:
+            client = _clients.get(upstream)
+            if client is None:
+                client = _build(upstream, backend, live_factory)
+                _clients[upstream] = client
+    return client
+
+def backend_stats() -> Dict[str, Any]:
+    stats = {}
+    for upstream in UPSTREAMS:
+        backend = backend_for(upstream)
+        entry = {'backend': backend}
+        client = _clients.get(upstream)
+        stand_in = getattr(client, '_fallback', client)
+        if hasattr(stand_in, 'behaviour'):
+            entry['stand_in'] = stand_in.behaviour.stats()
+        if upstream in _stores:
+            entry['recordings'] = _stores[upstream].stats()
+        stats[upstream] = entry
+    return stats
+
+def reset_backends() -> None:
+    with _lock:
+        _clients.clear()
+        _stores.clear()
@@ -0,0 +1,88 @@
+import math
+import random
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+
+LATENCY_DISTRIBUTIONS = ('fixed', 'uniform', 'normal', 'lognormal')
+
+class StubBehaviour:
+    """Latency, error and throttling model shared by the local stand-ins.
+
+    `lognormal` keeps the mean at latency_ms with jitter_ms as standard deviation,
+    which gives the long right tail real upstream latencies have.
+    """
+
+    def __init__(
+        self,
+        latency_ms: float = 200,
+        jitter_ms: float = 50,
+        distribution: str = 'uniform',
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        capacity: Optional[int] = None,
+        seed: Optional[int] = None
+    ):
+        if distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {distribution}. Use {', '.join(LATENCY_DISTRIBUTIONS)}")
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.distribution = distribution
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.capacity = capacity or None
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.calls = 0
+        self.errors = 0
+        self.throttled = 0
+        self.peak_in_flight = 0
+
+    def sample_latency(self) -> float:
+        """One call's latency in seconds"""
+        mean, spread = self.latency_ms, self.jitter_ms
+        if self.distribution == 'fixed' or mean <= 0:
+            latency = mean
+        elif self.distribution == 'uniform':
+            latency = self._random.uniform(mean - spread, mean + spread)
+        elif self.distribution == 'normal':
+            latency = self._random.gauss(mean, spread)
+        else:
+            sigma = math.sqrt(math.log(1 + (spread / mean) ** 2))
+            latency = self._random.lognormvariate(math.log(mean) - sigma ** 2 / 2, sigma)
+        return max(0.0, latency) / 1000
+
+    @contextmanager
+    def call(self, throttle_error: Callable[[], Exception], server_error: Callable[[], Exception]) -> Iterator[float]:
+        """Admit one simulated call, or raise the upstream's throttling / server error; yields the sampled latency"""
+        with self._lock:
+            self.calls += 1
+            over_capacity = self.capacity is not None and self._in_flight >= self.capacity
+            if over_capacity or (self.throttle_rate and self._random.random() < self.throttle_rate):
+                self.throttled += 1
+                raise throttle_error()
+            if self.error_rate and self._random.random() < self.error_rate:
+                self.errors += 1
+                raise server_error()
+            self._in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self._in_flight)
+            delay = self.sample_latency()
+
+        try:
+            yield delay
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'distribution': self.distribution,
+                'latency_ms': self.latency_ms,
+                'calls': self.calls,
+                'errors': self.errors,
+                'throttled': self.throttled,
+                'in_flight': self._in_flight,
+                'peak_in_flight': self.peak_in_flight
+            }
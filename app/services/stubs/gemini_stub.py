@@ -0,0 +1,74 @@
+import json
+import re
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from google.api_core import exceptions as google_exceptions
+
+from app.services.stubs.behaviour import StubBehaviour
+
+SCHEMA_MARKER = "JSON SCHEMA TO FILL:\n"
+MARKDOWN_PATTERN = re.compile(r"Current Markdown:\n```markdown\n(.*)\n```", re.DOTALL)
+
+class FakeGeminiResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+class FakeGeminiModel:
+    """Stand-in for genai.GenerativeModel that answers the refinement and extraction prompts plausibly.
+
+    Refinement returns the Textract markdown unchanged; extraction fills the
+    schema with typed placeholder values. Sampled latencies longer than the
+    request timeout fail the way the real client does.
+    """
+
+    def __init__(self, behaviour: Optional[StubBehaviour] = None):
+        self.behaviour = behaviour or StubBehaviour(latency_ms=4000, jitter_ms=1500, distribution='lognormal')
+
+    @contextmanager
+    def simulated_call(self, operation: str, timeout: Optional[float] = None) -> Iterator[None]:
+        with self.behaviour.call(
+            lambda: google_exceptions.TooManyRequests("Resource has been exhausted (e.g. check quota)."),
+            lambda: google_exceptions.InternalServerError("An internal error has occurred.")
+        ) as delay:
+            if timeout is not None and delay > timeout:
+                time.sleep(timeout)
+                raise google_exceptions.DeadlineExceeded("Deadline Exceeded")
+            time.sleep(delay)
+            yield
+
+    def generate_content(self, contents: List[Any], request_options: Optional[Dict] = None, **kwargs) -> FakeGeminiResponse:
+        prompt = next((part for part in contents if isinstance(part, str)), "")
+        with self.simulated_call('generate_content', (request_options or {}).get('timeout')):
+            return FakeGeminiResponse(self._answer(prompt))
+
+    def _answer(self, prompt: str) -> str:
+        markdown = MARKDOWN_PATTERN.search(prompt)
+        if markdown:
+            return markdown.group(1)
+
+        if SCHEMA_MARKER in prompt:
+            schema_text = prompt.split(SCHEMA_MARKER, 1)[1]
+            schema_text = schema_text[:schema_text.rfind('}') + 1]
+            try:
+                return json.dumps(_fill_schema(json.loads(schema_text)))
+            except ValueError:
+                return "{}"
+
+        return "Stub response"
+
+def _fill_schema(schema: Any) -> Any:
+    if isinstance(schema, dict):
+        return {key: _fill_schema(value) for key, value in schema.items()}
+    if isinstance(schema, list):
+        return [_fill_schema(schema[0])] if schema else []
+    return {
+        'number': 0,
+        'integer': 0,
+        'boolean': False,
+        'date': '2024-01-01',
+        'datetime': '2024-01-01T00:00:00',
+        'array': [],
+        'object': {}
+    }.get(str(schema).lower(), 'sample')
@@ -0,0 +1,148 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from typing import Any, Callable, Iterable, Optional
+
+# Per-call knobs and idempotency tokens that do not change what the upstream answers.
+IGNORED_REQUEST_KEYS = ('request_options', 'ClientRequestToken')
+
+def _canonical(value: Any) -> Any:
+    if isinstance(value, (bytes, bytearray)):
+        return {'sha256': hashlib.sha256(value).hexdigest()}
+    if isinstance(value, dict):
+        return {str(key): _canonical(item) for key, item in sorted(value.items(), key=lambda pair: str(pair[0]))}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(item) for item in value]
+    return value
+
+def request_key(
+    operation: str,
+    args: tuple,
+    kwargs: dict,
+    object_reader: Optional[Callable[[str, str], bytes]] = None
+) -> str:
+    """Stable hash of one call; byte payloads count by content hash.
+
+    With `object_reader`, an S3 DocumentLocation also counts by the stored object's
+    content, since upload keys carry a fresh UUID on every run.
+    """
+    kwargs = {key: value for key, value in kwargs.items() if key not in IGNORED_REQUEST_KEYS}
+    location = kwargs.get('DocumentLocation')
+    if object_reader is not None and location:
+        s3_object = location['S3Object']
+        kwargs['DocumentLocation'] = object_reader(s3_object['Bucket'], s3_object['Name'])
+    payload = json.dumps([operation, _canonical(list(args)), _canonical(kwargs)], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+class RecordingStore:
+    """Upstream responses saved as one JSON file per request hash under <directory>/<upstream>/"""
+
+    def __init__(self, directory: str, upstream: str):
+        self.directory = os.path.join(directory, upstream)
+        os.makedirs(self.directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.recorded = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[Any]:
+        try:
+            with open(self._path(key)) as f:
+                response = json.load(f)['response']
+        except (OSError, ValueError, KeyError):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return response
+
+    def put(self, key: str, operation: str, response: Any) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(suffix='.tmp', dir=os.path.dirname(path))
+        with os.fdopen(fd, 'w') as f:
+            json.dump({'operation': operation, 'response': response}, f, default=str)
+        os.replace(temp_path, path)
+        with self._lock:
+            self.recorded += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'directory': self.directory, 'hits': self.hits, 'misses': self.misses, 'recorded': self.recorded}
+
+def _drop_metadata(response: Any) -> Any:
+    if isinstance(response, dict):
+        return {key: value for key, value in response.items() if key != 'ResponseMetadata'}
+    return response
+
+class RecordingClient:
+    """Passes `operations` through to the live client and saves each response under its request hash"""
+
+    def __init__(
+        self,
+        live: Any,
+        store: RecordingStore,
+        operations: Iterable[str],
+        encode: Callable[[Any], Any] = _drop_metadata,
+        object_reader: Optional[Callable[[str, str], bytes]] = None
+    ):
+        self._live = live
+        self._store = store
+        self._operations = set(operations)
+        self._encode = encode
+        self._object_reader = object_reader
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._live, name)
+        if name not in self._operations:
+            return attr
+
+        def record(*args, **kwargs):
+            response = attr(*args, **kwargs)
+            self._store.put(request_key(name, args, kwargs, self._object_reader), name, self._encode(response))
+            return response
+        return record
+
+class ReplayClient:
+    """Answers `operations` from recorded responses with the fallback stand-in's latency and faults.
+
+    A request that was never recorded goes to the fallback stand-in when
+    `synthesize_misses` is set, and raises LookupError otherwise.
+    """
+
+    def __init__(
+        self,
+        fallback: Any,
+        store: RecordingStore,
+        operations: Iterable[str],
+        decode: Callable[[Any], Any] = lambda response: response,
+        synthesize_misses: bool = True,
+        object_reader: Optional[Callable[[str, str], bytes]] = None
+    ):
+        self._fallback = fallback
+        self._store = store
+        self._operations = set(operations)
+        self._decode = decode
+        self._synthesize_misses = synthesize_misses
+        self._object_reader = object_reader
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._fallback, name)
+        if name not in self._operations:
+            return attr
+
+        def replay(*args, **kwargs):
+            recorded = self._store.get(request_key(name, args, kwargs, self._object_reader))
+            if recorded is None:
+                if not self._synthesize_misses:
+                    raise LookupError(f"No recorded response for {name} in {self._store.directory}")
+                return attr(*args, **kwargs)
+            with self._fallback.simulated_call(name):
+                return self._decode(recorded)
+        return replay
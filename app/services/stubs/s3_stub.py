@@ -0,0 +1,227 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional
+from botocore.exceptions import ClientError
+
+from app.services.stubs.behaviour import StubBehaviour
+
+class _Body:
+    def __init__(self, data: bytes):
+        self._data = data
+        self._offset = 0
+
+    def read(self, amount: Optional[int] = None) -> bytes:
+        end = len(self._data) if amount is None else self._offset + amount
+        chunk = self._data[self._offset:end]
+        self._offset += len(chunk)
+        return chunk
+
+    def iter_chunks(self, chunk_size: int = 1024) -> Iterator[bytes]:
+        while True:
+            chunk = self.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+class _ListPaginator:
+    def __init__(self, client: 'FakeS3Client'):
+        self.client = client
+
+    def paginate(self, Bucket: str, Prefix: str = '', **kwargs) -> Iterator[Dict]:
+        token = None
+        while True:
+            page = self.client.list_objects_v2(Bucket=Bucket, Prefix=Prefix, ContinuationToken=token)
+            yield page
+            token = page.get('NextContinuationToken')
+            if not token:
+                return
+
+class FakeS3Client:
+    """Local object store with the slice of the boto3 S3 API that S3Service uses.
+
+    Objects live under <directory>/<bucket>/objects with metadata beside them,
+    so documents uploaded in one run are still there for the next replay.
+    """
+
+    def __init__(self, directory: str, behaviour: Optional[StubBehaviour] = None):
+        self.directory = directory
+        self.behaviour = behaviour or StubBehaviour(latency_ms=20, jitter_ms=10)
+        self._uploads: Dict[str, Dict] = {}
+
+    @contextmanager
+    def simulated_call(self, operation: str) -> Iterator[None]:
+        with self.behaviour.call(
+            lambda: ClientError({'Error': {'Code': 'SlowDown', 'Message': 'Please reduce your request rate.'}}, operation),
+            lambda: ClientError({'Error': {'Code': 'InternalError', 'Message': 'We encountered an internal error.'}}, operation)
+        ) as delay:
+            time.sleep(delay)
+            yield
+
+    def _object_path(self, bucket: str, key: str) -> str:
+        return os.path.join(self.directory, bucket, 'objects', key)
+
+    def _meta_path(self, bucket: str, key: str) -> str:
+        return os.path.join(self.directory, bucket, 'meta', f"{key}.json")
+
+    def _missing(self, operation: str, key: str) -> ClientError:
+        return ClientError({'Error': {'Code': 'NoSuchKey', 'Message': f'The specified key does not exist: {key}'}}, operation)
+
+    def _write(self, bucket: str, key: str, source: BinaryIO, content_type: Optional[str], metadata: Optional[Dict]) -> str:
+        path = self._object_path(bucket, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        digest = hashlib.md5()
+        fd, temp_path = tempfile.mkstemp(suffix='.tmp', dir=os.path.dirname(path))
+        with os.fdopen(fd, 'wb') as f:
+            for chunk in iter(lambda: source.read(1024 * 1024), b''):
+                digest.update(chunk)
+                f.write(chunk)
+        os.replace(temp_path, path)
+
+        etag = f'"{digest.hexdigest()}"'
+        meta_path = self._meta_path(bucket, key)
+        os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+        with open(meta_path, 'w') as f:
+            json.dump({'ContentType': content_type or 'binary/octet-stream', 'Metadata': metadata or {}, 'ETag': etag}, f)
+        return etag
+
+    def _read_meta(self, bucket: str, key: str) -> Dict:
+        try:
+            with open(self._meta_path(bucket, key)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {'ContentType': 'binary/octet-stream', 'Metadata': {}}
+
+    def put_object(self, Bucket: str, Key: str, Body: Any = b'', ContentType: Optional[str] = None, Metadata: Optional[Dict] = None, **kwargs) -> Dict:
+        with self.simulated_call('PutObject'):
+            source = _Body(Body) if isinstance(Body, (bytes, bytearray)) else Body
+            return {'ETag': self._write(Bucket, Key, source, ContentType, Metadata)}
+
+    def upload_fileobj(self, Fileobj: BinaryIO, Bucket: str, Key: str, ExtraArgs: Optional[Dict] = None, Config: Any = None) -> None:
+        extra = ExtraArgs or {}
+        with self.simulated_call('PutObject'):
+            self._write(Bucket, Key, Fileobj, extra.get('ContentType'), extra.get('Metadata'))
+
+    def create_multipart_upload(self, Bucket: str, Key: str, ContentType: Optional[str] = None, **kwargs) -> Dict:
+        with self.simulated_call('CreateMultipartUpload'):
+            upload_id = uuid.uuid4().hex
+            os.makedirs(os.path.join(self.directory, '.multipart', upload_id), exist_ok=True)
+            self._uploads[upload_id] = {'content_type': ContentType}
+            return {'UploadId': upload_id, 'Bucket': Bucket, 'Key': Key}
+
+    def upload_part(self, Bucket: str, Key: str, UploadId: str, PartNumber: int, Body: bytes, **kwargs) -> Dict:
+        with self.simulated_call('UploadPart'):
+            part_dir = os.path.join(self.directory, '.multipart', UploadId)
+            if not os.path.isdir(part_dir):
+                raise ClientError({'Error': {'Code': 'NoSuchUpload', 'Message': 'The specified upload does not exist.'}}, 'UploadPart')
+            with open(os.path.join(part_dir, str(PartNumber)), 'wb') as f:
+                f.write(Body)
+            return {'ETag': f'"{hashlib.md5(Body).hexdigest()}"'}
+
+    def complete_multipart_upload(self, Bucket: str, Key: str, UploadId: str, MultipartUpload: Dict, **kwargs) -> Dict:
+        with self.simulated_call('CompleteMultipartUpload'):
+            part_dir = os.path.join(self.directory, '.multipart', UploadId)
+            if not os.path.isdir(part_dir):
+                raise ClientError({'Error': {'Code': 'NoSuchUpload', 'Message': 'The specified upload does not exist.'}}, 'CompleteMultipartUpload')
+            combined_path = os.path.join(part_dir, 'combined')
+            with open(combined_path, 'wb') as combined:
+                for part in sorted(MultipartUpload['Parts'], key=lambda part: part['PartNumber']):
+                    with open(os.path.join(part_dir, str(part['PartNumber'])), 'rb') as f:
+                        shutil.copyfileobj(f, combined)
+            content_type = self._uploads.pop(UploadId, {}).get('content_type')
+            with open(combined_path, 'rb') as combined:
+                etag = self._write(Bucket, Key, combined, content_type, None)
+            shutil.rmtree(part_dir, ignore_errors=True)
+            return {'ETag': etag, 'Bucket': Bucket, 'Key': Key}
+
+    def abort_multipart_upload(self, Bucket: str, Key: str, UploadId: str, **kwargs) -> Dict:
+        self._uploads.pop(UploadId, None)
+        shutil.rmtree(os.path.join(self.directory, '.multipart', UploadId), ignore_errors=True)
+        return {}
+
+    def generate_presigned_url(self, ClientMethod: str, Params: Dict, ExpiresIn: int = 3600, **kwargs) -> str:
+        """Points at the local object path; nothing serves it, so browser uploads need the live backend"""
+        return f"file://{os.path.abspath(self._object_path(Params['Bucket'], Params['Key']))}?method={ClientMethod}"
+
+    def generate_presigned_post(self, Bucket: str, Key: str, Fields: Optional[Dict] = None, Conditions: Optional[List] = None, ExpiresIn: int = 3600) -> Dict:
+        """Same shape as boto3's; the URL is local, so clients still need the live backend to post to it"""
+        return {
+            'url': f"file://{os.path.abspath(os.path.join(self.directory, Bucket, 'objects'))}",
+            'fields': {'key': Key, **(Fields or {})}
+        }
+
+    def list_objects_v2(self, Bucket: str, Prefix: str = '', MaxKeys: int = 1000, ContinuationToken: Optional[str] = None, **kwargs) -> Dict:
+        with self.simulated_call('ListObjectsV2'):
+            root = os.path.join(self.directory, Bucket, 'objects')
+            keys: List[str] = []
+            for current, _, files in os.walk(root):
+                for name in files:
+                    if name.endswith('.tmp'):
+                        continue
+                    key = os.path.relpath(os.path.join(current, name), root).replace(os.sep, '/')
+                    if key.startswith(Prefix):
+                        keys.append(key)
+            keys.sort()
+
+            start = int(ContinuationToken or 0)
+            page = keys[start:start + MaxKeys]
+            response = {
+                'KeyCount': len(page),
+                'Contents': [
+                    {'Key': key, 'Size': os.path.getsize(os.path.join(root, key))} for key in page
+                ]
+            }
+            if start + MaxKeys < len(keys):
+                response['IsTruncated'] = True
+                response['NextContinuationToken'] = str(start + MaxKeys)
+            return response
+
+    def get_paginator(self, operation_name: str) -> _ListPaginator:
+        if operation_name != 'list_objects_v2':
+            raise NotImplementedError(f"FakeS3Client has no paginator for {operation_name}")
+        return _ListPaginator(self)
+
+    def head_object(self, Bucket: str, Key: str, **kwargs) -> Dict:
+        with self.simulated_call('HeadObject'):
+            path = self._object_path(Bucket, Key)
+            if not os.path.isfile(path):
+                raise ClientError({'Error': {'Code': '404', 'Message': 'Not Found'}}, 'HeadObject')
+            return {'ContentLength': os.path.getsize(path), **self._read_meta(Bucket, Key)}
+
+    def get_object(self, Bucket: str, Key: str, Range: Optional[str] = None, **kwargs) -> Dict:
+        with self.simulated_call('GetObject'):
+            path = self._object_path(Bucket, Key)
+            try:
+                with open(path, 'rb') as f:
+                    if Range:
+                        start, _, end = Range.replace('bytes=', '').partition('-')
+                        f.seek(int(start))
+                        data = f.read(int(end) - int(start) + 1 if end else -1)
+                    else:
+                        data = f.read()
+            except FileNotFoundError:
+                raise self._missing('GetObject', Key)
+            return {'Body': _Body(data), 'ContentLength': len(data), **self._read_meta(Bucket, Key)}
+
+    def _delete(self, bucket: str, key: str) -> None:
+        for path in (self._object_path(bucket, key), self._meta_path(bucket, key)):
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+
+    def delete_object(self, Bucket: str, Key: str, **kwargs) -> Dict:
+        with self.simulated_call('DeleteObject'):
+            self._delete(Bucket, Key)
+            return {}
+
+    def delete_objects(self, Bucket: str, Delete: Dict, **kwargs) -> Dict:
+        with self.simulated_call('DeleteObjects'):
+            for item in Delete.get('Objects', []):
+                self._delete(Bucket, item['Key'])
+            return {'Deleted': [{'Key': item['Key']} for item in Delete.get('Objects', [])]}
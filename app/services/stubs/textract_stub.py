@@ -0,0 +1,207 @@
+import io
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+from botocore.exceptions import ClientError
+from PIL import Image
+
+from app.services.stubs.behaviour import StubBehaviour
+
+SAMPLE_WORDS = [
+    'Invoice', 'number', 'date', 'customer', 'account', 'total', 'amount', 'due',
+    'payment', 'terms', 'description', 'quantity', 'price', 'tax', 'balance', 'reference'
+]
+
+class FakeTextractClient:
+    """In-process stand-in for the boto3 Textract client with configurable latency, errors and throttling.
+
+    Calls beyond `capacity` concurrent requests fail with ThrottlingException,
+    the way Textract rejects traffic above an account's TPS quota. Asynchronous
+    jobs count the stored document's pages through `object_reader` when given.
+    """
+
+    def __init__(
+        self,
+        latency_ms: float = 200,
+        jitter_ms: float = 50,
+        capacity: Optional[int] = None,
+        throttle_rate: float = 0.0,
+        seed: Optional[int] = None,
+        async_pages: int = 3,
+        async_job_ms: float = 1000,
+        async_page_size: int = 1000,
+        error_rate: float = 0.0,
+        distribution: str = 'uniform',
+        behaviour: Optional[StubBehaviour] = None,
+        object_reader: Optional[Callable[[str, str], bytes]] = None,
+        lines: int = 1,
+        words_per_line: int = 8
+    ):
+        self.behaviour = behaviour or StubBehaviour(
+            latency_ms=latency_ms,
+            jitter_ms=jitter_ms,
+            distribution=distribution,
+            error_rate=error_rate,
+            throttle_rate=throttle_rate,
+            capacity=capacity,
+            seed=seed
+        )
+        self._lock = threading.Lock()
+        self.async_pages = async_pages
+        self.async_job_ms = async_job_ms
+        self.async_page_size = async_page_size
+        self.object_reader = object_reader
+        self.lines = max(1, lines)
+        self.words_per_line = max(1, words_per_line)
+        self._jobs: Dict[str, Dict] = {}
+        self._job_tokens: Dict[str, str] = {}
+
+    @property
+    def calls(self) -> int:
+        return self.behaviour.calls
+
+    @property
+    def throttled(self) -> int:
+        return self.behaviour.throttled
+
+    @property
+    def peak_in_flight(self) -> int:
+        return self.behaviour.peak_in_flight
+
+    @contextmanager
+    def simulated_call(self, operation: str) -> Iterator[None]:
+        with self.behaviour.call(
+            lambda: ClientError({'Error': {'Code': 'ThrottlingException', 'Message': 'Rate exceeded'}}, operation),
+            lambda: ClientError({'Error': {'Code': 'InternalServerError', 'Message': 'Internal server error'}}, operation)
+        ) as delay:
+            time.sleep(delay)
+            yield
+
+    def analyze_document(self, Document: Dict, FeatureTypes: List[str], **kwargs) -> Dict:
+        with self.simulated_call('AnalyzeDocument'):
+            return self._response(Document.get('Bytes', b''))
+
+    def detect_document_text(self, Document: Dict, **kwargs) -> Dict:
+        return self.analyze_document(Document, [], **kwargs)
+
+    def start_document_text_detection(self, DocumentLocation: Dict, **kwargs) -> Dict:
+        return self.start_document_analysis(DocumentLocation, [], **kwargs)
+
+    def get_document_text_detection(self, JobId: str, **kwargs) -> Dict:
+        return self.get_document_analysis(JobId, **kwargs)
+
+    def start_document_analysis(self, DocumentLocation: Dict, FeatureTypes: List[str], **kwargs) -> Dict:
+        """Asynchronous jobs succeed after async_job_ms with one page of stub blocks per document page"""
+        token = kwargs.get('ClientRequestToken')
+        with self._lock:
+            if token in self._job_tokens:
+                return {'JobId': self._job_tokens[token]}
+        job_id = uuid.uuid4().hex
+        location = DocumentLocation['S3Object']
+        page_count = self._count_pages(location['Bucket'], location['Name'])
+        blocks = []
+        for page_number in range(1, page_count + 1):
+            for block in self._response(f"{location['Name']}#{page_number}".encode())['Blocks']:
+                blocks.append({**block, 'Id': f"{block['Id']}-p{page_number}", 'Page': page_number})
+                if 'Relationships' in block:
+                    blocks[-1]['Relationships'] = [
+                        {'Type': rel['Type'], 'Ids': [f"{child}-p{page_number}" for child in rel['Ids']]}
+                        for rel in block['Relationships']
+                    ]
+        with self.simulated_call('StartDocumentAnalysis'), self._lock:
+            self._jobs[job_id] = {
+                'ready_at': time.monotonic() + self.async_job_ms / 1000,
+                'blocks': blocks,
+                'pages': page_count
+            }
+            if token:
+                self._job_tokens[token] = job_id
+        return {'JobId': job_id}
+
+    def _count_pages(self, bucket: str, key: str) -> int:
+        if self.object_reader is None:
+            return self.async_pages
+        try:
+            data = self.object_reader(bucket, key)
+        except Exception:
+            return self.async_pages
+        if data.startswith(b'%PDF'):
+            return len(re.findall(rb'/Type\s*/Page(?!s)', data)) or self.async_pages
+        try:
+            with Image.open(io.BytesIO(data)) as image:
+                return getattr(image, 'n_frames', 1)
+        except Exception:
+            return self.async_pages
+
+    def get_document_analysis(self, JobId: str, MaxResults: int = 1000, NextToken: Optional[str] = None, **kwargs) -> Dict:
+        job = self._jobs.get(JobId)
+        if job is None:
+            raise ClientError(
+                {'Error': {'Code': 'InvalidJobIdException', 'Message': 'Request has invalid Job Id'}},
+                'GetDocumentAnalysis'
+            )
+
+        metadata = {'Pages': job['pages']}
+        if time.monotonic() < job['ready_at']:
+            return {'JobStatus': 'IN_PROGRESS', 'DocumentMetadata': metadata}
+
+        page_size = min(MaxResults, self.async_page_size)
+        start = int(NextToken or 0)
+        response = {
+            'JobStatus': 'SUCCEEDED',
+            'DocumentMetadata': metadata,
+            'Blocks': job['blocks'][start:start + page_size],
+            'AnalyzeDocumentModelVersion': 'stub'
+        }
+        if start + page_size < len(job['blocks']):
+            response['NextToken'] = str(start + page_size)
+        return response
+
+    def _response(self, image_bytes: bytes) -> Dict:
+        """A page of `lines` text lines, words laid out left to right; the first word carries the input size"""
+        blocks = []
+        line_ids = []
+        line_height = 0.8 / max(1, self.lines)
+        for line_index in range(self.lines):
+            top = 0.1 + line_index * line_height
+            texts = [f'stub-{len(image_bytes)}'] if line_index == 0 else []
+            texts += SAMPLE_WORDS[line_index % len(SAMPLE_WORDS):][:self.words_per_line - len(texts)]
+            word_ids = []
+            for word_index, text in enumerate(texts):
+                word_id = f'word-{line_index + 1}-{word_index + 1}'
+                word_ids.append(word_id)
+                blocks.append({
+                    'BlockType': 'WORD',
+                    'Id': word_id,
+                    'Text': text,
+                    'Confidence': 99.0,
+                    'Geometry': _geometry(0.1 + word_index * 0.1, top, 0.09, line_height * 0.8)
+                })
+            line_id = f'line-{line_index + 1}'
+            line_ids.append(line_id)
+            blocks.append({
+                'BlockType': 'LINE',
+                'Id': line_id,
+                'Text': ' '.join(texts),
+                'Confidence': 99.0,
+                'Geometry': _geometry(0.1, top, 0.1 * len(texts), line_height * 0.8),
+                'Relationships': [{'Type': 'CHILD', 'Ids': word_ids}]
+            })
+
+        page = {
+            'BlockType': 'PAGE',
+            'Id': 'page-1',
+            'Geometry': _geometry(0.0, 0.0, 1.0, 1.0),
+            'Relationships': [{'Type': 'CHILD', 'Ids': line_ids}]
+        }
+        return {
+            'DocumentMetadata': {'Pages': 1},
+            'Blocks': [page] + blocks,
+            'AnalyzeDocumentModelVersion': 'stub'
+        }
+
+def _geometry(left: float, top: float, width: float, height: float) -> Dict:
+    return {'BoundingBox': {'Width': width, 'Height': height, 'Left': left, 'Top': top}}
@@ -0,0 +1,77 @@
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+from app.core.config import settings
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD concurrency window: +1 slot per full window of successes, halved on throttling"""
+
+    def __init__(self, initial: int, minimum: int, maximum: int, decrease_factor: float = 0.5):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.decrease_factor = decrease_factor
+        self._limit = float(min(max(initial, self.minimum), self.maximum))
+        self._in_flight = 0
+        self._condition = threading.Condition()
+        self._successes = 0
+        self._throttles = 0
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def acquire(self) -> None:
+        with self._condition:
+            while self._in_flight >= int(self._limit):
+                self._condition.wait()
+            self._in_flight += 1
+
+    def release(self, throttled: bool = False) -> None:
+        with self._condition:
+            self._in_flight -= 1
+            if throttled:
+                self._throttles += 1
+                self._limit = max(self.minimum, self._limit * self.decrease_factor)
+            else:
+                self._successes += 1
+                # Additive increase spread over the window, so the limit grows by one per round trip.
+                self._limit = min(self.maximum, self._limit + 1 / self._limit)
+            self._condition.notify_all()
+
+    @contextmanager
+    def slot(self) -> Iterator[Dict]:
+        """Holds a slot for one call; set outcome['throttled'] = True before leaving to shrink the window"""
+        outcome = {'throttled': False}
+        self.acquire()
+        try:
+            yield outcome
+        finally:
+            self.release(throttled=outcome['throttled'])
+
+    def stats(self) -> Dict:
+        with self._condition:
+            return {
+                'limit': int(self._limit),
+                'in_flight': self._in_flight,
+                'minimum': self.minimum,
+                'maximum': self.maximum,
+                'successes': self._successes,
+                'throttles': self._throttles
+            }
+
+_textract_limiter: Optional[AdaptiveConcurrencyLimiter] = None
+_textract_limiter_lock = threading.Lock()
+
+def get_textract_limiter() -> AdaptiveConcurrencyLimiter:
+    """Process-wide limiter shared by every job running in this worker"""
+    global _textract_limiter
+    if _textract_limiter is None:
+        with _textract_limiter_lock:
+            if _textract_limiter is None:
+                _textract_limiter = AdaptiveConcurrencyLimiter(
+                    initial=settings.TEXTRACT_INITIAL_CONCURRENCY,
+                    minimum=settings.TEXTRACT_MIN_CONCURRENCY,
+                    maximum=settings.TEXTRACT_MAX_CONCURRENCY
+                )
+    return _textract_limiter
@@ -1,14 +1,36 @@
-import io
 import os
-import tempfile
-import requests
-from typing import List, Tuple
-from PIL import Image
-from pdf2image import convert_from_path
+import threading
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Tuple, Iterator, Dict, Optional, Union
+from PIL import Image, ImageSequence
+from pdf2image import convert_from_path, pdfinfo_from_path
+
+from app.core.config import settings
+from app.services.textract.page_encoder import PageEncoder
+from app.services.textract.page_cache import get_page_cache
+from app.services.textract.source_reader import get_source_reader
+
+_raster_pool = None
+_raster_pool_lock = threading.Lock()
+
+def _get_raster_pool() -> ProcessPoolExecutor:
+    global _raster_pool
+    if _raster_pool is None:
+        with _raster_pool_lock:
+            if _raster_pool is None:
+                _raster_pool = ProcessPoolExecutor(max_workers=settings.PDF_RASTER_WORKERS)
+    return _raster_pool
+
+def _render_pdf_page(pdf_path: str, page_number: int, dpi: int, destination: str) -> Tuple[bytes, Dict]:
+    images = convert_from_path(pdf_path, dpi=dpi, first_page=page_number, last_page=page_number)
+    return PageEncoder().encode(images[0], destination, source_dpi=dpi)
 
 class DocumentProcessor:
     SUPPORTED_IMAGE_FORMATS = ['.png', '.jpg', '.jpeg', '.tiff', '.tif']
     SUPPORTED_PDF_FORMAT = '.pdf'
+    PAGE_SELECTION_PATTERN = r"^\d+(-\d+)?(,\d+(-\d+)?)*$"
 
     @staticmethod
     def is_pdf(file_path: str) -> bool:
@@ -21,85 +43,217 @@ class DocumentProcessor:
         return ext.lower() in DocumentProcessor.SUPPORTED_IMAGE_FORMATS
 
     @staticmethod
-    def convert_pdf_to_images(pdf_path: str, dpi: int = 300) -> List[Image.Image]:
+    def get_pdf_page_count(pdf_path: str) -> int:
         try:
-            images = convert_from_path(pdf_path, dpi=dpi)
-            return images
+            return int(pdfinfo_from_path(pdf_path)['Pages'])
         except Exception as e:
-            raise Exception(f"Failed to convert PDF to images: {str(e)}")
+            raise Exception(f"Failed to read PDF info: {str(e)}")
+
+    @staticmethod
+    def parse_page_selection(selection: Union[str, List[int], None], page_count: int) -> List[int]:
+        """Turn "3", "2-5" or "1,4,7-9" (or a list of page numbers) into sorted, validated page numbers"""
+        if selection is None or selection == "":
+            return list(range(1, page_count + 1))
+
+        pages = set()
+        if isinstance(selection, str):
+            for part in selection.split(','):
+                part = part.strip()
+                if '-' in part:
+                    start, end = part.split('-', 1)
+                    start, end = int(start), int(end)
+                    if start > end:
+                        raise ValueError(f"Invalid page range: {part}")
+                    pages.update(range(start, end + 1))
+                else:
+                    pages.add(int(part))
+        else:
+            pages.update(int(page) for page in selection)
+
+        out_of_range = [page for page in pages if page < 1 or page > page_count]
+        if out_of_range:
+            raise ValueError(f"Page {min(out_of_range)} is out of range (document has {page_count} page(s))")
+
+        return sorted(pages)
 
     @staticmethod
-    def load_image(image_path: str) -> Image.Image:
+    def iter_pdf_pages(
+        pdf_path: str,
+        dpi: int = None,
+        destination: str = 'textract',
+        pages: Optional[List[int]] = None
+    ) -> Iterator[Tuple[int, bytes, Dict]]:
+        """Render and encode pages in the raster pool, yielding (page_number, bytes, encoding) in page order"""
+        dpi = dpi or settings.PDF_RASTER_DPI
+        if pages is None:
+            pages = list(range(1, DocumentProcessor.get_pdf_page_count(pdf_path) + 1))
+        pool = _get_raster_pool()
+
+        in_flight = deque()
+        pending = deque(pages)
+
         try:
-            image = Image.open(image_path)
-            if image.mode not in ['RGB', 'L']:
-                image = image.convert('RGB')
-            return image
-        except Exception as e:
-            raise Exception(f"Failed to load image: {str(e)}")
+            while pending or in_flight:
+                while pending and len(in_flight) < settings.PDF_MAX_PAGES_IN_FLIGHT:
+                    next_page = pending.popleft()
+                    in_flight.append((next_page, pool.submit(_render_pdf_page, pdf_path, next_page, dpi, destination)))
+
+                page_number, future = in_flight.popleft()
+                try:
+                    image_bytes, encoding = future.result()
+                except Exception as e:
+                    raise Exception(f"Failed to convert PDF page {page_number} to image: {str(e)}")
+
+                yield page_number, image_bytes, encoding
+        finally:
+            for _, future in in_flight:
+                future.cancel()
 
     @staticmethod
-    def image_to_bytes(image: Image.Image, format: str = 'PNG') -> bytes:
+    def get_image_frame_count(image_path: str) -> int:
+        """Count frames of a (possibly multi-page) image from its headers, without decoding pixels"""
         try:
-            img_byte_arr = io.BytesIO()
-            image.save(img_byte_arr, format=format)
-            img_byte_arr.seek(0)
-            return img_byte_arr.read()
+            with Image.open(image_path) as image:
+                return getattr(image, 'n_frames', 1)
         except Exception as e:
-            raise Exception(f"Failed to convert image to bytes: {str(e)}")
+            raise Exception(f"Failed to read image info: {str(e)}")
 
     @staticmethod
-    def download_from_url(url: str) -> str:
-        try:
-            response = requests.get(url, timeout=30)
-            response.raise_for_status()
+    def iter_image_frames(
+        image_path: str,
+        destination: str = 'textract',
+        pages: Optional[List[int]] = None
+    ) -> Iterator[Tuple[int, bytes, Dict]]:
+        """Decode and encode one frame at a time, yielding (page_number, bytes, encoding) in frame order"""
+        last_page = max(pages) if pages else None
+        encoder = PageEncoder()
 
-            _, ext = os.path.splitext(url.split('?')[0])
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=ext)
-            temp_file.write(response.content)
-            temp_file.close()
+        with Image.open(image_path) as image:
+            for page_number, frame in enumerate(ImageSequence.Iterator(image), start=1):
+                if last_page is not None and page_number > last_page:
+                    break
+                if pages is not None and page_number not in pages:
+                    continue
 
-            return temp_file.name
-        except Exception as e:
-            raise Exception(f"Failed to download file from URL: {str(e)}")
+                try:
+                    # Fax TIFFs are usually 1-bit; grayscale keeps them small for the encoder.
+                    if frame.mode == '1':
+                        page_image = frame.convert('L')
+                    elif frame.mode not in ['RGB', 'L']:
+                        page_image = frame.convert('RGB')
+                    else:
+                        page_image = frame.copy()
+                    source_dpi = int(frame.info.get('dpi', (settings.PDF_RASTER_DPI,))[0]) or None
+                    image_bytes, encoding = encoder.encode(page_image, destination, source_dpi=source_dpi)
+                except Exception as e:
+                    raise Exception(f"Failed to load image frame {page_number}: {str(e)}")
+
+                del page_image
+                yield page_number, image_bytes, encoding
 
     @staticmethod
-    def process_document(file_path: str) -> Tuple[List[bytes], int]:
-        temp_file = None
+    @contextmanager
+    def local_source(file_path: str) -> Iterator[str]:
         is_url = file_path.startswith('http://') or file_path.startswith('https://')
 
-        try:
-            if is_url:
-                temp_file = DocumentProcessor.download_from_url(file_path)
-                local_path = temp_file
-            else:
-                if not os.path.exists(file_path):
-                    raise FileNotFoundError(f"File not found: {file_path}")
-                local_path = file_path
+        if is_url:
+            with get_source_reader().open_local(file_path) as local_path:
+                yield local_path
+            return
+
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"File not found: {file_path}")
+        yield file_path
+
+    @staticmethod
+    def get_page_count(file_path: str, file_hash: str = None) -> int:
+        """Count pages without rasterizing anything"""
+        page_cache = get_page_cache() if file_hash else None
+        if page_cache:
+            page_count = page_cache.get_page_count(file_hash)
+            if page_count is not None:
+                return page_count
+
+        with DocumentProcessor.local_source(file_path) as local_path:
+            if DocumentProcessor.is_pdf(local_path):
+                return DocumentProcessor.get_pdf_page_count(local_path)
+            elif DocumentProcessor.is_image(local_path):
+                return DocumentProcessor.get_image_frame_count(local_path)
+            raise ValueError(f"Unsupported file format. Supported: PDF, {', '.join(DocumentProcessor.SUPPORTED_IMAGE_FORMATS)}")
+
+    @staticmethod
+    def iter_document_pages(
+        file_path: str,
+        destination: str = 'textract',
+        file_hash: str = None,
+        pages: Optional[List[int]] = None
+    ) -> Iterator[Tuple[int, bytes, Dict]]:
+        page_cache = get_page_cache() if file_hash and destination == 'textract' else None
 
-            image_bytes_list = []
+        selected = pages
+        cached = {}
+        if page_cache:
+            if selected is None:
+                page_count = page_cache.get_page_count(file_hash)
+                if page_count is not None:
+                    selected = list(range(1, page_count + 1))
 
+            for page_number in selected or []:
+                hit = page_cache.get_page(file_hash, page_number)
+                if hit is not None:
+                    cached[page_number] = hit
+
+        if selected is not None:
+            missing = [page_number for page_number in selected if page_number not in cached]
+            rendered = DocumentProcessor._render_document_pages(file_path, destination, missing) if missing else None
+
+            try:
+                for page_number in selected:
+                    if page_number in cached:
+                        image_bytes, encoding = cached[page_number]
+                    else:
+                        rendered_page = next(rendered, None)
+                        if rendered_page is None:
+                            return
+                        page_number, image_bytes, encoding = rendered_page
+                        if page_cache:
+                            page_cache.put_page(file_hash, page_number, image_bytes, encoding)
+                    yield page_number, image_bytes, encoding
+            finally:
+                if rendered is not None:
+                    rendered.close()
+            return
+
+        page_count = 0
+        for page_number, image_bytes, encoding in DocumentProcessor._render_document_pages(file_path, destination):
+            if page_cache:
+                page_cache.put_page(file_hash, page_number, image_bytes, encoding)
+            page_count += 1
+            yield page_number, image_bytes, encoding
+
+        if page_cache:
+            page_cache.put_page_count(file_hash, page_count)
+
+    @staticmethod
+    def _render_document_pages(
+        file_path: str,
+        destination: str,
+        pages: Optional[List[int]] = None
+    ) -> Iterator[Tuple[int, bytes, Dict]]:
+        with DocumentProcessor.local_source(file_path) as local_path:
             if DocumentProcessor.is_pdf(local_path):
-                images = DocumentProcessor.convert_pdf_to_images(local_path)
-                for image in images:
-                    image_bytes = DocumentProcessor.image_to_bytes(image)
-                    image_bytes_list.append(image_bytes)
-                page_count = len(images)
+                yield from DocumentProcessor.iter_pdf_pages(local_path, destination=destination, pages=pages)
 
             elif DocumentProcessor.is_image(local_path):
-                image = DocumentProcessor.load_image(local_path)
-                image_bytes = DocumentProcessor.image_to_bytes(image)
-                image_bytes_list.append(image_bytes)
-                page_count = 1
+                yield from DocumentProcessor.iter_image_frames(local_path, destination=destination, pages=pages)
 
             else:
                 raise ValueError(f"Unsupported file format. Supported: PDF, {', '.join(DocumentProcessor.SUPPORTED_IMAGE_FORMATS)}")
 
-            return image_bytes_list, page_count
-
-        finally:
-            if temp_file and os.path.exists(temp_file):
-                try:
-                    os.unlink(temp_file)
-                except Exception:
-                    pass
+    @staticmethod
+    def get_page(file_path: str, page_number: int, file_hash: str = None) -> Optional[Tuple[bytes, Dict]]:
+        for _, image_bytes, encoding in DocumentProcessor.iter_document_pages(
+            file_path, file_hash=file_hash, pages=[page_number]
+        ):
+            return image_bytes, encoding
+        return None
@@ -0,0 +1,88 @@
+import io
+from typing import List, Optional
+
+import numpy as np
+from PIL import Image
+
+FEATURE_TYPES = ['TABLES', 'FORMS', 'SIGNATURES']
+FEATURES_PATTERN = r"^(auto|text|all|(tables|forms|signatures)(,(tables|forms|signatures))*)$"
+
+def parse_features(value: Optional[str]) -> Optional[List[str]]:
+    """"auto" -> None (decide per page), "text" -> [] (DetectDocumentText), "all" or "tables,forms" -> feature types"""
+    value = (value or 'all').strip().lower()
+    if value == 'auto':
+        return None
+    if value == 'text':
+        return []
+    if value == 'all':
+        return list(FEATURE_TYPES)
+
+    requested = {part.strip().upper() for part in value.split(',') if part.strip()}
+    unknown = requested - set(FEATURE_TYPES)
+    if unknown:
+        raise ValueError(f"Unknown feature type(s): {', '.join(sorted(unknown))}. Use auto, text, all or {', '.join(FEATURE_TYPES).lower()}")
+    return [feature for feature in FEATURE_TYPES if feature in requested]
+
+def features_label(feature_types: Optional[List[str]]) -> str:
+    """Stored form of a tier: "text" or a comma list such as "TABLES,FORMS" """
+    if feature_types is None:
+        return 'auto'
+    return ','.join(feature for feature in FEATURE_TYPES if feature in feature_types) or 'text'
+
+def features_cover(available: Optional[List[str]], required: Optional[List[str]]) -> bool:
+    """True when results produced with `available` contain every structure `required` asks for (None = full tier)"""
+    available = FEATURE_TYPES if available is None else available
+    required = FEATURE_TYPES if required is None else required
+    return set(required) <= set(available)
+
+class FeatureDetector:
+    """Guesses which Textract feature types a rendered page needs from its ruling lines"""
+
+    ANALYSIS_WIDTH = 1000
+    INK_THRESHOLD = 128
+    TABLE_RULE_RATIO = 0.3
+    FIELD_RULE_RATIO = 0.05
+    VERTICAL_RULE_RATIO = 0.05
+
+    def detect(self, image_bytes: bytes) -> List[str]:
+        image = Image.open(io.BytesIO(image_bytes)).convert('L')
+        if image.width > self.ANALYSIS_WIDTH:
+            image = image.resize(
+                (self.ANALYSIS_WIDTH, max(1, image.height * self.ANALYSIS_WIDTH // image.width)),
+                Image.Resampling.BOX
+            )
+        ink = np.asarray(image) < self.INK_THRESHOLD
+        height, width = ink.shape
+
+        rows, lengths = self._runs(ink)
+        table_rules = self._count_lines(rows[lengths >= width * self.TABLE_RULE_RATIO])
+        field_rules = self._count_lines(rows[
+            (lengths >= width * self.FIELD_RULE_RATIO) & (lengths < width * self.TABLE_RULE_RATIO)
+        ])
+        columns, column_lengths = self._runs(ink.T)
+        vertical_rules = self._count_lines(columns[column_lengths >= height * self.VERTICAL_RULE_RATIO])
+
+        features = []
+        if table_rules >= 3 and vertical_rules >= 2:
+            features.append('TABLES')
+        # Boxed fields look like a small table; fill-in underlines are the common form signal.
+        boxed_fields = not features and vertical_rules >= 2 and table_rules + field_rules >= 2
+        if field_rules >= 3 or boxed_fields:
+            features.extend(['FORMS', 'SIGNATURES'])
+        return features
+
+    def _runs(self, mask: np.ndarray):
+        """Row index and length of every horizontal run of ink pixels"""
+        padded = np.zeros((mask.shape[0], mask.shape[1] + 2), dtype=np.int8)
+        padded[:, 1:-1] = mask
+        edges = np.diff(padded, axis=1)
+        start_rows, start_cols = np.nonzero(edges == 1)
+        _, end_cols = np.nonzero(edges == -1)
+        return start_rows, end_cols - start_cols
+
+    def _count_lines(self, rows: np.ndarray) -> int:
+        # A rule a few pixels thick shows up on adjacent rows; count each band once.
+        rows = np.unique(rows)
+        if rows.size == 0:
+            return 0
+        return int(1 + np.count_nonzero(np.diff(rows) > 2))
@@ -0,0 +1,104 @@
+from typing import Dict, List, Optional
+
+import numpy as np
+
+BLOCK_TYPES = ('LINE', 'WORD', 'TABLE', 'CELL', 'KEY_VALUE_SET', 'SELECTION_ELEMENT')
+
+_DTYPES = {
+    'types': np.dtype('u1'),
+    'top': np.dtype('<f8'),
+    'left': np.dtype('<f8'),
+    'width': np.dtype('<f8'),
+    'height': np.dtype('<f8'),
+    'confidence': np.dtype('<f4'),
+    'text_offsets': np.dtype('<i4')
+}
+
+class GeometryStore:
+    """Columnar copy of a page's bounding boxes: one NumPy array per field, all text in one buffer.
+
+    Row i is parsed_data['bounding_boxes'][i]. Built once per page at conversion time
+    and never stored; the bounding-box dicts stay the persisted form. A missing
+    coordinate is NaN so each caller keeps its own default; text(i) is
+    text_buffer[text_offsets[i]:text_offsets[i + 1]].
+    """
+
+    def __init__(
+        self,
+        types: np.ndarray,
+        top: np.ndarray,
+        left: np.ndarray,
+        width: np.ndarray,
+        height: np.ndarray,
+        confidence: np.ndarray,
+        text_buffer: str,
+        text_offsets: np.ndarray
+    ):
+        self.types = types
+        self.top = top
+        self.left = left
+        self.width = width
+        self.height = height
+        self.confidence = confidence
+        self.text_buffer = text_buffer
+        self.text_offsets = text_offsets
+        self._filled: Dict[tuple, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+    @classmethod
+    def from_blocks(cls, bounding_boxes: List[Dict]) -> 'GeometryStore':
+        """Builds the store from parser-style bounding-box dicts"""
+        count = len(bounding_boxes)
+        type_codes = {block_type: code for code, block_type in enumerate(BLOCK_TYPES)}
+        types = np.fromiter(
+            (type_codes.get(block.get('type'), len(BLOCK_TYPES)) for block in bounding_boxes), _DTYPES['types'], count
+        )
+        confidence = np.fromiter((block.get('confidence', 0) for block in bounding_boxes), _DTYPES['confidence'], count)
+
+        # Column-wise comprehensions keep the per-block work in C; None and missing keys both become NaN.
+        boxes = [block.get('bbox') or {} for block in bounding_boxes]
+        columns = np.array(
+            [[box.get(key) for box in boxes] for key in ('Top', 'Left', 'Width', 'Height')], dtype=np.float64
+        ).reshape(4, count)
+
+        texts = [block.get('text', '') for block in bounding_boxes]
+        text_offsets = np.zeros(count + 1, dtype=_DTYPES['text_offsets'])
+        np.cumsum(np.fromiter(map(len, texts), np.int64, count), out=text_offsets[1:])
+
+        return cls(types, columns[0], columns[1], columns[2], columns[3], confidence, ''.join(texts), text_offsets)
+
+    def column(self, field: str, default: float = 0.0, indices: Optional[np.ndarray] = None) -> np.ndarray:
+        """One geometry column with missing values replaced by `default`"""
+        values = self._filled.get((field, default))
+        if values is None:
+            values = getattr(self, field)
+            values = self._filled[(field, default)] = np.where(np.isnan(values), default, values)
+        return values if indices is None else values[indices]
+
+    def text(self, index: int) -> str:
+        return self.text_buffer[self.text_offsets[index]:self.text_offsets[index + 1]]
+
+    def texts(self, indices: np.ndarray) -> List[str]:
+        return [self.text(index) for index in indices]
+
+    def select(self, block_type: str, non_empty: bool = False) -> np.ndarray:
+        """Row indices of one block type, in response order; `non_empty` drops blank text"""
+        indices = np.flatnonzero(self.types == BLOCK_TYPES.index(block_type))
+        if non_empty:
+            indices = indices[[bool(self.text(index).strip()) for index in indices]]
+        return indices
+
+    def reading_order(self, indices: np.ndarray) -> np.ndarray:
+        """`indices` sorted top-to-bottom, then left-to-right; ties keep their order"""
+        return indices[np.lexsort((self.column('left', indices=indices), self.column('top', indices=indices)))]
+
+    def split_on_gaps(self, ordered: np.ndarray, threshold: float, default_height: float = 0.02) -> List[np.ndarray]:
+        """Splits rows in reading order wherever the vertical gap to the previous row exceeds `threshold`"""
+        if len(ordered) == 0:
+            return []
+        tops = self.column('top', indices=ordered)
+        bottoms = tops + self.column('height', default_height, indices=ordered)
+        breaks = np.flatnonzero(tops[1:] - bottoms[:-1] > threshold) + 1
+        return np.split(ordered, breaks)
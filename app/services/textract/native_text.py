@@ -0,0 +1,122 @@
+import subprocess
+import xml.etree.ElementTree as ET
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+XHTML_NS = '{http://www.w3.org/1999/xhtml}'
+
+class NativeTextExtractor:
+    """Reads a PDF's embedded text layer (via poppler's pdftotext) into Textract-shaped LINE/WORD blocks"""
+
+    def __init__(self):
+        self.min_words = settings.NATIVE_TEXT_MIN_WORDS
+        self.min_alnum_ratio = settings.NATIVE_TEXT_MIN_ALNUM_RATIO
+
+    def extract_pages(self, pdf_path: str, pages: Optional[List[int]] = None) -> Tuple[Dict[int, Dict], int]:
+        """Returns ({page_number: textract_response} for pages with a usable text layer, pages examined)"""
+        command = ['pdftotext', '-bbox-layout']
+        first_page = 1
+        if pages:
+            first_page = min(pages)
+            command += ['-f', str(first_page), '-l', str(max(pages))]
+        command += [pdf_path, '-']
+
+        result = subprocess.run(command, capture_output=True, timeout=60)
+        if result.returncode != 0:
+            raise Exception(f"pdftotext failed: {result.stderr.decode('utf-8', errors='replace').strip()}")
+
+        root = ET.fromstring(result.stdout)
+        page_elements = root.iter(f'{XHTML_NS}page')
+
+        responses = {}
+        page_total = 0
+        for offset, page_element in enumerate(page_elements):
+            page_total += 1
+            page_number = first_page + offset
+            if pages and page_number not in pages:
+                continue
+
+            response = self._page_to_response(page_element, page_number)
+            if self.has_text_layer(response):
+                responses[page_number] = response
+
+        return responses, page_total
+
+    def has_text_layer(self, response: Dict) -> bool:
+        words = [block['Text'] for block in response['Blocks'] if block['BlockType'] == 'WORD']
+        if len(words) < self.min_words:
+            return False
+
+        characters = ''.join(words)
+        alnum = sum(1 for char in characters if char.isalnum())
+        return alnum / max(len(characters), 1) >= self.min_alnum_ratio
+
+    def _bbox(self, element: ET.Element, page_width: float, page_height: float) -> Dict:
+        x_min = float(element.get('xMin', 0))
+        y_min = float(element.get('yMin', 0))
+        x_max = float(element.get('xMax', 0))
+        y_max = float(element.get('yMax', 0))
+        return {
+            'Left': x_min / page_width,
+            'Top': y_min / page_height,
+            'Width': (x_max - x_min) / page_width,
+            'Height': (y_max - y_min) / page_height
+        }
+
+    def _page_to_response(self, page_element: ET.Element, page_number: int) -> Dict:
+        page_width = float(page_element.get('width', 1)) or 1.0
+        page_height = float(page_element.get('height', 1)) or 1.0
+
+        blocks = []
+        line_ids = []
+
+        for line_index, line_element in enumerate(page_element.iter(f'{XHTML_NS}line')):
+            word_ids = []
+            word_texts = []
+
+            for word_index, word_element in enumerate(line_element.iter(f'{XHTML_NS}word')):
+                text = (word_element.text or '').strip()
+                if not text:
+                    continue
+
+                word_id = f"native-{page_number}-{line_index}-{word_index}"
+                word_ids.append(word_id)
+                word_texts.append(text)
+                blocks.append({
+                    'BlockType': 'WORD',
+                    'Id': word_id,
+                    'Text': text,
+                    'Confidence': 100.0,
+                    'Page': page_number,
+                    'Geometry': {'BoundingBox': self._bbox(word_element, page_width, page_height)}
+                })
+
+            if not word_ids:
+                continue
+
+            line_id = f"native-{page_number}-{line_index}"
+            line_ids.append(line_id)
+            blocks.append({
+                'BlockType': 'LINE',
+                'Id': line_id,
+                'Text': ' '.join(word_texts),
+                'Confidence': 100.0,
+                'Page': page_number,
+                'Geometry': {'BoundingBox': self._bbox(line_element, page_width, page_height)},
+                'Relationships': [{'Type': 'CHILD', 'Ids': word_ids}]
+            })
+
+        page_block = {
+            'BlockType': 'PAGE',
+            'Id': f"native-{page_number}",
+            'Page': page_number,
+            'Geometry': {'BoundingBox': {'Left': 0.0, 'Top': 0.0, 'Width': 1.0, 'Height': 1.0}},
+            'Relationships': [{'Type': 'CHILD', 'Ids': line_ids}]
+        }
+
+        return {
+            'DocumentMetadata': {'Pages': 1},
+            'Blocks': [page_block] + blocks,
+            'EngineMetadata': {'Engine': 'native', 'Source': 'pdftotext'}
+        }
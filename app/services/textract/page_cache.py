@@ -0,0 +1,66 @@
+import json
+import struct
+import threading
+from typing import Optional, Tuple, Dict, Any
+
+from app.core.config import settings
+from app.utils.disk_cache import DiskLRUCache
+from app.services.s3_cache import S3Cache
+
+_page_cache = None
+_page_cache_lock = threading.Lock()
+
+class PageImageCache:
+    """Textract-encoded page images keyed by source file hash, render DPI and page number"""
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def _page_key(self, file_hash: str, page_number: int) -> str:
+        return f"page:{file_hash}:{settings.PDF_RASTER_DPI}:{page_number}"
+
+    def _manifest_key(self, file_hash: str) -> str:
+        return f"manifest:{file_hash}:{settings.PDF_RASTER_DPI}"
+
+    def get_page(self, file_hash: str, page_number: int) -> Optional[Tuple[bytes, Dict]]:
+        payload = self.backend.get(self._page_key(file_hash, page_number))
+        if payload is None:
+            return None
+
+        (header_length,) = struct.unpack('>I', payload[:4])
+        encoding = json.loads(payload[4:4 + header_length])
+        return payload[4 + header_length:], encoding
+
+    def put_page(self, file_hash: str, page_number: int, image_bytes: bytes, encoding: Dict) -> None:
+        header = json.dumps(encoding).encode('utf-8')
+        self.backend.set(self._page_key(file_hash, page_number), struct.pack('>I', len(header)) + header + image_bytes)
+
+    def get_page_count(self, file_hash: str) -> Optional[int]:
+        manifest = self.backend.get(self._manifest_key(file_hash))
+        if manifest is None:
+            return None
+        return json.loads(manifest)['page_count']
+
+    def put_page_count(self, file_hash: str, page_count: int) -> None:
+        self.backend.set(self._manifest_key(file_hash), json.dumps({'page_count': page_count}).encode('utf-8'))
+
+    def purge(self) -> int:
+        return self.backend.purge()
+
+    def stats(self) -> Dict[str, Any]:
+        return self.backend.stats()
+
+def get_page_cache() -> Optional[PageImageCache]:
+    global _page_cache
+    if not settings.PAGE_CACHE_ENABLED:
+        return None
+
+    if _page_cache is None:
+        with _page_cache_lock:
+            if _page_cache is None:
+                if settings.PAGE_CACHE_BACKEND == "s3" and settings.S3_BUCKET_NAME:
+                    backend = S3Cache("cache/pages")
+                else:
+                    backend = DiskLRUCache(settings.PAGE_CACHE_DIR, settings.PAGE_CACHE_MAX_MB * 1024 * 1024)
+                _page_cache = PageImageCache(backend)
+    return _page_cache
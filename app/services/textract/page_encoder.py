@@ -0,0 +1,179 @@
+import io
+from typing import Dict, List, Tuple, Optional
+from PIL import Image, ImageChops, ImageStat
+
+from app.core.config import settings
+
+MIME_TYPES = {
+    'PNG': 'image/png',
+    'JPEG': 'image/jpeg',
+    'WEBP': 'image/webp'
+}
+
+class PageEncoder:
+    """Chooses DPI, colour mode and format for a page image so it fits the destination's byte budget"""
+
+    # Candidates are ordered from highest fidelity to smallest output; the first
+    # one under budget wins. Textract only accepts PNG and JPEG.
+    CANDIDATES = {
+        'textract': {
+            'bilevel': [('L', 'PNG', None), ('1', 'PNG', None), ('L', 'JPEG', 85)],
+            'grayscale': [('L', 'PNG', None), ('L', 'JPEG', 90), ('L', 'JPEG', 80)],
+            'color': [('RGB', 'PNG', None), ('RGB', 'JPEG', 90), ('RGB', 'JPEG', 80)]
+        },
+        'gemini': {
+            'bilevel': [('L', 'PNG', None), ('L', 'WEBP', 85)],
+            'grayscale': [('L', 'WEBP', 85), ('L', 'WEBP', 70)],
+            'color': [('RGB', 'WEBP', 85), ('RGB', 'WEBP', 70)]
+        }
+    }
+
+    COLORFULNESS_THRESHOLD = 8
+    BILEVEL_RATIO_THRESHOLD = 0.95
+    BILEVEL_CUTOFF = 160
+    DPI_STEP = 0.8
+    MIN_LONG_SIDE_PIXELS = 600
+
+    def _profile(self, destination: str) -> Dict:
+        if destination == 'gemini':
+            return {
+                'byte_budget': settings.GEMINI_PAGE_BYTE_BUDGET_KB * 1024,
+                'max_dpi': settings.GEMINI_PAGE_DPI,
+                'min_dpi': settings.GEMINI_PAGE_MIN_DPI
+            }
+        if destination == 'textract':
+            return {
+                'byte_budget': settings.TEXTRACT_PAGE_BYTE_BUDGET_KB * 1024,
+                'max_dpi': settings.PDF_RASTER_DPI,
+                'min_dpi': settings.TEXTRACT_PAGE_MIN_DPI
+            }
+        raise ValueError(f"Unknown encoding destination: {destination}")
+
+    def classify(self, image: Image.Image) -> str:
+        thumb = image.copy()
+        thumb.thumbnail((256, 256))
+        if thumb.mode not in ('RGB', 'L'):
+            thumb = thumb.convert('RGB')
+
+        if thumb.mode == 'RGB':
+            red, green, blue = thumb.split()
+            colorfulness = max(
+                ImageStat.Stat(ImageChops.difference(red, green)).mean[0],
+                ImageStat.Stat(ImageChops.difference(green, blue)).mean[0]
+            )
+            if colorfulness > self.COLORFULNESS_THRESHOLD:
+                return 'color'
+            thumb = thumb.convert('L')
+
+        histogram = thumb.histogram()
+        extremes = sum(histogram[:64]) + sum(histogram[192:])
+        if extremes / max(sum(histogram), 1) >= self.BILEVEL_RATIO_THRESHOLD:
+            return 'bilevel'
+        return 'grayscale'
+
+    def _dpi_ladder(self, profile: Dict, source_dpi: int) -> List[int]:
+        dpi = min(profile['max_dpi'], source_dpi)
+        ladder = [dpi]
+        while dpi * self.DPI_STEP >= profile['min_dpi']:
+            dpi = int(dpi * self.DPI_STEP)
+            ladder.append(dpi)
+        return ladder
+
+    def _convert(self, image: Image.Image, mode: str) -> Image.Image:
+        if mode == '1':
+            return image.convert('L').point(lambda p: 255 if p > self.BILEVEL_CUTOFF else 0, mode='1')
+        if image.mode != mode:
+            return image.convert(mode)
+        return image
+
+    def _save(self, image: Image.Image, format: str, quality: Optional[int]) -> bytes:
+        buffer = io.BytesIO()
+        if quality is None:
+            image.save(buffer, format=format, optimize=True)
+        else:
+            image.save(buffer, format=format, quality=quality)
+        return buffer.getvalue()
+
+    def encode(self, image: Image.Image, destination: str = 'textract', source_dpi: int = None) -> Tuple[bytes, Dict]:
+        profile = self._profile(destination)
+        source_dpi = source_dpi or profile['max_dpi']
+        content = self.classify(image)
+
+        best = None
+        for dpi in self._dpi_ladder(profile, source_dpi):
+            scaled = image
+            if dpi < source_dpi:
+                scale = dpi / source_dpi
+                scaled = image.resize(
+                    (max(1, int(image.width * scale)), max(1, int(image.height * scale))),
+                    Image.LANCZOS
+                )
+
+            converted = {}
+            for mode, format, quality in self.CANDIDATES[destination][content]:
+                if mode not in converted:
+                    converted[mode] = self._convert(scaled, mode)
+
+                data = self._save(converted[mode], format, quality)
+                params = {
+                    'destination': destination,
+                    'content': content,
+                    'dpi': dpi,
+                    'mode': mode,
+                    'format': format,
+                    'mime_type': MIME_TYPES[format],
+                    'quality': quality,
+                    'bytes': len(data),
+                    'byte_budget': profile['byte_budget']
+                }
+
+                if len(data) <= profile['byte_budget']:
+                    params['within_budget'] = True
+                    return data, params
+
+                if best is None or len(data) < len(best[0]):
+                    best = (data, params)
+
+        return self._shrink_to_budget(image, destination, content, profile, source_dpi, best[1]['dpi'])
+
+    def _shrink_to_budget(
+        self,
+        image: Image.Image,
+        destination: str,
+        content: str,
+        profile: Dict,
+        source_dpi: int,
+        dpi: int
+    ) -> Tuple[bytes, Dict]:
+        """Past the DPI floor only pixels are left to give: shrink with the smallest candidate until the page fits"""
+        mode, format, quality = self.CANDIDATES[destination][content][-1]
+        scale = min(1.0, dpi / source_dpi)
+
+        while True:
+            scale *= self.DPI_STEP
+            size = (int(image.width * scale), int(image.height * scale))
+            if max(size) < self.MIN_LONG_SIDE_PIXELS:
+                raise Exception(
+                    f"Page image does not fit the {profile['byte_budget'] // 1024} KB {destination} budget "
+                    f"even at {self.MIN_LONG_SIDE_PIXELS} pixels on its long side"
+                )
+
+            data = self._save(self._convert(image.resize(size, Image.LANCZOS), mode), format, quality)
+            if len(data) <= profile['byte_budget']:
+                return data, {
+                    'destination': destination,
+                    'content': content,
+                    'dpi': max(1, int(source_dpi * scale)),
+                    'mode': mode,
+                    'format': format,
+                    'mime_type': MIME_TYPES[format],
+                    'quality': quality,
+                    'bytes': len(data),
+                    'byte_budget': profile['byte_budget'],
+                    'within_budget': True,
+                    'below_min_dpi': True
+                }
+
+    def reencode(self, image_bytes: bytes, destination: str, source_dpi: int = None) -> Tuple[bytes, Dict]:
+        image = Image.open(io.BytesIO(image_bytes))
+        return self.encode(image, destination, source_dpi)
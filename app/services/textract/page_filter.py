@@ -0,0 +1,146 @@
+import hashlib
+import io
+from typing import Dict, List, Optional
+
+import numpy as np
+from PIL import Image
+from sqlalchemy.orm import Session
+
+from app.models import Document
+from app.core.config import settings
+
+# Ink density is measured at roughly 150 DPI; thin strokes survive and the array stays small.
+ANALYSIS_WIDTH = 1275
+MARGIN_RATIO = 0.05
+
+class PageFilter:
+    """Flags blank and repeated pages before they are sent to Textract.
+
+    Only a byte-identical page reuses an earlier page's results. Pages that merely
+    look alike (close dHash and ink density) are reported as near-duplicates and
+    still analyzed, since a changed digit or tick keeps the hash close.
+    """
+
+    def __init__(self, db: Optional[Session] = None):
+        self.db = db
+        self.blank_ink_ratio = settings.PAGE_BLANK_INK_RATIO
+        self.blank_contrast = settings.PAGE_BLANK_CONTRAST
+        self.hash_size = settings.PAGE_HASH_SIZE
+        self.max_distance = settings.PAGE_DUPLICATE_MAX_DISTANCE
+        self._hashes: List[np.ndarray] = []
+        self._pages: List[Dict] = []
+        self._pages_by_digest: Dict[str, Dict] = {}
+        self._history: List[Dict] = []
+        self._history_hashes: List[np.ndarray] = []
+        self._history_by_digest: Dict[str, Dict] = {}
+
+    def fingerprint(self, image_bytes: bytes) -> Dict:
+        """Returns {'ink_ratio', 'hash', 'digest'} for a rendered page; digest is the SHA-256 of its encoded bytes"""
+        image = Image.open(io.BytesIO(image_bytes)).convert('L')
+
+        factor = max(1, image.width // ANALYSIS_WIDTH)
+        if factor > 1:
+            image = image.reduce(factor)
+
+        return {
+            'ink_ratio': self._ink_ratio(np.asarray(image)),
+            'hash': self._dhash(image),
+            'digest': hashlib.sha256(image_bytes).hexdigest()
+        }
+
+    def is_blank(self, fingerprint: Dict) -> bool:
+        return fingerprint['ink_ratio'] < self.blank_ink_ratio
+
+    def _ink_ratio(self, pixels: np.ndarray) -> float:
+        # Scanner edges and punch holes sit in the margins, so only the body is measured.
+        height, width = pixels.shape
+        top, left = int(height * MARGIN_RATIO), int(width * MARGIN_RATIO)
+        body = pixels[top:height - top, left:width - left]
+        if body.size == 0:
+            return 0.0
+
+        background = np.percentile(body, 90)
+        ink = body < (background - self.blank_contrast)
+        return float(ink.mean())
+
+    def _dhash(self, image: Image.Image) -> str:
+        thumbnail = image.resize((self.hash_size + 1, self.hash_size), Image.Resampling.BOX)
+        pixels = np.asarray(thumbnail, dtype=np.int16)
+        bits = pixels[:, 1:] > pixels[:, :-1]
+        return np.packbits(bits.flatten()).tobytes().hex()
+
+    def _distances(self, page_hash: str, candidates: List[np.ndarray]) -> np.ndarray:
+        target = np.frombuffer(bytes.fromhex(page_hash), dtype=np.uint8)
+        stacked = np.stack(candidates)
+        return np.unpackbits(np.bitwise_xor(stacked, target), axis=1).sum(axis=1)
+
+    def _matches(self, fingerprint: Dict, candidates: List[Dict], hashes: List[np.ndarray]) -> Optional[Dict]:
+        if not hashes:
+            return None
+
+        distances = self._distances(fingerprint['hash'], hashes)
+        for index in np.argsort(distances, kind='stable'):
+            if distances[index] > self.max_distance:
+                break
+            candidate = candidates[index]
+            # Same layout with different field values hashes closely; ink density tells them apart.
+            ink_a, ink_b = fingerprint['ink_ratio'], candidate['ink_ratio']
+            if abs(ink_a - ink_b) <= 0.1 * max(ink_a, ink_b):
+                return candidate
+        return None
+
+    def find_duplicate(self, fingerprint: Dict) -> Optional[int]:
+        """Returns the page number of an earlier, byte-identical page in this document"""
+        match = self._pages_by_digest.get(fingerprint.get('digest'))
+        return match['page_number'] if match else None
+
+    def find_similar(self, fingerprint: Dict) -> Optional[int]:
+        """Returns the page number of an earlier page in this document that only looks the same"""
+        match = self._matches(fingerprint, self._pages, self._hashes)
+        return match['page_number'] if match else None
+
+    def remember(self, page_number: int, fingerprint: Dict) -> None:
+        page = {'page_number': page_number, **fingerprint}
+        self._pages.append(page)
+        self._hashes.append(np.frombuffer(bytes.fromhex(fingerprint['hash']), dtype=np.uint8))
+        self._pages_by_digest.setdefault(fingerprint['digest'], page)
+
+    def load_history(self, document: Document) -> None:
+        """Collects fingerprinted pages from the user's recently completed documents"""
+        if self.db is None or not settings.PAGE_DUPLICATE_ACROSS_HISTORY:
+            return
+
+        previous = self.db.query(Document).filter(
+            Document.user_id == document.user_id,
+            Document.id != document.id,
+            Document.status == "complete",
+            Document.textract_response.isnot(None)
+        ).order_by(Document.created_at.desc()).limit(settings.PAGE_DUPLICATE_HISTORY_DOCS).all()
+
+        for source in previous:
+            response = source.textract_response if isinstance(source.textract_response, dict) else {}
+            fingerprints = response.get('page_fingerprints') or {}
+            for page in response.get('pages', []):
+                page_fingerprint = fingerprints.get(str(page.get('page_number')))
+                if page_fingerprint and page.get('raw_response') and page.get('parsed_data'):
+                    entry = {
+                        'job_id': source.job_id,
+                        'page_number': page['page_number'],
+                        'raw_response': page['raw_response'],
+                        'parsed_data': page['parsed_data'],
+                        'feature_types': page.get('feature_types'),
+                        **page_fingerprint
+                    }
+                    self._history.append(entry)
+                    self._history_hashes.append(np.frombuffer(bytes.fromhex(page_fingerprint['hash']), dtype=np.uint8))
+                    # Fingerprints stored before digests existed can still be reported, never reused.
+                    if page_fingerprint.get('digest'):
+                        self._history_by_digest.setdefault(page_fingerprint['digest'], entry)
+
+    def find_in_history(self, fingerprint: Dict) -> Optional[Dict]:
+        """Returns a byte-identical page from another, already processed document"""
+        return self._history_by_digest.get(fingerprint.get('digest'))
+
+    def find_similar_in_history(self, fingerprint: Dict) -> Optional[Dict]:
+        """Returns a page from another, already processed document that only looks the same"""
+        return self._matches(fingerprint, self._history, self._history_hashes)
@@ -0,0 +1,66 @@
+import hashlib
+import json
+import threading
+import zlib
+from typing import Optional, Dict, Any, List
+
+from app.core.config import settings
+from app.utils.disk_cache import DiskLRUCache
+from app.services.s3_cache import S3Cache
+from app.services.db_cache import DatabaseCache
+from app.services.textract.feature_tiers import features_label
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+class TextractResponseCache:
+    """zlib-compressed Textract responses keyed by page bytes, feature types, API version and TEXTRACT_CACHE_SALT"""
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def _key(self, image_bytes: bytes, feature_types: List[str], api_version: str) -> str:
+        digest = hashlib.sha256(image_bytes).hexdigest()
+        return f"textract:{api_version}:{settings.TEXTRACT_CACHE_SALT}:{features_label(feature_types)}:{digest}"
+
+    def get(self, image_bytes: bytes, feature_types: List[str], api_version: str) -> Optional[Dict]:
+        payload = self.backend.get(self._key(image_bytes, feature_types, api_version))
+        if payload is None:
+            return None
+
+        try:
+            return json.loads(zlib.decompress(payload))
+        except (zlib.error, ValueError) as e:
+            print(f"⚠️ Discarding unreadable Textract cache entry: {str(e)}")
+            self.backend.delete(self._key(image_bytes, feature_types, api_version))
+            return None
+
+    def put(self, image_bytes: bytes, feature_types: List[str], api_version: str, response: Dict) -> None:
+        # ResponseMetadata is per-request (request id, retry count) and not worth keeping.
+        stored = {key: value for key, value in response.items() if key != 'ResponseMetadata'}
+        payload = zlib.compress(json.dumps(stored, separators=(',', ':')).encode('utf-8'), 6)
+        self.backend.set(self._key(image_bytes, feature_types, api_version), payload)
+
+    def purge(self) -> int:
+        return self.backend.purge()
+
+    def stats(self) -> Dict[str, Any]:
+        return self.backend.stats()
+
+def get_response_cache() -> Optional[TextractResponseCache]:
+    global _response_cache
+    if not settings.TEXTRACT_CACHE_ENABLED:
+        return None
+
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                max_bytes = settings.TEXTRACT_CACHE_MAX_MB * 1024 * 1024
+                if settings.TEXTRACT_CACHE_BACKEND == "s3" and settings.S3_BUCKET_NAME:
+                    backend = S3Cache("cache/textract")
+                elif settings.TEXTRACT_CACHE_BACKEND == "postgres":
+                    backend = DatabaseCache("textract", max_bytes)
+                else:
+                    backend = DiskLRUCache(settings.TEXTRACT_CACHE_DIR, max_bytes)
+                _response_cache = TextractResponseCache(backend)
+    return _response_cache
@@ -1,77 +1,111 @@
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
+
+BOUNDING_BOX_TYPES = frozenset(['LINE', 'WORD', 'TABLE', 'CELL', 'KEY_VALUE_SET', 'SELECTION_ELEMENT'])
+
+def _bbox(block: Dict) -> Dict:
+    geometry = block.get('Geometry')
+    return geometry.get('BoundingBox', {}) if geometry is not None else {}
+
+def _related_ids(block: Dict, relationship_type: str) -> List[str]:
+    ids = []
+    for relationship in block.get('Relationships', ()):
+        if relationship['Type'] == relationship_type:
+            ids.extend(relationship['Ids'])
+    return ids
 
 class TextractResponseParser:
-    def __init__(self, response: Dict):
+    """Indexes the blocks by id and type in a single pass, then builds each section from the index"""
+
+    def __init__(self, response: Dict, feature_types: Optional[List[str]] = None):
         self.response = response
+        # None means the full AnalyzeDocument tier; [] means DetectDocumentText (LINE/WORD only).
+        self.feature_types = feature_types
         self.blocks = response.get('Blocks', [])
-        self.block_map = {block['Id']: block for block in self.blocks}
 
-    def _get_text(self, block_id: str) -> str:
-        if block_id not in self.block_map:
-            return ""
-
-        block = self.block_map[block_id]
-
-        if 'Text' in block:
-            return block['Text']
+        # Bounding-box records are built during the pass too: they need every block, in response order.
+        block_map = self.block_map = {}
+        blocks_by_type = self.blocks_by_type = {}
+        bounding_boxes = self._bounding_boxes = []
+        for block in self.blocks:
+            block_id = block['Id']
+            block_type = block.get('BlockType')
+            block_map[block_id] = block
+
+            same_type = blocks_by_type.get(block_type)
+            if same_type is None:
+                blocks_by_type[block_type] = [block]
+            else:
+                same_type.append(block)
+
+            if block_type in BOUNDING_BOX_TYPES:
+                geometry = block.get('Geometry')
+                bounding_boxes.append({
+                    'id': block_id,
+                    'type': block_type,
+                    'text': block.get('Text', ''),
+                    'confidence': block.get('Confidence', 0),
+                    'bbox': geometry.get('BoundingBox', {}) if geometry is not None else {}
+                })
 
-        if 'Relationships' not in block:
-            return ""
+        self._text_cache: Dict[str, str] = {}
 
-        text_parts = []
-        for relationship in block['Relationships']:
-            if relationship['Type'] == 'CHILD':
-                for child_id in relationship['Ids']:
-                    child_block = self.block_map.get(child_id)
-                    if child_block and child_block.get('BlockType') == 'WORD':
-                        text_parts.append(child_block.get('Text', ''))
-        return ' '.join(text_parts)
+    def _get_text(self, block_id: str) -> str:
+        text = self._text_cache.get(block_id)
+        if text is not None:
+            return text
+
+        block = self.block_map.get(block_id)
+        if block is None:
+            text = ""
+        elif 'Text' in block:
+            text = block['Text']
+        else:
+            words = []
+            for child_id in _related_ids(block, 'CHILD'):
+                child_block = self.block_map.get(child_id)
+                if child_block and child_block.get('BlockType') == 'WORD':
+                    words.append(child_block.get('Text', ''))
+            text = ' '.join(words)
+
+        self._text_cache[block_id] = text
+        return text
 
     def extract_tables(self) -> List[Dict]:
         tables = []
 
-        table_blocks = [block for block in self.blocks if block.get('BlockType') == 'TABLE']
-
-        for table_block in table_blocks:
+        for table_block in self.blocks_by_type.get('TABLE', ()):
             table_data = {
                 'id': table_block['Id'],
                 'confidence': table_block.get('Confidence', 0),
                 'rows': [],
-                'bbox': table_block.get('Geometry', {}).get('BoundingBox', {})
+                'bbox': _bbox(table_block)
             }
 
             if 'Relationships' not in table_block:
                 tables.append(table_data)
                 continue
 
-            cells = []
-            for relationship in table_block['Relationships']:
-                if relationship['Type'] == 'CHILD':
-                    for cell_id in relationship['Ids']:
-                        cell_block = self.block_map.get(cell_id)
-                        if cell_block and cell_block.get('BlockType') == 'CELL':
-                            cells.append(cell_block)
-
             row_map = {}
-            for cell in cells:
-                row_index = cell.get('RowIndex', 1)
-                col_index = cell.get('ColumnIndex', 1)
+            for cell_id in _related_ids(table_block, 'CHILD'):
+                cell = self.block_map.get(cell_id)
+                if not cell or cell.get('BlockType') != 'CELL':
+                    continue
 
-                if row_index not in row_map:
-                    row_map[row_index] = {}
+                row_index = cell.get('RowIndex', 1)
+                row = row_map.get(row_index)
+                if row is None:
+                    row = row_map[row_index] = {}
 
-                cell_text = self._get_text(cell['Id'])
-                row_map[row_index][col_index] = {
-                    'text': cell_text,
+                row[cell.get('ColumnIndex', 1)] = {
+                    'text': self._get_text(cell['Id']),
                     'confidence': cell.get('Confidence', 0),
                     'row_span': cell.get('RowSpan', 1),
                     'col_span': cell.get('ColumnSpan', 1)
                 }
 
-            for row_idx in sorted(row_map.keys()):
-                row_cells = [row_map[row_idx].get(col_idx, {'text': '', 'confidence': 0})
-                             for col_idx in sorted(row_map[row_idx].keys())]
-                table_data['rows'].append(row_cells)
+            for row_idx in sorted(row_map):
+                row = row_map[row_idx]
+                table_data['rows'].append([row[col_idx] for col_idx in sorted(row)])
 
             tables.append(table_data)
 
@@ -80,81 +114,55 @@ class TextractResponseParser:
     def extract_forms(self) -> List[Dict]:
         key_value_pairs = []
 
-        key_blocks = [block for block in self.blocks
-                      if block.get('BlockType') == 'KEY_VALUE_SET'
-                      and 'KEY' in block.get('EntityTypes', [])]
-
-        for key_block in key_blocks:
-            key_text = self._get_text(key_block['Id'])
+        for key_block in self.blocks_by_type.get('KEY_VALUE_SET', ()):
+            if 'KEY' not in key_block.get('EntityTypes', []):
+                continue
 
-            value_text = ""
-            if 'Relationships' in key_block:
-                for relationship in key_block['Relationships']:
-                    if relationship['Type'] == 'VALUE':
-                        for value_id in relationship['Ids']:
-                            value_text = self._get_text(value_id)
+            # When a key links several VALUE blocks, the last one wins.
+            value_ids = _related_ids(key_block, 'VALUE')
+            value_text = self._get_text(value_ids[-1]) if value_ids else ""
 
             key_value_pairs.append({
-                'key': key_text,
+                'key': self._get_text(key_block['Id']),
                 'value': value_text,
                 'confidence': key_block.get('Confidence', 0),
-                'bbox': key_block.get('Geometry', {}).get('BoundingBox', {})
+                'bbox': _bbox(key_block)
             })
 
         return key_value_pairs
 
     def extract_checkboxes(self) -> List[Dict]:
-        checkboxes = []
-
-        selection_blocks = [block for block in self.blocks
-                            if block.get('BlockType') == 'SELECTION_ELEMENT']
-
-        for selection_block in selection_blocks:
-            checkboxes.append({
+        return [
+            {
                 'id': selection_block['Id'],
                 'status': selection_block.get('SelectionStatus', 'NOT_SELECTED'),
                 'confidence': selection_block.get('Confidence', 0),
-                'bbox': selection_block.get('Geometry', {}).get('BoundingBox', {})
-            })
-
-        return checkboxes
+                'bbox': _bbox(selection_block)
+            }
+            for selection_block in self.blocks_by_type.get('SELECTION_ELEMENT', ())
+        ]
 
     def extract_text(self) -> str:
-        text_lines = []
+        def reading_order(line_block: Dict):
+            bbox = _bbox(line_block)
+            return bbox.get('Top', 0), bbox.get('Left', 0)
 
-        line_blocks = [block for block in self.blocks if block.get('BlockType') == 'LINE']
-
-        for line_block in sorted(line_blocks, key=lambda b: (
-            b.get('Geometry', {}).get('BoundingBox', {}).get('Top', 0),
-            b.get('Geometry', {}).get('BoundingBox', {}).get('Left', 0)
-        )):
-            if 'Text' in line_block:
-                text_lines.append(line_block['Text'])
-
-        return '\n'.join(text_lines)
+        line_blocks = sorted(self.blocks_by_type.get('LINE', ()), key=reading_order)
+        return '\n'.join(line_block['Text'] for line_block in line_blocks if 'Text' in line_block)
 
     def extract_bounding_boxes(self) -> List[Dict]:
-        bboxes = []
-
-        for block in self.blocks:
-            if block.get('BlockType') in ['LINE', 'WORD', 'TABLE', 'CELL', 'KEY_VALUE_SET', 'SELECTION_ELEMENT']:
-                bbox_data = {
-                    'id': block['Id'],
-                    'type': block['BlockType'],
-                    'text': block.get('Text', ''),
-                    'confidence': block.get('Confidence', 0),
-                    'bbox': block.get('Geometry', {}).get('BoundingBox', {})
-                }
-                bboxes.append(bbox_data)
+        return list(self._bounding_boxes)
 
-        return bboxes
+    def _requested(self, *feature_types: str) -> bool:
+        return self.feature_types is None or any(feature in self.feature_types for feature in feature_types)
 
     def parse(self) -> Dict[str, Any]:
         return {
             'text': self.extract_text(),
-            'tables': self.extract_tables(),
-            'forms': self.extract_forms(),
-            'checkboxes': self.extract_checkboxes(),
+            'tables': self.extract_tables() if self._requested('TABLES') else [],
+            'forms': self.extract_forms() if self._requested('FORMS') else [],
+            'checkboxes': self.extract_checkboxes() if self._requested('TABLES', 'FORMS') else [],
             'bounding_boxes': self.extract_bounding_boxes(),
-            'document_metadata': self.response.get('DocumentMetadata', {})
+            'document_metadata': self.response.get('DocumentMetadata', {}),
+            'feature_types': self.feature_types
         }
@@ -0,0 +1,118 @@
+import os
+import tempfile
+import threading
+import requests
+from contextlib import contextmanager
+from requests.adapters import HTTPAdapter
+from typing import Iterator, Optional
+
+from app.core.config import settings, MAX_FILE_SIZE_BYTES, UPLOAD_CHUNK_SIZE_BYTES
+from app.services.s3_service import S3Service
+from app.utils.disk_cache import DiskLRUCache
+
+_source_reader = None
+_source_reader_lock = threading.Lock()
+
+class SourceReader:
+    """Fetches remote source documents to local disk, keeping recently used ones in a bounded cache"""
+
+    def __init__(self):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=settings.DOWNLOAD_POOL_SIZE)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self.cache = None
+        if settings.SOURCE_CACHE_ENABLED:
+            self.cache = DiskLRUCache(settings.SOURCE_CACHE_DIR, settings.SOURCE_CACHE_MAX_MB * 1024 * 1024)
+
+    def _suffix(self, url: str) -> str:
+        _, ext = os.path.splitext(url.split('?')[0])
+        return ext.lower()
+
+    @contextmanager
+    def open_local(self, url: str) -> Iterator[str]:
+        """Local path for the source, pinned in the cache so no worker evicts it while in use"""
+        suffix = self._suffix(url)
+
+        if self.cache:
+            with self.cache.pinned(url, suffix) as cached_path:
+                if cached_path:
+                    yield cached_path
+                    return
+
+            temp_path = self._download(url, suffix, into_cache=True)
+            if self.cache.put_file(url, temp_path, suffix):
+                with self.cache.pinned(url, suffix, count_lookup=False) as cached_path:
+                    if cached_path:
+                        yield cached_path
+                        return
+            else:
+                os.unlink(temp_path)
+
+        # No cache, too large to cache, or evicted again before it could be pinned.
+        temp_path = self._download(url, suffix)
+        try:
+            yield temp_path
+        finally:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+
+    def _download(self, url: str, suffix: str, into_cache: bool = False) -> str:
+        temp_dir = None
+        if into_cache:
+            temp_dir = self.cache.directory
+            suffix += '.tmp'
+        # Outside the cache the download is used in place, so it keeps the extension format detection relies on.
+        fd, temp_path = tempfile.mkstemp(suffix=suffix, dir=temp_dir)
+
+        try:
+            with os.fdopen(fd, 'wb') as temp_file:
+                size = 0
+                for chunk in self._iter_chunks(url):
+                    size += len(chunk)
+                    if size > MAX_FILE_SIZE_BYTES:
+                        raise Exception(f"Source file exceeds {settings.MAX_FILE_SIZE_MB} MB limit")
+                    temp_file.write(chunk)
+        except BaseException as e:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            if isinstance(e, (FileNotFoundError, KeyboardInterrupt, SystemExit)):
+                raise
+            raise Exception(f"Failed to download file from URL: {str(e)}")
+
+        return temp_path
+
+    def _iter_chunks(self, url: str) -> Iterator[bytes]:
+        s3_key = self._s3_key(url)
+        if s3_key:
+            yield from S3Service().iter_object_chunks(s3_key, UPLOAD_CHUNK_SIZE_BYTES)
+            return
+
+        with self.session.get(url, stream=True, timeout=settings.DOWNLOAD_TIMEOUT_SECONDS) as response:
+            response.raise_for_status()
+
+            content_length = response.headers.get('Content-Length')
+            if content_length and int(content_length) > MAX_FILE_SIZE_BYTES:
+                raise Exception(f"Source file exceeds {settings.MAX_FILE_SIZE_MB} MB limit")
+
+            for chunk in response.iter_content(chunk_size=UPLOAD_CHUNK_SIZE_BYTES):
+                if chunk:
+                    yield chunk
+
+    def _s3_key(self, url: str) -> Optional[str]:
+        if not settings.S3_BUCKET_NAME:
+            return None
+        return S3Service().key_from_url(url)
+
+def get_source_reader() -> SourceReader:
+    global _source_reader
+    if _source_reader is None:
+        with _source_reader_lock:
+            if _source_reader is None:
+                _source_reader = SourceReader()
+    return _source_reader
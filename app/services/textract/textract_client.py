@@ -1,49 +1,102 @@
-import boto3
-from typing import Dict, List
-from botocore.exceptions import ClientError, BotoCoreError, ReadTimeoutError, ConnectTimeoutError
-from botocore.config import Config
+import json
+import random
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, wait, as_completed, FIRST_COMPLETED
+from typing import Dict, Iterator, List, Optional
+from botocore.exceptions import ClientError, BotoCoreError, ReadTimeoutError, ConnectTimeoutError, EndpointConnectionError
 
 from app.core.config import settings
+from app.services.aws_clients import get_textract_client, get_sqs_client
+from app.services.circuit_breaker import get_circuit_breaker, CircuitOpenError
+from app.services.deadline import Deadline
+from app.services.rate_limiter import get_rate_limiter, RateLimitTimeout
+from app.services.textract.adaptive_limiter import AdaptiveConcurrencyLimiter, get_textract_limiter
+from app.services.textract.feature_tiers import FEATURE_TYPES
+from app.services.textract.response_cache import get_response_cache
+
+TRANSIENT_ERROR_CODES = ('InternalServerError', 'ServiceUnavailable', 'LimitExceededException')
+# A job notification still unclaimed after this many receives has no waiter left; its owner polls anyway.
+NOTIFICATION_MAX_RECEIVES = 10
+
+class TextractTransientError(Exception):
+    """A failure worth retrying: timeouts, dropped connections, 5xx and throttling"""
+    pass
+
+class TextractThrottlingError(TextractTransientError):
+    pass
+
+def backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff, so retrying workers do not hit Textract in lockstep"""
+    ceiling = min(settings.TEXTRACT_RETRY_MAX_SECONDS, settings.TEXTRACT_RETRY_BASE_SECONDS * 2 ** attempt)
+    return random.uniform(0, ceiling)
 
 class TextractClient:
-    def __init__(self):
-        boto_config = Config(
-            read_timeout=60,
-            connect_timeout=10,
-            retries={'max_attempts': 3, 'mode': 'standard'}
-        )
+    def __init__(self, client=None, limiter: Optional[AdaptiveConcurrencyLimiter] = None):
+        # A client passed in is used as given; the shared one is swapped per call for a
+        # shorter-timeout twin once the job deadline is closer than the read timeout.
+        self._shared_client = client is None
+        self.client = client or get_textract_client()
+        self.limiter = limiter or get_textract_limiter()
+        self.rate_limiter = get_rate_limiter('textract')
+        self.breaker = get_circuit_breaker('textract')
+
+        self.feature_types = list(FEATURE_TYPES)
+        self.response_cache = get_response_cache()
+        try:
+            self.api_version = self.client.meta.service_model.api_version
+        except AttributeError:
+            self.api_version = type(self.client).__name__
+
+    def _client_within(self, deadline: Optional[Deadline], stage: str):
+        """Client whose read timeout ends no later than `deadline`"""
+        if deadline is None or not self._shared_client:
+            return self.client
+        return get_textract_client(read_timeout=deadline.timeout(settings.TEXTRACT_READ_TIMEOUT_SECONDS, stage))
+
+    def analyze_document(
+        self,
+        image_bytes: bytes,
+        feature_types: Optional[List[str]] = None,
+        deadline: Optional[Deadline] = None
+    ) -> Dict:
+        """An empty feature list selects the cheaper DetectDocumentText (LINE/WORD blocks only)"""
+        feature_types = self.feature_types if feature_types is None else feature_types
+        client = self._client_within(deadline, "Textract call")
+        if not feature_types:
+            return self._call(client.detect_document_text, Document={'Bytes': image_bytes})
 
-        self.client = boto3.client(
-            'textract',
-            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-            region_name=settings.AWS_REGION,
-            config=boto_config
+        return self._call(
+            client.analyze_document,
+            Document={'Bytes': image_bytes},
+            FeatureTypes=feature_types
         )
 
-        self.feature_types = ['TABLES', 'FORMS', 'SIGNATURES']
+    def _call(self, operation, **kwargs) -> Dict:
+        # Throttling means Textract is up but busy; the limiters deal with that, not the breaker.
+        with self.breaker.guard(failures=(TextractTransientError,), ignore=(TextractThrottlingError,)):
+            return self._invoke(operation, **kwargs)
 
-    def analyze_document(self, image_bytes: bytes) -> Dict:
+    def _invoke(self, operation, **kwargs) -> Dict:
         try:
-            response = self.client.analyze_document(
-                Document={'Bytes': image_bytes},
-                FeatureTypes=self.feature_types
-            )
-            return response
+            return operation(**kwargs)
         except ReadTimeoutError:
-            raise Exception("AWS processing timeout. Document may be too complex. Please try a smaller file.")
-        except ConnectTimeoutError:
-            raise Exception("AWS connection timeout. Please check your network and try again.")
+            raise TextractTransientError("AWS processing timeout. Document may be too complex. Please try a smaller file.")
+        except (ConnectTimeoutError, EndpointConnectionError):
+            raise TextractTransientError("AWS connection timeout. Please check your network and try again.")
         except ClientError as e:
             error_code = e.response['Error']['Code']
             error_message = e.response['Error']['Message']
 
             if error_code == 'ThrottlingException':
-                raise Exception("AWS processing queue busy. Please wait a moment and try again.")
+                raise TextractThrottlingError("AWS processing queue busy. Please wait a moment and try again.")
             elif error_code == 'ProvisionedThroughputExceededException':
-                raise Exception("Service temporarily busy. Please try again in a few minutes.")
+                raise TextractThrottlingError("Service temporarily busy. Please try again in a few minutes.")
             elif error_code == 'InvalidParameterException':
                 raise Exception("Invalid document format. Please upload a valid PDF or image file.")
+            elif error_code in TRANSIENT_ERROR_CODES:
+                raise TextractTransientError(f"AWS processing temporarily unavailable: {error_message}")
             else:
                 raise Exception(f"AWS processing failed: {error_message}")
         except BotoCoreError as e:
@@ -51,21 +104,288 @@ class TextractClient:
         except Exception as e:
             raise Exception(f"Document processing failed: {str(e)}")
 
-    def analyze_document_batch(self, image_bytes_list: List[bytes]) -> List[Dict]:
-        responses = []
-        for idx, image_bytes in enumerate(image_bytes_list):
+    def analyze_page(
+        self,
+        page_number: int,
+        image_bytes: bytes,
+        feature_types: Optional[List[str]] = None,
+        deadline: Optional[Deadline] = None
+    ) -> Dict:
+        deadline = deadline or Deadline(None)
+        feature_types = self.feature_types if feature_types is None else feature_types
+
+        if self.response_cache:
+            cached = self.response_cache.get(image_bytes, feature_types, self.api_version)
+            if cached is not None:
+                return {
+                    'page_number': page_number,
+                    'response': cached,
+                    'status': 'success',
+                    'feature_types': feature_types,
+                    'cached': True
+                }
+
+        attempt = 0
+        while True:
+            attempt += 1
             try:
-                response = self.analyze_document(image_bytes)
-                responses.append({
-                    'page_number': idx + 1,
+                max_wait = deadline.timeout(settings.RATE_LIMIT_MAX_WAIT_SECONDS, f"page {page_number}")
+                # The shared budget is taken first: waiting on other workers' flock bucket while
+                # holding an AIMD slot would idle this worker's window without any call in flight.
+                with self.rate_limiter.slot(max_wait), self.limiter.slot() as outcome:
+                    try:
+                        response = self.analyze_document(image_bytes, feature_types, deadline)
+                    except TextractThrottlingError:
+                        outcome['throttled'] = True
+                        raise
+                if self.response_cache:
+                    self.response_cache.put(image_bytes, feature_types, self.api_version, response)
+                return {
+                    'page_number': page_number,
                     'response': response,
-                    'status': 'success'
-                })
+                    'status': 'success',
+                    'feature_types': feature_types,
+                    'attempts': attempt
+                }
+            except TextractTransientError as e:
+                delay = backoff_delay(attempt)
+                remaining = deadline.remaining()
+                if attempt > settings.TEXTRACT_PAGE_RETRIES or (remaining is not None and delay >= remaining):
+                    return self._failed_page(page_number, e, attempt, feature_types)
+                time.sleep(delay)
+            except RateLimitTimeout:
+                error = Exception("AWS processing queue busy. Please wait a moment and try again.")
+                return self._failed_page(page_number, error, attempt, feature_types)
+            except CircuitOpenError:
+                error = Exception("AWS Textract is temporarily unavailable. Please try again shortly.")
+                return self._failed_page(page_number, error, attempt, feature_types)
             except Exception as e:
-                responses.append({
-                    'page_number': idx + 1,
-                    'response': None,
-                    'status': 'failed',
-                    'error': str(e)
-                })
-        return responses
+                return self._failed_page(page_number, e, attempt, feature_types)
+
+    def _failed_page(
+        self,
+        page_number: int,
+        error: Exception,
+        attempts: int = 1,
+        feature_types: Optional[List[str]] = None
+    ) -> Dict:
+        return {
+            'page_number': page_number,
+            'response': None,
+            'status': 'failed',
+            'error': str(error),
+            'attempts': attempts,
+            'feature_types': feature_types
+        }
+
+    def start_document_analysis(
+        self,
+        bucket: str,
+        key: str,
+        feature_types: Optional[List[str]] = None,
+        deadline: Optional[Deadline] = None
+    ) -> str:
+        """Submit a stored PDF/TIFF to Textract's asynchronous API; returns the Textract JobId"""
+        deadline = deadline or Deadline(None)
+        feature_types = self.feature_types if feature_types is None else feature_types
+        kwargs = {'DocumentLocation': {'S3Object': {'Bucket': bucket, 'Name': key}}}
+        if settings.TEXTRACT_SNS_TOPIC_ARN and settings.TEXTRACT_SNS_ROLE_ARN:
+            kwargs['NotificationChannel'] = {
+                'SNSTopicArn': settings.TEXTRACT_SNS_TOPIC_ARN,
+                'RoleArn': settings.TEXTRACT_SNS_ROLE_ARN
+            }
+
+        # botocore does not retry (max_attempts=1), so transient failures are retried here. Every
+        # attempt sends the same token, so a start Textract accepted before timing out is not run twice.
+        kwargs['ClientRequestToken'] = uuid.uuid4().hex
+        attempt = 0
+        while True:
+            try:
+                with self.rate_limiter.slot(deadline.timeout(settings.RATE_LIMIT_MAX_WAIT_SECONDS, "Textract job start")):
+                    client = self._client_within(deadline, "Textract job start")
+                    if not feature_types:
+                        return self._call(client.start_document_text_detection, **kwargs)['JobId']
+                    return self._call(client.start_document_analysis, FeatureTypes=feature_types, **kwargs)['JobId']
+            except TextractTransientError:
+                attempt += 1
+                delay = backoff_delay(attempt)
+                remaining = deadline.remaining()
+                if attempt > settings.TEXTRACT_PAGE_RETRIES or (remaining is not None and delay >= remaining):
+                    raise
+                time.sleep(delay)
+            except RateLimitTimeout:
+                raise Exception("AWS processing queue busy. Please wait a moment and try again.")
+            except CircuitOpenError:
+                raise Exception("AWS Textract is temporarily unavailable. Please try again shortly.")
+
+    def _get_document_analysis(self, text_only: bool = False, **kwargs) -> Dict:
+        operation = self.client.get_document_text_detection if text_only else self.client.get_document_analysis
+        attempt = 0
+        while True:
+            try:
+                return self._call(operation, **kwargs)
+            except TextractTransientError:
+                attempt += 1
+                if attempt > settings.TEXTRACT_PAGE_RETRIES:
+                    raise
+                time.sleep(backoff_delay(attempt))
+
+    def _wait_for_notification(self, textract_job_id: str, timeout: float) -> None:
+        """Long-poll the SQS queue subscribed to the SNS topic until this job reports back or timeout passes"""
+        sqs = get_sqs_client()
+        response = sqs.receive_message(
+            QueueUrl=settings.TEXTRACT_SQS_QUEUE_URL,
+            MaxNumberOfMessages=10,
+            WaitTimeSeconds=max(1, min(20, int(timeout))),
+            AttributeNames=['ApproximateReceiveCount']
+        )
+        for message in response.get('Messages', []):
+            try:
+                body = json.loads(message['Body'])
+                notification = json.loads(body.get('Message', '{}')) if 'Message' in body else body
+            except (ValueError, TypeError):
+                notification = None
+
+            receives = int(message.get('Attributes', {}).get('ApproximateReceiveCount', 1))
+            if notification is None or notification.get('JobId') == textract_job_id or receives >= NOTIFICATION_MAX_RECEIVES:
+                sqs.delete_message(QueueUrl=settings.TEXTRACT_SQS_QUEUE_URL, ReceiptHandle=message['ReceiptHandle'])
+                continue
+
+            # Hand other workers' notifications straight back instead of hiding them for the visibility timeout.
+            try:
+                sqs.change_message_visibility(
+                    QueueUrl=settings.TEXTRACT_SQS_QUEUE_URL,
+                    ReceiptHandle=message['ReceiptHandle'],
+                    VisibilityTimeout=0
+                )
+            except ClientError as e:
+                print(f"⚠️ Failed to release Textract notification: {str(e)}")
+
+    def wait_for_document_analysis(
+        self,
+        textract_job_id: str,
+        text_only: bool = False,
+        deadline: Optional[Deadline] = None
+    ) -> Dict:
+        """Block until the job leaves IN_PROGRESS; returns the first result page"""
+        timeout = (deadline or Deadline(None)).timeout(settings.TEXTRACT_ASYNC_TIMEOUT_SECONDS, "Textract job polling")
+        poll_until = time.monotonic() + timeout
+        delay = settings.TEXTRACT_ASYNC_POLL_SECONDS
+
+        while True:
+            response = self._get_document_analysis(text_only, JobId=textract_job_id, MaxResults=1000)
+            if response['JobStatus'] != 'IN_PROGRESS':
+                return response
+
+            remaining = poll_until - time.monotonic()
+            if remaining <= 0:
+                raise Exception(f"Textract job {textract_job_id} did not finish within {timeout:.0f}s")
+
+            if settings.TEXTRACT_SQS_QUEUE_URL:
+                self._wait_for_notification(textract_job_id, min(remaining, 20))
+            else:
+                time.sleep(min(delay, remaining))
+                delay = min(delay * 2, settings.TEXTRACT_ASYNC_POLL_MAX_SECONDS)
+
+    def analyze_stored_document(
+        self,
+        bucket: str,
+        key: str,
+        feature_types: Optional[List[str]] = None,
+        deadline: Optional[Deadline] = None
+    ) -> List[Dict]:
+        """Run the asynchronous job and split its blocks into per-page results shaped like analyze_page's"""
+        feature_types = self.feature_types if feature_types is None else feature_types
+        text_only = not feature_types
+        textract_job_id = self.start_document_analysis(bucket, key, feature_types, deadline)
+        response = self.wait_for_document_analysis(textract_job_id, text_only, deadline)
+
+        if response['JobStatus'] == 'FAILED':
+            raise Exception(f"AWS processing failed: {response.get('StatusMessage', 'Textract job failed')}")
+
+        model_version_key = 'DetectDocumentTextModelVersion' if text_only else 'AnalyzeDocumentModelVersion'
+        model_version = response.get(model_version_key)
+        page_total = response.get('DocumentMetadata', {}).get('Pages', 0)
+        blocks_by_page = defaultdict(list)
+        while True:
+            for block in response.get('Blocks', []):
+                blocks_by_page[block.get('Page', 1)].append(block)
+            next_token = response.get('NextToken')
+            if not next_token:
+                break
+            response = self._get_document_analysis(text_only, JobId=textract_job_id, MaxResults=1000, NextToken=next_token)
+
+        pages = []
+        for page_number in range(1, max(page_total, max(blocks_by_page, default=0)) + 1):
+            if page_number not in blocks_by_page:
+                # PARTIAL_SUCCESS leaves pages Textract could not read without blocks.
+                pages.append(self._failed_page(page_number, Exception("Textract returned no blocks for this page")))
+                continue
+            pages.append({
+                'page_number': page_number,
+                'response': {
+                    'DocumentMetadata': {'Pages': 1},
+                    'Blocks': blocks_by_page[page_number],
+                    model_version_key: model_version
+                },
+                'status': 'success',
+                'feature_types': feature_types
+            })
+        return pages
+
+    def batch(self, max_concurrency: Optional[int] = None, deadline: Optional[Deadline] = None) -> 'PageBatch':
+        return PageBatch(self, max_concurrency or settings.TEXTRACT_JOB_CONCURRENCY, deadline)
+
+    def analyze_document_batch(self, image_bytes_list: List[bytes], max_concurrency: Optional[int] = None) -> List[Dict]:
+        with self.batch(max_concurrency) as batch:
+            for idx, image_bytes in enumerate(image_bytes_list):
+                batch.submit(idx + 1, image_bytes)
+            return batch.results()
+
+class PageBatch:
+    """Analyzes pages on a bounded thread pool; results() keeps submission order, collect_*() hands back finished pages"""
+
+    def __init__(self, textract_client: TextractClient, max_concurrency: int, deadline: Optional[Deadline] = None):
+        self.textract_client = textract_client
+        self.deadline = deadline
+        self.max_concurrency = max(1, max_concurrency)
+        # Pages waiting for a slot hold their image bytes, so submit() blocks past this.
+        self.max_pending = self.max_concurrency * 2
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix='textract')
+        self._futures = []
+        self._collected = set()
+
+    def submit(self, page_number: int, image_bytes: bytes, feature_types: Optional[List[str]] = None) -> None:
+        pending = [future for future in self._futures if not future.done()]
+        if len(pending) >= self.max_pending:
+            wait(pending, return_when=FIRST_COMPLETED)
+        self._futures.append(
+            self._executor.submit(self.textract_client.analyze_page, page_number, image_bytes, feature_types, self.deadline)
+        )
+
+    def results(self) -> List[Dict]:
+        return [future.result() for future in self._futures]
+
+    def collect_completed(self) -> List[Dict]:
+        """Pages that finished since the last collect, without blocking"""
+        finished = [future for future in self._futures if future.done() and future not in self._collected]
+        self._collected.update(finished)
+        return [future.result() for future in finished]
+
+    def collect_remaining(self) -> Iterator[Dict]:
+        """Block for the outstanding pages, yielding each as soon as it finishes"""
+        outstanding = [future for future in self._futures if future not in self._collected]
+        for future in as_completed(outstanding):
+            self._collected.add(future)
+            yield future.result()
+
+    def close(self) -> None:
+        for future in self._futures:
+            future.cancel()
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self) -> 'PageBatch':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
@@ -1,13 +1,23 @@
+import os
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
 
-from app.models import Document
+from app.models import Document, DocumentPage
+from app.core.config import settings
 from app.services.textract.textract_client import TextractClient
 from app.services.textract.document_processor import DocumentProcessor
+from app.services.textract.page_encoder import PageEncoder
+from app.services.textract.native_text import NativeTextExtractor
+from app.services.textract.page_filter import PageFilter
+from app.services.textract.feature_tiers import FEATURE_TYPES, FeatureDetector, parse_features, features_label, features_cover
 from app.services.textract.response_parser import TextractResponseParser
 from app.services.markdown.markdown_converter import MarkdownConverter
 from app.services.gemini.gemini_service import GeminiService
+from app.services.dedup_service import DedupService
+from app.services.s3_service import S3Service
+from app.services.circuit_breaker import get_circuit_breaker, OPEN
+from app.services.deadline import Deadline
 
 class TextractService:
     def __init__(self, db: Session):
@@ -39,127 +49,629 @@ class TextractService:
             )
         return document
 
-    def process_document(self, job_id: str, user_id: str, mode: str = "fast") -> Dict[str, Any]:
-        document = self._get_document(job_id, user_id)
+    def _reuse_processed_duplicate(self, document: Document, duplicate: Document) -> Dict[str, Any]:
+        DedupService(self.db).reuse_results(document, duplicate)
+        self._update_status(document, "complete")
+
+        aggregated_data = document.textract_response or {}
+        gemini_response = document.gemini_response or {}
+
+        return {
+            "job_id": document.job_id,
+            "status": "complete",
+            "mode": document.processing_mode,
+            "pages_processed": aggregated_data.get('pages_processed', aggregated_data.get('total_pages')),
+            "feature_types": document.textract_features,
+            "summary": aggregated_data.get('summary', {}),
+            "source": gemini_response.get("source", "textract") if gemini_response.get("success") else "textract",
+            "duplicate_of": duplicate.job_id
+        }
+
+    def _select_pages(self, document: Document, pages: Optional[str]) -> Tuple[Optional[List[int]], Optional[int]]:
+        if not pages:
+            return None, None
 
         try:
-            document.processing_mode = mode
-            self._update_status(document, "processing")
+            total_pages = self.processor.get_page_count(document.file_path, document.content_hash)
+            return self.processor.parse_page_selection(pages, total_pages), total_pages
+        except FileNotFoundError as e:
+            raise HTTPException(status_code=404, detail={"error": "FileNotFound", "message": f"File not found: {str(e)}"})
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail={"error": "InvalidPageSelection", "message": str(e)})
 
-            image_bytes_list, page_count = self.processor.process_document(document.file_path)
+    def _extract_native_text(self, document: Document, selected_pages: Optional[List[int]]) -> Tuple[Dict[int, Dict], int]:
+        if not settings.NATIVE_TEXT_ENABLED or not self.processor.is_pdf(document.file_path.split('?')[0]):
+            return {}, 0
 
-            textract_responses = self.textract_client.analyze_document_batch(image_bytes_list)
+        try:
+            with self.processor.local_source(document.file_path) as local_path:
+                return NativeTextExtractor().extract_pages(local_path, selected_pages)
+        except FileNotFoundError:
+            raise
+        except Exception as e:
+            print(f"⚠️ Native text extraction unavailable, using Textract for all pages: {str(e)}")
+            return {}, 0
 
-            all_pages_data = []
-            failed_pages = []
+    def _async_source_key(
+        self,
+        document: Document,
+        selected_pages: Optional[List[int]],
+        target_pages: Optional[List[int]],
+        scanned_pages: Optional[List[int]]
+    ) -> Optional[str]:
+        """S3 key to hand to Textract's asynchronous API, or None to rasterize and analyze page by page"""
+        if not settings.TEXTRACT_ASYNC_ENABLED or selected_pages is not None or not settings.S3_BUCKET_NAME:
+            return None
+        # Textract can only read objects from a bucket in its own region.
+        if settings.S3_REGION != settings.AWS_REGION:
+            return None
 
-            for page_data in textract_responses:
-                if page_data['status'] == 'success':
-                    parser = TextractResponseParser(page_data['response'])
-                    parsed_data = parser.parse()
-                    all_pages_data.append({
-                        'page_number': page_data['page_number'],
-                        'raw_response': page_data['response'],
-                        'parsed_data': parsed_data
-                    })
-                else:
-                    failed_pages.append({
-                        'page_number': page_data['page_number'],
-                        'error': page_data['error']
-                    })
+        extension = os.path.splitext(document.file_path.split('?')[0])[1].lower()
+        if extension not in ('.pdf', '.tiff', '.tif'):
+            return None
 
-            if failed_pages:
-                error_msg = f"Failed to process {len(failed_pages)} page(s): {failed_pages}"
-                self._update_status(document, "failed", error_msg)
-                return {
-                    "job_id": job_id,
-                    "status": "failed",
-                    "error": error_msg
-                }
+        key = S3Service().key_from_url(document.file_path)
+        if not key:
+            return None
 
-            all_pages_text = []
-            all_pages_markdown = []
+        if scanned_pages is not None:
+            page_count = len(scanned_pages)
+        else:
+            page_count = self.processor.get_page_count(document.file_path, document.content_hash)
+        if page_count == 0:
+            return None
 
-            for page in all_pages_data:
-                page_text = page['parsed_data'].get('text', '')
-                if page_text:
-                    all_pages_text.append(f"--- Page {page['page_number']} ---\n{page_text}")
+        # The async job analyzes every page, so a file whose text layer already covers
+        # most pages is cheaper to send page by page, whatever its size.
+        if target_pages and page_count * 2 < len(target_pages):
+            return None
 
-                converter = MarkdownConverter(
-                    parsed_data=page['parsed_data'],
-                    page_number=page['page_number']
-                )
-                page_markdown = converter.convert()
-                if page_markdown:
-                    all_pages_markdown.append(page_markdown)
-
-            full_text = '\n\n'.join(all_pages_text)
-            full_markdown = '\n\n---\n\n'.join(all_pages_markdown)
-
-            aggregated_data = {
-                'total_pages': page_count,
-                'pages': all_pages_data,
-                'summary': {
-                    'total_tables': sum(len(page['parsed_data']['tables']) for page in all_pages_data),
-                    'total_forms': sum(len(page['parsed_data']['forms']) for page in all_pages_data),
-                    'total_checkboxes': sum(len(page['parsed_data']['checkboxes']) for page in all_pages_data),
-                    'total_text_length': len(full_text)
-                }
+        large_file = (document.file_size_bytes or 0) >= settings.TEXTRACT_ASYNC_MIN_SIZE_MB * 1024 * 1024
+        return key if page_count >= settings.TEXTRACT_ASYNC_MIN_PAGES or large_file else None
+
+    def _load_page_results(self, document: Document, requested_features: Optional[List[str]]) -> Dict[int, Dict]:
+        """Pages a previous run already finished (analyzed or found blank), keyed by page number"""
+        rows = self.db.query(DocumentPage).filter(
+            DocumentPage.document_id == document.id,
+            DocumentPage.status.in_(("success", "blank"))
+        ).all()
+        # A page analyzed with a cheaper tier than this run asks for is redone, not kept.
+        rows = [row for row in rows if row.status == "blank" or features_cover(row.feature_types, requested_features)]
+        return {
+            row.page_number: {
+                'page_number': row.page_number,
+                'response': row.raw_response,
+                'status': row.status,
+                'engine': row.engine,
+                'feature_types': row.feature_types,
+                'duplicate_of': row.duplicate_of,
+                'resumed': True
             }
+            for row in rows
+        }
 
-            document.textract_response = aggregated_data
-            document.raw_text = full_text
-            document.markdown_output = full_markdown
+    def _save_page_result(self, document: Document, page_data: Dict) -> None:
+        row = self.db.query(DocumentPage).filter(
+            DocumentPage.document_id == document.id,
+            DocumentPage.page_number == page_data['page_number']
+        ).first()
+        attempts = page_data.get('attempts', 1)
+        if row is None:
+            row = DocumentPage(document_id=document.id, page_number=page_data['page_number'])
+            self.db.add(row)
+        else:
+            attempts += row.attempts or 0
 
-            gemini_result = None
-            final_status = "complete"
+        row.status = page_data['status']
+        row.engine = page_data.get('engine')
+        row.feature_types = page_data.get('feature_types')
+        row.raw_response = page_data.get('response')
+        row.duplicate_of = str(page_data['duplicate_of']) if page_data.get('duplicate_of') is not None else None
+        row.attempts = attempts
+        row.error = page_data.get('error')
+        self.db.commit()
 
-            if mode == "fast":
+    def _clear_page_results(self, document: Document) -> None:
+        self.db.query(DocumentPage).filter(DocumentPage.document_id == document.id).delete(synchronize_session=False)
+        self.db.commit()
+
+    def _resolve_features(self, features: Optional[str]) -> Optional[List[str]]:
+        try:
+            return parse_features(features or settings.TEXTRACT_DEFAULT_FEATURES)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail={"error": "InvalidFeatures", "message": str(e)})
+
+    def _plan_pages(
+        self,
+        document: Document,
+        selected_pages: Optional[List[int]],
+        native_page_count: int,
+        native_responses: Dict[int, Dict],
+        completed_pages: Dict[int, Dict]
+    ) -> Tuple[Optional[List[int]], Optional[List[int]]]:
+        """(pages this run covers, pages still to rasterize); None means every page, counted while rendering"""
+        target_pages = selected_pages
+        if target_pages is None and native_page_count:
+            target_pages = list(range(1, native_page_count + 1))
+        if target_pages is None and completed_pages:
+            target_pages = list(range(1, self.processor.get_page_count(document.file_path, document.content_hash) + 1))
+        if target_pages is None:
+            return None, None
+        return target_pages, [page for page in target_pages if page not in native_responses and page not in completed_pages]
+
+    @staticmethod
+    def _empty_scan() -> Dict[str, Any]:
+        """Per-page results of one analysis pass plus what rasterizing and filtering found along the way"""
+        return {
+            'responses': {},
+            'blank_pages': [],
+            'encodings': {},
+            'fingerprints': {},
+            'near_duplicates': {},
+            'first_page': None
+        }
+
+    def _analyze_stored_document(
+        self,
+        document: Document,
+        stored_key: str,
+        requested_features: Optional[List[str]],
+        native_responses: Dict[int, Dict],
+        deadline: Deadline
+    ) -> Dict[int, Dict]:
+        # Long documents go to Textract as-is; nothing is rasterized locally, so
+        # "auto" has no pages to inspect and falls back to the full tier.
+        stored_features = requested_features if requested_features is not None else list(FEATURE_TYPES)
+        responses_by_page = {}
+        for page_data in self.textract_client.analyze_stored_document(
+            settings.S3_BUCKET_NAME, stored_key, stored_features, deadline
+        ):
+            if page_data['page_number'] in native_responses:
+                continue
+            page_data['engine'] = 'textract_async'
+            responses_by_page[page_data['page_number']] = page_data
+            self._save_page_result(document, page_data)
+        return responses_by_page
+
+    def _match_repeated_page(
+        self,
+        page_filter: PageFilter,
+        page_number: int,
+        fingerprint: Dict,
+        page_features: Optional[List[str]],
+        near_duplicates: Dict[str, Any]
+    ) -> Tuple[Optional[int], Optional[Dict]]:
+        """(identical page earlier in this run, reusable result from an earlier job); lookalikes only go into near_duplicates"""
+        twin = page_filter.find_duplicate(fingerprint)
+        if twin is not None:
+            return twin, None
+
+        previous = page_filter.find_in_history(fingerprint)
+        if previous and features_cover(previous['feature_types'], page_features):
+            return None, {
+                'page_number': page_number,
+                'response': previous['raw_response'],
+                'parsed_data': previous['parsed_data'],
+                'status': 'success',
+                'error': None,
+                'engine': 'history',
+                'feature_types': previous['feature_types'],
+                'duplicate_of': f"{previous['job_id']}:{previous['page_number']}"
+            }
+
+        # Lookalikes are only reported; the page itself still goes to Textract.
+        similar = page_filter.find_similar(fingerprint)
+        if similar is None:
+            similar_previous = page_filter.find_similar_in_history(fingerprint)
+            if similar_previous:
+                similar = f"{similar_previous['job_id']}:{similar_previous['page_number']}"
+        if similar is not None:
+            near_duplicates[str(page_number)] = similar
+        return None, None
+
+    def _analyze_rendered_pages(
+        self,
+        document: Document,
+        scanned_pages: Optional[List[int]],
+        requested_features: Optional[List[str]],
+        deadline: Deadline,
+        native_candidates: Optional[Dict[int, Dict]] = None
+    ) -> Dict[str, Any]:
+        """Rasterizes, filters and analyzes pages; returns the per-page results and what the filter found.
+
+        A page in `native_candidates` keeps its text layer unless the feature detector
+        sees a table or form among the requested features; only then is it sent to Textract.
+        """
+        native_candidates = native_candidates or {}
+        scan = self._empty_scan()
+        responses_by_page = scan['responses']
+        duplicate_pages = {}
+
+        feature_detector = FeatureDetector() if requested_features is None or native_candidates else None
+        page_filter = PageFilter(self.db) if settings.PAGE_FILTER_ENABLED else None
+        if page_filter:
+            page_filter.load_history(document)
+
+        # Pages arrive as the raster pool finishes them and are analyzed concurrently,
+        # so Textract starts on page 1 while later pages are still rendering.
+        with self.textract_client.batch(deadline=deadline) as batch:
+            for page_number, image_bytes, encoding in self.processor.iter_document_pages(
+                document.file_path, file_hash=document.content_hash, pages=scanned_pages
+            ):
+                # Persist whatever Textract finished meanwhile, so a crash or failure keeps it.
+                for page_data in batch.collect_completed():
+                    page_data['engine'] = 'textract'
+                    responses_by_page[page_data['page_number']] = page_data
+                    self._save_page_result(document, page_data)
+
+                if page_filter:
+                    fingerprint = page_filter.fingerprint(image_bytes)
+                    if page_filter.is_blank(fingerprint):
+                        scan['blank_pages'].append(page_number)
+                        self._save_page_result(document, {'page_number': page_number, 'status': 'blank'})
+                        continue
+
+                if scan['first_page'] is None:
+                    scan['first_page'] = (image_bytes, encoding)
+                scan['encodings'][page_number] = encoding
+
+                page_features = requested_features
+                if feature_detector:
+                    detected = feature_detector.detect(image_bytes)
+                    if requested_features is None:
+                        page_features = detected
+                    needed = detected if requested_features is None else [f for f in requested_features if f in detected]
+                    if page_number in native_candidates and not needed:
+                        native = {
+                            'page_number': page_number,
+                            'response': native_candidates[page_number],
+                            'status': 'success',
+                            'engine': 'native',
+                            'feature_types': []
+                        }
+                        responses_by_page[page_number] = native
+                        self._save_page_result(document, native)
+                        continue
+
+                reused = None
+                if page_filter:
+                    twin, reused = self._match_repeated_page(
+                        page_filter, page_number, fingerprint, page_features, scan['near_duplicates']
+                    )
+                    if twin is not None:
+                        duplicate_pages[page_number] = twin
+                    else:
+                        page_filter.remember(page_number, fingerprint)
+                    scan['fingerprints'][str(page_number)] = fingerprint
+
+                if reused is not None:
+                    responses_by_page[page_number] = reused
+                    self._save_page_result(document, reused)
+                elif page_number not in duplicate_pages:
+                    batch.submit(page_number, image_bytes, page_features)
+
+            for page_data in batch.collect_remaining():
+                page_data['engine'] = 'textract'
+                responses_by_page[page_data['page_number']] = page_data
+                self._save_page_result(document, page_data)
+
+        for page_number, twin in duplicate_pages.items():
+            responses_by_page[page_number] = {
+                **responses_by_page[twin], 'page_number': page_number, 'engine': 'duplicate', 'duplicate_of': twin,
+                'attempts': 0
+            }
+            self._save_page_result(document, responses_by_page[page_number])
+
+        return scan
+
+    def _parse_pages(self, textract_responses: List[Dict], page_encodings: Dict[int, Dict]) -> Tuple[List[Dict], List[Dict]]:
+        """(parsed successful pages, failed pages), in page order"""
+        all_pages_data = []
+        failed_pages = []
+        parsed_by_page = {}
+
+        for page_data in textract_responses:
+            if page_data['status'] != 'success':
+                failed_pages.append({
+                    'page_number': page_data['page_number'],
+                    'error': page_data['error']
+                })
+                continue
+
+            parsed_data = page_data.get('parsed_data') or parsed_by_page.get(page_data.get('duplicate_of'))
+            if parsed_data is None:
+                parser = TextractResponseParser(page_data['response'], page_data.get('feature_types'))
+                parsed_data = parser.parse()
+            parsed_by_page[page_data['page_number']] = parsed_data
+            page_entry = {
+                'page_number': page_data['page_number'],
+                'raw_response': page_data['response'],
+                'parsed_data': parsed_data,
+                'engine': page_data['engine'],
+                'feature_types': page_data.get('feature_types'),
+                'encoding': page_encodings.get(page_data['page_number'])
+            }
+            if page_data.get('duplicate_of') is not None:
+                page_entry['duplicate_of'] = page_data['duplicate_of']
+            all_pages_data.append(page_entry)
+
+        return all_pages_data, failed_pages
+
+    def _render_output(self, all_pages_data: List[Dict]) -> Tuple[str, str]:
+        """(full text, full markdown) of the parsed pages"""
+        all_pages_text = []
+        all_pages_markdown = []
+
+        for page in all_pages_data:
+            page_text = page['parsed_data'].get('text', '')
+            if page_text:
+                all_pages_text.append(f"--- Page {page['page_number']} ---\n{page_text}")
+
+            converter = MarkdownConverter(
+                parsed_data=page['parsed_data'],
+                page_number=page['page_number']
+            )
+            page_markdown = converter.convert()
+            if page_markdown:
+                all_pages_markdown.append(page_markdown)
+
+        return '\n\n'.join(all_pages_text), '\n\n---\n\n'.join(all_pages_markdown)
+
+    def _features_used(self, requested_features: Optional[List[str]], all_pages_data: List[Dict]) -> str:
+        # With "auto" the stored tier is the union of what each page actually requested.
+        if requested_features is not None:
+            return features_label(requested_features)
+        used_features = set()
+        for page in all_pages_data:
+            used_features.update(FEATURE_TYPES if page['feature_types'] is None else page['feature_types'])
+        return features_label(sorted(used_features))
+
+    def _aggregate_results(
+        self,
+        document: Document,
+        pages: Optional[str],
+        total_pages: int,
+        all_pages_data: List[Dict],
+        failed_pages: List[Dict],
+        textract_responses: List[Dict],
+        scan: Dict[str, Any],
+        resumed_pages: int,
+        full_text: str
+    ) -> Dict[str, Any]:
+        blank_pages = scan['blank_pages']
+        reused_pages = sum(1 for page in all_pages_data if page['engine'] in ('duplicate', 'history'))
+        return {
+            'total_pages': total_pages,
+            'pages_processed': len(all_pages_data),
+            'page_selection': pages,
+            'page_engines': {str(page['page_number']): page['engine'] for page in all_pages_data},
+            'feature_types': document.textract_features,
+            'blank_pages': blank_pages,
+            'failed_pages': failed_pages,
+            'page_fingerprints': scan['fingerprints'],
+            'near_duplicates': scan['near_duplicates'],
+            'pages': all_pages_data,
+            'summary': {
+                'total_tables': sum(len(page['parsed_data']['tables']) for page in all_pages_data),
+                'total_forms': sum(len(page['parsed_data']['forms']) for page in all_pages_data),
+                'total_checkboxes': sum(len(page['parsed_data']['checkboxes']) for page in all_pages_data),
+                'total_text_length': len(full_text),
+                'native_text_pages': sum(1 for page in all_pages_data if page['engine'] == 'native'),
+                'textract_pages': sum(1 for page in all_pages_data if page['engine'] == 'textract'),
+                'textract_async_pages': sum(1 for page in all_pages_data if page['engine'] == 'textract_async'),
+                'textract_cache_hits': sum(
+                    1 for page in textract_responses if page['engine'] == 'textract' and page.get('cached')
+                ),
+                'blank_pages_skipped': len(blank_pages),
+                'duplicate_pages_reused': reused_pages,
+                'near_duplicate_pages': len(scan['near_duplicates']),
+                'textract_calls_saved': len(blank_pages) + reused_pages,
+                'resumed_pages': resumed_pages,
+                'failed_pages': len(failed_pages)
+            }
+        }
+
+    def _refine_with_gemini(
+        self,
+        document: Document,
+        mode: str,
+        all_pages_data: List[Dict],
+        failed_pages: List[Dict],
+        full_markdown: str,
+        first_page: Optional[Tuple[bytes, Dict]],
+        deadline: Deadline
+    ) -> Optional[Dict]:
+        """Sets document.gemini_response (and the refined markdown); returns Gemini's result when it ran"""
+        page_count = len(all_pages_data)
+        if mode == "fast":
+            document.gemini_response = {
+                "skipped": True,
+                "reason": "Fast mode - Gemini refinement disabled"
+            }
+            return None
+        if mode != "smart":
+            return None
+
+        gemini_result = None
+        try:
+            if failed_pages:
                 document.gemini_response = {
                     "skipped": True,
-                    "reason": "Fast mode - Gemini refinement disabled"
+                    "reason": f"{len(failed_pages)} page(s) failed - Smart mode refinement skipped"
                 }
-            elif mode == "smart":
-                try:
-                    if page_count == 1:
-                        gemini_result = self.gemini_service.refine_markdown(
-                            textract_markdown=full_markdown,
-                            image_bytes=image_bytes_list[0],
-                            file_size_bytes=document.file_size_bytes,
-                            page_count=page_count,
-                            mime_type="image/png"
-                        )
-
-                        if gemini_result.get("success"):
-                            document.markdown_output = gemini_result["final_markdown"]
-                            document.gemini_response = gemini_result
-                        else:
-                            document.gemini_response = {
-                                "skipped": True,
-                                "reason": gemini_result.get("reason", "Not eligible")
-                            }
-                    else:
-                        document.gemini_response = {
-                            "skipped": True,
-                            "reason": f"Multi-page document ({page_count} pages) - Smart mode only supports single-page"
-                        }
+            elif get_circuit_breaker('gemini').state == OPEN or deadline.expired:
+                # Gemini is failing or the job is out of time; serve the Textract output now.
+                document.gemini_response = {
+                    "skipped": True,
+                    "reason": "AI service unavailable or deadline reached - using Textract output",
+                    "fallback_to_textract": True
+                }
+            elif page_count == 1:
+                if first_page is None:
+                    first_page = self.processor.get_page(
+                        document.file_path, all_pages_data[0]['page_number'], file_hash=document.content_hash
+                    )
+                page_bytes, page_encoding = first_page
+                gemini_bytes, gemini_encoding = PageEncoder().reencode(
+                    page_bytes, 'gemini', source_dpi=page_encoding['dpi']
+                )
+                gemini_result = self.gemini_service.refine_markdown(
+                    textract_markdown=full_markdown,
+                    image_bytes=gemini_bytes,
+                    file_size_bytes=document.file_size_bytes,
+                    page_count=page_count,
+                    mime_type=gemini_encoding['mime_type'],
+                    deadline=deadline
+                )
+                gemini_result['image_encoding'] = gemini_encoding
 
-                except Exception as gemini_error:
+                if gemini_result.get("success"):
+                    document.markdown_output = gemini_result["final_markdown"]
+                    document.gemini_response = gemini_result
+                else:
                     document.gemini_response = {
-                        "error": str(gemini_error),
-                        "fallback_to_textract": True
+                        "skipped": True,
+                        "reason": gemini_result.get("reason", "Not eligible")
+                    }
+            else:
+                document.gemini_response = {
+                    "skipped": True,
+                    "reason": f"Multi-page document ({page_count} pages) - Smart mode only supports single-page"
+                }
+
+        except Exception as gemini_error:
+            document.gemini_response = {
+                "error": str(gemini_error),
+                "fallback_to_textract": True
+            }
+        return gemini_result
+
+    def process_document(
+        self,
+        job_id: str,
+        user_id: str,
+        mode: str = "fast",
+        pages: Optional[str] = None,
+        features: Optional[str] = None,
+        resume: bool = False
+    ) -> Dict[str, Any]:
+        deadline = Deadline(settings.JOB_DEADLINE_SECONDS)
+        document = self._get_document(job_id, user_id)
+
+        selected_pages, total_pages = self._select_pages(document, pages)
+        requested_features = self._resolve_features(features)
+        completed_pages = self._load_page_results(document, requested_features) if resume else {}
+        if selected_pages is not None:
+            completed_pages = {page: data for page, data in completed_pages.items() if page in selected_pages}
+
+        if selected_pages is None and not completed_pages:
+            duplicate = DedupService(self.db).find_processed_duplicate(document, mode, requested_features)
+            if duplicate:
+                return self._reuse_processed_duplicate(document, duplicate)
+
+        try:
+            document.processing_mode = mode
+            self._update_status(document, "processing")
+            if not completed_pages:
+                self._clear_page_results(document)
+
+            native_pages, native_page_count = self._extract_native_text(document, selected_pages)
+            native_pages = {
+                page_number: response for page_number, response in native_pages.items() if page_number not in completed_pages
+            }
+            # The text layer has no tables, forms or checkboxes. A text-only run takes it as is;
+            # other runs still render those pages and use it only where no structure is detected.
+            native_responses, native_candidates = (native_pages, {}) if requested_features == [] else ({}, native_pages)
+            target_pages, scanned_pages = self._plan_pages(
+                document, selected_pages, native_page_count, native_responses, completed_pages
+            )
+
+            textract_responses = [
+                {'page_number': page_number, 'response': response, 'status': 'success', 'engine': 'native', 'feature_types': []}
+                for page_number, response in native_responses.items()
+            ]
+            for page_data in textract_responses:
+                self._save_page_result(document, page_data)
+
+            # A resumed run keeps every page the earlier run finished and only redoes the rest.
+            textract_responses.extend(data for data in completed_pages.values() if data['status'] == 'success')
+
+            scan = self._empty_scan()
+            ocr_pages = scanned_pages
+            if scanned_pages is not None:
+                ocr_pages = [page for page in scanned_pages if page not in native_candidates]
+            stored_key = None if completed_pages else self._async_source_key(document, selected_pages, target_pages, ocr_pages)
+            if stored_key:
+                # The job analyzes every page anyway, so only a text-only run keeps its native pages.
+                scan['responses'] = self._analyze_stored_document(
+                    document, stored_key, requested_features, native_responses, deadline
+                )
+            elif scanned_pages is None or scanned_pages:
+                scan = self._analyze_rendered_pages(
+                    document, scanned_pages, requested_features, deadline, native_candidates
+                )
+            scan['blank_pages'] = [
+                page for page, data in completed_pages.items() if data['status'] == 'blank'
+            ] + scan['blank_pages']
+
+            textract_responses.extend(scan['responses'].values())
+            textract_responses.sort(key=lambda page: page['page_number'])
+
+            all_pages_data, failed_pages = self._parse_pages(textract_responses, scan['encodings'])
+            page_count = len(all_pages_data)
+            error_msg = None
+            if failed_pages:
+                error_msg = f"Failed to process {len(failed_pages)} page(s): {failed_pages}"
+                if not all_pages_data:
+                    self._update_status(document, "failed", error_msg)
+                    return {
+                        "job_id": job_id,
+                        "status": "failed",
+                        "error": error_msg,
+                        "failed_pages": failed_pages
                     }
 
-            self._update_status(document, final_status)
+            full_text, full_markdown = self._render_output(all_pages_data)
+            document.textract_features = self._features_used(requested_features, all_pages_data)
+            aggregated_data = self._aggregate_results(
+                document,
+                pages,
+                total_pages or native_page_count or len(textract_responses) + len(scan['blank_pages']),
+                all_pages_data,
+                failed_pages,
+                textract_responses,
+                scan,
+                len(completed_pages),
+                full_text
+            )
+
+            document.textract_response = aggregated_data
+            document.raw_text = full_text
+            document.markdown_output = full_markdown
+
+            gemini_result = self._refine_with_gemini(
+                document, mode, all_pages_data, failed_pages, full_markdown, scan['first_page'], deadline
+            )
+
+            # Partial results keep the successful pages; /process?resume=true redoes the rest.
+            final_status = "partial" if failed_pages else "complete"
+            if final_status == "complete":
+                document.error_message = None
+                self._clear_page_results(document)
+            self._update_status(document, final_status, error_msg)
 
             response_data = {
                 "job_id": job_id,
                 "status": final_status,
                 "mode": mode,
                 "pages_processed": page_count,
+                "feature_types": document.textract_features,
                 "summary": aggregated_data['summary']
             }
 
+            if failed_pages:
+                response_data["failed_pages"] = failed_pages
+
             if gemini_result and gemini_result.get("success"):
                 response_data["gemini_refinement"] = {
                     "source": gemini_result.get("source"),
@@ -182,3 +694,12 @@ class TextractService:
             error_msg = f"Textract processing failed: {str(e)}"
             self._update_status(document, "failed", error_msg)
             raise HTTPException(status_code=500, detail={"error": "ProcessingError", "message": error_msg})
+
+    def process_batch(self, job_ids: List[str], user_id: str, mode: str = "fast") -> List[Dict[str, Any]]:
+        results = []
+        for job_id in job_ids:
+            try:
+                results.append(self.process_document(job_id, user_id, mode))
+            except HTTPException as e:
+                results.append({"job_id": job_id, "status": "failed", "error": e.detail})
+        return results
@@ -1,61 +1,345 @@
 import os
-import shutil
+import asyncio
+import hashlib
+from datetime import datetime, timezone
 from pathlib import Path
+from typing import Tuple, Optional, List, Dict
+from urllib.parse import quote, unquote
 from fastapi import UploadFile, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session, load_only
 
 from app.models import Document
-from app.schemas import UploadResponse, DocumentStatus, DocumentResponse
-from app.core.config import settings
+from app.schemas import (
+    UploadResponse,
+    UploadUrlRequest,
+    UploadUrlResponse,
+    BatchUploadItem,
+    BatchUploadResponse,
+    DocumentStatus,
+    DocumentResponse
+)
+from app.core.config import settings, MAX_FILE_SIZE_BYTES, S3_MULTIPART_PART_SIZE_BYTES
 from app.services.s3_service import S3Service
+from app.services.dedup_service import DedupService
+from app.services.textract.feature_tiers import parse_features
 from app.utils.file_utils import (
     generate_job_id,
     generate_safe_filename,
     validate_file,
-    validate_file_size
+    validate_file_metadata,
+    validate_file_signature,
+    file_too_large_error,
+    empty_file_error,
+    iter_upload_chunks,
+    stream_upload_to_disk
 )
 
+def already_completed_error(job_id: str) -> HTTPException:
+    return HTTPException(
+        status_code=409,
+        detail={
+            "error": "UploadAlreadyCompleted",
+            "message": f"Upload for job_id '{job_id}' was already completed"
+        }
+    )
+
 class UploadService:
     def __init__(self, db: Session):
         self.db = db
+        self._s3_service = None
 
-    async def upload_document(self, file: UploadFile, user_id: str) -> UploadResponse:
+    @property
+    def s3_service(self) -> S3Service:
+        if self._s3_service is None:
+            self._s3_service = S3Service()
+        return self._s3_service
+
+    async def upload_document(self, file: UploadFile, user_id: str, mode: Optional[str] = None) -> UploadResponse:
         try:
             validate_file(file)
-            validate_file_size(file)
 
             job_id = generate_job_id()
             safe_filename = generate_safe_filename(file.filename)
-            file_path = os.path.join(settings.UPLOAD_DIR, safe_filename)
 
-            with open(file_path, "wb") as buffer:
-                shutil.copyfileobj(file.file, buffer)
+            file_path, file_size, content_hash = await self._store_upload(file, user_id, safe_filename)
+
+            duplicate = DedupService(self.db).find_stored_duplicate(content_hash, user_id)
+            document = await self._build_document(
+                file, user_id, job_id, safe_filename, file_path, file_size, content_hash, mode, duplicate
+            )
+
+            self.db.add(document)
+            try:
+                self.db.commit()
+            except Exception:
+                if not duplicate:
+                    await run_in_threadpool(self._discard_stored_copy, file_path, user_id, safe_filename)
+                raise
+            self.db.refresh(document)
+
+            return UploadResponse(
+                job_id=document.job_id,
+                filename=document.original_filename,
+                file_size_bytes=document.file_size_bytes,
+                mime_type=document.mime_type,
+                status=document.status,
+                processing_mode=document.processing_mode,
+                duplicate_of=duplicate.job_id if duplicate else None,
+                created_at=document.created_at,
+                message=self._upload_message(document, duplicate)
+            )
+
+        except HTTPException:
+            raise
+        except Exception as e:
+            self.db.rollback()
+            raise HTTPException(
+                status_code=500,
+                detail={
+                    "error": "InternalServerError",
+                    "message": "Failed to upload document",
+                    "details": str(e)
+                }
+            )
+
+    async def upload_batch(self, files: List[UploadFile], user_id: str, mode: Optional[str] = None) -> BatchUploadResponse:
+        if len(files) > settings.MAX_BATCH_FILES:
+            raise HTTPException(
+                status_code=400,
+                detail={
+                    "error": "TooManyFiles",
+                    "message": f"Batch contains {len(files)} files, maximum is {settings.MAX_BATCH_FILES}"
+                }
+            )
 
-            file_size = os.path.getsize(file_path)
+        semaphore = asyncio.Semaphore(settings.UPLOAD_BATCH_CONCURRENCY)
 
-            s3_url = None
-            if settings.S3_BUCKET_NAME:
+        async def store(file: UploadFile) -> Dict:
+            async with semaphore:
                 try:
-                    s3_service = S3Service()
-                    s3_key = f"uploads/{user_id}/{safe_filename}"
-                    s3_url = s3_service.upload_file(file_path, s3_key, file.content_type)
-                    print(f"✅ S3 upload successful: {s3_url}")
-
-                    try:
-                        os.remove(file_path)
-                    except Exception as cleanup_error:
-                        print(f"⚠️ Failed to delete local file: {cleanup_error}")
-                except Exception as s3_error:
-                    print(f"⚠️ S3 upload failed (file saved locally): {str(s3_error)}")
+                    validate_file(file)
+                    safe_filename = generate_safe_filename(file.filename)
+                    file_path, file_size, content_hash = await self._store_upload(file, user_id, safe_filename)
+                    return {
+                        "safe_filename": safe_filename,
+                        "file_path": file_path,
+                        "file_size": file_size,
+                        "content_hash": content_hash
+                    }
+                except HTTPException as e:
+                    return {"error": e.detail if isinstance(e.detail, dict) else {"message": str(e.detail)}}
+                except Exception as e:
+                    return {"error": {"error": "UploadFailed", "message": str(e)}}
+
+        stored = await asyncio.gather(*(store(file) for file in files))
+
+        items = []
+        documents = []
+        batch_hashes = {}
+        created_at = datetime.now(timezone.utc)
+        # Copies this batch stored and still owns; removed again if the rows can't be recorded.
+        owned_copies = {
+            result["file_path"]: result["safe_filename"] for result in stored if "error" not in result
+        }
+
+        try:
+            duplicates = DedupService(self.db).find_stored_duplicates(
+                [result["content_hash"] for result in stored if "error" not in result], user_id
+            )
+
+            for file, result in zip(files, stored):
+                if "error" in result:
+                    items.append(BatchUploadItem(filename=file.filename, status="failed", error=result["error"]))
+                    continue
+
+                stored_path = result["file_path"]
+                duplicate = duplicates.get(result["content_hash"])
+                batch_twin = batch_hashes.get(result["content_hash"]) if settings.DEDUP_ENABLED else None
+                if batch_twin is not None:
+                    await run_in_threadpool(
+                        self._discard_stored_copy, stored_path, user_id, result["safe_filename"]
+                    )
+                    owned_copies.pop(stored_path, None)
+                    result["file_path"] = batch_twin.file_path
+                    duplicate = None
+
+                document = await self._build_document(
+                    file,
+                    user_id,
+                    generate_job_id(),
+                    result["safe_filename"],
+                    result["file_path"],
+                    result["file_size"],
+                    result["content_hash"],
+                    mode,
+                    duplicate
+                )
+                if duplicate:
+                    owned_copies.pop(stored_path, None)
+                document.created_at = created_at
+                document.updated_at = created_at
+                batch_hashes.setdefault(result["content_hash"], document)
+                documents.append(document)
+
+                items.append(BatchUploadItem(
+                    filename=file.filename,
+                    job_id=document.job_id,
+                    status=document.status,
+                    file_size_bytes=document.file_size_bytes,
+                    duplicate_of=duplicate.job_id if duplicate else (batch_twin.job_id if batch_twin is not None else None),
+                    message=self._upload_message(document, duplicate)
+                ))
+
+            if documents:
+                self.db.add_all(documents)
+                self.db.commit()
+
+        except Exception as e:
+            self.db.rollback()
+            for file_path, safe_filename in owned_copies.items():
+                await run_in_threadpool(self._discard_stored_copy, file_path, user_id, safe_filename)
+            raise HTTPException(
+                status_code=500,
+                detail={
+                    "error": "InternalServerError",
+                    "message": "Failed to record batch upload",
+                    "details": str(e)
+                }
+            )
+
+        succeeded = sum(1 for item in items if item.job_id)
+        return BatchUploadResponse(
+            total=len(files),
+            succeeded=succeeded,
+            failed=len(files) - succeeded,
+            items=items
+        )
+
+    async def _build_document(
+        self,
+        file: UploadFile,
+        user_id: str,
+        job_id: str,
+        safe_filename: str,
+        file_path: str,
+        file_size: int,
+        content_hash: str,
+        mode: Optional[str],
+        duplicate: Optional[Document] = None
+    ) -> Document:
+        """`duplicate` is the stored copy found for content_hash; this upload's own copy is then discarded"""
+        if duplicate:
+            await run_in_threadpool(self._discard_stored_copy, file_path, user_id, safe_filename)
+            file_path = duplicate.file_path
+
+        document = Document(
+            job_id=job_id,
+            user_id=user_id,
+            filename=safe_filename,
+            original_filename=file.filename,
+            file_path=file_path,
+            file_size_bytes=file_size,
+            mime_type=file.content_type,
+            content_hash=content_hash,
+            status="uploaded"
+        )
+
+        if duplicate and mode:
+            # Same rule as processing: no partial runs, and only a feature tier that covers the default.
+            dedup = DedupService(self.db)
+            processed = dedup.find_processed_duplicate(
+                document, mode, parse_features(settings.TEXTRACT_DEFAULT_FEATURES)
+            )
+            if processed:
+                dedup.reuse_results(document, processed)
+
+        return document
+
+    def _upload_message(self, document: Document, duplicate: Optional[Document]) -> str:
+        if duplicate and document.status == "complete":
+            return "Duplicate of a processed document - results reused"
+        return "File uploaded successfully"
+
+    def create_upload_url(self, request: UploadUrlRequest, user_id: str) -> UploadUrlResponse:
+        if not settings.S3_BUCKET_NAME:
+            raise HTTPException(
+                status_code=503,
+                detail={
+                    "error": "DirectUploadUnavailable",
+                    "message": "Direct uploads require S3 storage to be configured"
+                }
+            )
+
+        validate_file_metadata(request.filename, request.content_type)
+        if request.file_size_bytes and request.file_size_bytes > MAX_FILE_SIZE_BYTES:
+            raise file_too_large_error(request.file_size_bytes)
+
+        job_id = generate_job_id()
+        safe_filename = generate_safe_filename(request.filename)
+        s3_key = f"uploads/{user_id}/{job_id}/{safe_filename}"
+        metadata = {"original-filename": quote(request.filename)}
+
+        try:
+            presigned = self.s3_service.generate_presigned_upload_post(
+                s3_key, request.content_type, metadata, MAX_FILE_SIZE_BYTES
+            )
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail={
+                    "error": "InternalServerError",
+                    "message": "Failed to create upload URL",
+                    "details": str(e)
+                }
+            )
+
+        return UploadUrlResponse(
+            job_id=job_id,
+            upload_url=presigned["url"],
+            fields=presigned["fields"],
+            expires_in=settings.S3_PRESIGNED_URL_EXPIRY_SECONDS
+        )
+
+    def complete_upload(self, job_id: str, user_id: str) -> UploadResponse:
+        if self.db.query(Document.id).filter(Document.job_id == job_id).first():
+            raise already_completed_error(job_id)
+
+        s3_service = self.s3_service
+        s3_key = s3_service.find_object_key(f"uploads/{user_id}/{job_id}/")
+        if not s3_key:
+            raise HTTPException(
+                status_code=404,
+                detail={
+                    "error": "UploadNotFound",
+                    "message": f"No uploaded file found for job_id '{job_id}'"
+                }
+            )
+
+        safe_filename = s3_key.rsplit('/', 1)[-1]
+
+        try:
+            head = s3_service.head_object(s3_key)
+            file_size = head['ContentLength']
+            content_type = head.get('ContentType', '')
+            original_filename = unquote(head.get('Metadata', {}).get('original-filename', '')) or safe_filename
+
+            validate_file_metadata(original_filename, content_type)
+            if file_size == 0:
+                raise empty_file_error()
+            if file_size > MAX_FILE_SIZE_BYTES:
+                raise file_too_large_error(file_size)
+            validate_file_signature(s3_service.read_object_range(s3_key, 16), content_type)
 
             document = Document(
                 job_id=job_id,
                 user_id=user_id,
                 filename=safe_filename,
-                original_filename=file.filename,
-                file_path=s3_url if s3_url else file_path,
+                original_filename=original_filename,
+                file_path=s3_service.get_public_url(s3_key),
                 file_size_bytes=file_size,
-                mime_type=file.content_type,
+                mime_type=content_type,
                 status="uploaded"
             )
 
@@ -73,18 +357,94 @@ class UploadService:
             )
 
         except HTTPException:
+            s3_service.delete_file(s3_key)
             raise
+        except IntegrityError:
+            # A concurrent completion inserted the row first; the object is now theirs, so keep it.
+            self.db.rollback()
+            raise already_completed_error(job_id)
         except Exception as e:
             self.db.rollback()
             raise HTTPException(
                 status_code=500,
                 detail={
                     "error": "InternalServerError",
-                    "message": "Failed to upload document",
+                    "message": "Failed to complete upload",
                     "details": str(e)
                 }
             )
 
+    async def _store_upload(self, file: UploadFile, user_id: str, safe_filename: str) -> Tuple[str, int, str]:
+        if settings.S3_BUCKET_NAME:
+            s3_key = f"uploads/{user_id}/{safe_filename}"
+            try:
+                s3_url, file_size, content_hash = await self._stream_to_s3(file, s3_key)
+                print(f"✅ S3 upload successful: {s3_url}")
+                return s3_url, file_size, content_hash
+            except HTTPException:
+                raise
+            except Exception as s3_error:
+                print(f"⚠️ S3 upload failed (saving locally): {str(s3_error)}")
+                await file.seek(0)
+
+        file_path = os.path.join(settings.UPLOAD_DIR, safe_filename)
+        file_size, content_hash = await stream_upload_to_disk(file, file_path)
+        return file_path, file_size, content_hash
+
+    def _discard_stored_copy(self, file_path: str, user_id: str, safe_filename: str) -> None:
+        if file_path.startswith('http://') or file_path.startswith('https://'):
+            self.s3_service.delete_file(f"uploads/{user_id}/{safe_filename}")
+            return
+
+        try:
+            os.remove(file_path)
+        except OSError as cleanup_error:
+            print(f"⚠️ Failed to delete duplicate local file: {cleanup_error}")
+
+    async def _stream_to_s3(self, file: UploadFile, s3_key: str) -> Tuple[str, int, str]:
+        s3_service = self.s3_service
+        sha256 = hashlib.sha256()
+        file_size = 0
+        buffer = bytearray()
+        upload_id = None
+        parts = []
+
+        try:
+            async for chunk in iter_upload_chunks(file, sha256):
+                file_size += len(chunk)
+                buffer.extend(chunk)
+
+                if len(buffer) >= S3_MULTIPART_PART_SIZE_BYTES:
+                    if upload_id is None:
+                        upload_id = await run_in_threadpool(
+                            s3_service.create_multipart_upload, s3_key, file.content_type
+                        )
+                    part = await run_in_threadpool(
+                        s3_service.upload_part, s3_key, upload_id, len(parts) + 1, bytes(buffer)
+                    )
+                    parts.append(part)
+                    buffer.clear()
+
+            if upload_id is None:
+                s3_url = await run_in_threadpool(
+                    s3_service.put_object, s3_key, bytes(buffer), file.content_type
+                )
+            else:
+                if buffer:
+                    part = await run_in_threadpool(
+                        s3_service.upload_part, s3_key, upload_id, len(parts) + 1, bytes(buffer)
+                    )
+                    parts.append(part)
+                s3_url = await run_in_threadpool(
+                    s3_service.complete_multipart_upload, s3_key, upload_id, parts
+                )
+        except BaseException:
+            if upload_id is not None:
+                await run_in_threadpool(s3_service.abort_multipart_upload, s3_key, upload_id)
+            raise
+
+        return s3_url, file_size, sha256.hexdigest()
+
     def get_document_status(self, job_id: str, user_id: str) -> DocumentStatus:
         document = self.db.query(Document).filter(
             Document.job_id == job_id,
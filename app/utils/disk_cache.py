@@ -0,0 +1,249 @@
+import fcntl
+import os
+import hashlib
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Optional, Dict, Any, Iterator
+
+# Other workers write to the same directory, so the index is rebuilt from disk at least this often.
+INDEX_REFRESH_SECONDS = 10
+# A .tmp file this old belongs to a write or download that died before its rename.
+STALE_TEMP_SECONDS = 3600
+# Eviction frees down to this share of max_bytes, so a full cache is not rescanned on every write.
+EVICT_TARGET_RATIO = 0.9
+
+class DiskLRUCache:
+    """Size-bounded key/value store on local disk with least-recently-used eviction.
+
+    The directory may be shared by several worker processes. Reads touch a file's
+    mtime, and eviction rescans the directory, so size and recency are judged
+    across every worker rather than from this process's own writes. A file handed
+    out by pinned() holds a shared flock, and eviction skips any file it cannot
+    lock exclusively.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._indexed_at = 0.0
+        os.makedirs(self.directory, exist_ok=True)
+        with self._lock:
+            self._load_index()
+
+    def _load_index(self) -> None:
+        """Rebuilds the index from the directory, oldest mtime first, and removes stale .tmp files"""
+        now = time.time()
+        found = []
+        for root, _, filenames in os.walk(self.directory):
+            for filename in filenames:
+                path = os.path.join(root, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                if filename.endswith('.tmp'):
+                    if now - stat.st_mtime > STALE_TEMP_SECONDS:
+                        try:
+                            os.remove(path)
+                        except OSError:
+                            pass
+                    continue
+                found.append((stat.st_mtime, filename, stat.st_size))
+
+        self._entries = OrderedDict((filename, size) for _, filename, size in sorted(found))
+        self._total_bytes = sum(self._entries.values())
+        self._indexed_at = time.monotonic()
+
+    def _filename(self, key: str, suffix: str = '') -> str:
+        return hashlib.sha256(key.encode('utf-8')).hexdigest() + suffix
+
+    def _path(self, filename: str) -> str:
+        return os.path.join(self.directory, filename[:2], filename)
+
+    def get(self, key: str) -> Optional[bytes]:
+        filename = self._filename(key)
+        path = self._path(filename)
+
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self.misses += 1
+                size = self._entries.pop(filename, None)
+                if size is not None:
+                    self._total_bytes -= size
+            return None
+
+        with self._lock:
+            self.hits += 1
+            if filename not in self._entries:
+                self._entries[filename] = len(data)
+                self._total_bytes += len(data)
+            self._entries.move_to_end(filename)
+        return data
+
+    @contextmanager
+    def pinned(self, key: str, suffix: str = '', count_lookup: bool = True) -> Iterator[Optional[str]]:
+        """Path of the cached file, or None on a miss; no worker can evict the file until the block exits"""
+        filename = self._filename(key, suffix)
+        path = self._path(filename)
+
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            fd = None
+
+        try:
+            if fd is not None:
+                fcntl.flock(fd, fcntl.LOCK_SH)
+                # An evictor may have unlinked or a writer replaced the path before the lock was taken.
+                try:
+                    current = os.stat(path).st_ino == os.fstat(fd).st_ino
+                except OSError:
+                    current = False
+                if current:
+                    os.utime(path)
+
+            if fd is None or not current:
+                with self._lock:
+                    self.misses += count_lookup
+                yield None
+                return
+
+            size = os.fstat(fd).st_size
+            with self._lock:
+                self.hits += count_lookup
+                if filename not in self._entries:
+                    self._entries[filename] = size
+                    self._total_bytes += size
+                self._entries.move_to_end(filename)
+            yield path
+        finally:
+            if fd is not None:
+                os.close(fd)
+
+    def _remove_unpinned(self, path: str) -> bool:
+        """Deletes the file unless a reader holds it pinned; a missing file counts as removed"""
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            return True
+        try:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return False
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return True
+        finally:
+            os.close(fd)
+
+    def put_file(self, key: str, source_path: str, suffix: str = '') -> Optional[str]:
+        """Move a file into the cache; returns its new path, or None if it is too large to cache"""
+        size = os.path.getsize(source_path)
+        if size > self.max_bytes:
+            return None
+
+        filename = self._filename(key, suffix)
+        path = self._path(filename)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(source_path, path)
+
+        with self._lock:
+            previous = self._entries.pop(filename, 0)
+            self._entries[filename] = size
+            self._total_bytes += size - previous
+            self._evict()
+        return path
+
+    def set(self, key: str, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+
+        filename = self._filename(key)
+        path = self._path(filename)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+
+        with self._lock:
+            previous = self._entries.pop(filename, 0)
+            self._entries[filename] = len(data)
+            self._total_bytes += len(data) - previous
+            self._evict()
+
+    def delete(self, key: str) -> None:
+        filename = self._filename(key)
+        try:
+            os.remove(self._path(filename))
+        except OSError:
+            pass
+        with self._lock:
+            size = self._entries.pop(filename, None)
+            if size is not None:
+                self._total_bytes -= size
+
+    def _evict(self) -> None:
+        if self._total_bytes > self.max_bytes or time.monotonic() - self._indexed_at > INDEX_REFRESH_SECONDS:
+            self._load_index()
+        if self._total_bytes <= self.max_bytes:
+            return
+        target = self.max_bytes * EVICT_TARGET_RATIO
+        for filename, size in list(self._entries.items()):
+            if self._total_bytes <= target:
+                break
+            if not self._remove_unpinned(self._path(filename)):
+                continue
+            del self._entries[filename]
+            self._total_bytes -= size
+            self.evictions += 1
+
+    def purge(self) -> int:
+        """Removes every entry in the directory, including other workers', except files pinned right now"""
+        with self._lock:
+            self._load_index()
+            removed = 0
+            for filename, size in list(self._entries.items()):
+                if self._remove_unpinned(self._path(filename)):
+                    del self._entries[filename]
+                    self._total_bytes -= size
+                    removed += 1
+            return removed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'backend': 'disk',
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'size_bytes': self._total_bytes,
+                'max_bytes': self.max_bytes
+            }
@@ -1,10 +1,13 @@
 import os
 import uuid
+import hashlib
+import aiofiles
 from datetime import datetime
 from pathlib import Path
+from typing import Tuple, Optional, AsyncIterator
 from fastapi import UploadFile, HTTPException
 
-from app.core.config import settings, MAX_FILE_SIZE_BYTES
+from app.core.config import settings, MAX_FILE_SIZE_BYTES, UPLOAD_CHUNK_SIZE_BYTES
 
 def generate_job_id() -> str:
     timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
@@ -18,18 +21,18 @@ def generate_safe_filename(original_filename: str) -> str:
     safe_filename = f"{timestamp}_{random_id}{extension}"
     return safe_filename
 
-def validate_file(file: UploadFile) -> None:
-    if file.content_type not in settings.ALLOWED_MIME_TYPES:
+def validate_file_metadata(filename: str, content_type: str) -> None:
+    if content_type not in settings.ALLOWED_MIME_TYPES:
         raise HTTPException(
             status_code=415,
             detail={
                 "error": "UnsupportedMediaType",
-                "message": f"Unsupported file type: {file.content_type}",
+                "message": f"Unsupported file type: {content_type}",
                 "allowed_types": settings.ALLOWED_MIME_TYPES
             }
         )
 
-    file_extension = Path(file.filename).suffix.lower()
+    file_extension = Path(filename).suffix.lower()
     if file_extension not in settings.ALLOWED_EXTENSIONS:
         raise HTTPException(
             status_code=415,
@@ -40,22 +43,99 @@ def validate_file(file: UploadFile) -> None:
             }
         )
 
-def validate_file_size(file: UploadFile) -> int:
+def validate_file(file: UploadFile) -> None:
+    validate_file_metadata(file.filename, file.content_type)
+
+FILE_SIGNATURES = {
+    b"%PDF": "application/pdf",
+    b"\x89PNG\r\n\x1a\n": "image/png",
+    b"\xff\xd8\xff": "image/jpeg",
+    b"II*\x00": "image/tiff",
+    b"MM\x00*": "image/tiff"
+}
+
+def detect_mime_type(header: bytes) -> Optional[str]:
+    for signature, mime_type in FILE_SIGNATURES.items():
+        if header.startswith(signature):
+            return mime_type
+    return None
+
+def validate_file_signature(header: bytes, content_type: str) -> None:
+    detected = detect_mime_type(header)
+    declared = "image/jpeg" if content_type == "image/jpg" else content_type
+
+    if detected != declared:
+        raise HTTPException(
+            status_code=415,
+            detail={
+                "error": "FileContentMismatch",
+                "message": f"File content does not match declared type: {content_type}",
+                "detected_type": detected
+            }
+        )
+
+def file_too_large_error(file_size: int) -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail={
+            "error": "FileTooLarge",
+            "message": f"File exceeds maximum size limit",
+            "max_size_mb": settings.MAX_FILE_SIZE_MB,
+            "file_size_mb": round(file_size / (1024 * 1024), 2)
+        }
+    )
+
+def empty_file_error() -> HTTPException:
+    return HTTPException(
+        status_code=400,
+        detail={
+            "error": "EmptyFile",
+            "message": "Uploaded file is empty"
+        }
+    )
+
+async def iter_upload_chunks(file: UploadFile, sha256) -> AsyncIterator[bytes]:
+    """Yield the upload body chunk by chunk, validating signature and size and updating sha256.
+
+    Reads the UploadFile Starlette has already parsed, which it spools to a
+    temporary file above 1 MB, so large bodies still touch disk once before this.
+    """
     file_size = 0
-    for chunk in file.file:
+    while True:
+        chunk = await file.read(UPLOAD_CHUNK_SIZE_BYTES)
+        if not chunk:
+            if file_size == 0:
+                raise empty_file_error()
+            return
+
+        if file_size == 0:
+            validate_file_signature(chunk, file.content_type)
+
         file_size += len(chunk)
         if file_size > MAX_FILE_SIZE_BYTES:
-            raise HTTPException(
-                status_code=413,
-                detail={
-                    "error": "FileTooLarge",
-                    "message": f"File exceeds maximum size limit",
-                    "max_size_mb": settings.MAX_FILE_SIZE_MB,
-                    "file_size_mb": round(file_size / (1024 * 1024), 2)
-                }
-            )
-    file.file.seek(0)
-    return file_size
+            raise file_too_large_error(file_size)
+
+        sha256.update(chunk)
+        yield chunk
+
+async def stream_upload_to_disk(file: UploadFile, destination: str) -> Tuple[int, str]:
+    """Write the upload to disk in a single pass; returns (size_bytes, sha256_hex)"""
+    file_size = 0
+    sha256 = hashlib.sha256()
+
+    try:
+        async with aiofiles.open(destination, "wb") as buffer:
+            async for chunk in iter_upload_chunks(file, sha256):
+                file_size += len(chunk)
+                await buffer.write(chunk)
+    except BaseException:
+        try:
+            os.remove(destination)
+        except OSError:
+            pass
+        raise
+
+    return file_size, sha256.hexdigest()
 
 def ensure_upload_directory():
     os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
\ No newline at end of file
@@ -0,0 +1,60 @@
+"""Per-request cost of building boto3 clients versus reusing the shared ones.
+
+    python -m benchmarks.bench_aws_clients [iterations]
+
+Runs offline: only client construction is timed, so the saved TLS handshakes
+of the pooled keep-alive connections come on top of the numbers shown here.
+"""
+import sys
+import time
+import statistics
+import boto3
+from botocore.config import Config
+
+from app.core.config import settings
+from app.services.aws_clients import reset_clients
+from app.services.s3_service import S3Service
+from app.services.textract.textract_client import TextractClient
+
+
+def per_request_clients():
+    boto3.client('s3', region_name=settings.S3_REGION)
+    boto3.client(
+        'textract',
+        aws_access_key_id=settings.AWS_ACCESS_KEY_ID or 'bench',
+        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY or 'bench',
+        region_name=settings.AWS_REGION,
+        config=Config(read_timeout=60, connect_timeout=10, retries={'max_attempts': 3, 'mode': 'standard'})
+    )
+
+
+def shared_clients():
+    S3Service()
+    TextractClient()
+
+
+def measure(func, iterations: int):
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+
+    reset_clients()
+    before = measure(per_request_clients, iterations)
+    after = measure(shared_clients, iterations)
+
+    for label, timings in (("per-request clients", before), ("shared clients", after)):
+        print(
+            f"{label:>20}: mean {statistics.mean(timings):8.3f} ms  "
+            f"p50 {statistics.median(timings):8.3f} ms  max {max(timings):8.3f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""MarkdownConverter.convert on parsed synthetic pages, and the share of it spent building the geometry store.
+
+    python -m benchmarks.bench_markdown_conversion [blocks] [iterations]
+
+Pages come from bench_response_parser.synthetic_response. The converter builds
+its columnar geometry from the bounding-box dicts on every call; "build" times
+that step alone. The dense-form pages scatter labelled checkboxes over the
+page, which is where checkbox labelling used to scan every line for every checkbox.
+"""
+import random
+import statistics
+import sys
+import time
+
+from app.services.markdown.markdown_converter import MarkdownConverter
+from app.services.textract.geometry_store import GeometryStore
+from app.services.textract.response_parser import TextractResponseParser
+from benchmarks.bench_response_parser import synthetic_response
+
+
+def _median_ms(run, iterations: int) -> float:
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def dense_form(checkboxes: int, seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    bounding_boxes = []
+    selection_elements = []
+    for index in range(checkboxes):
+        left = rng.random() * 0.9
+        top = rng.random() * 0.95
+        selection_elements.append({
+            'id': f"s{index}", 'status': 'SELECTED' if index % 2 else 'NOT_SELECTED', 'confidence': 88.0,
+            'bbox': {'Left': left, 'Top': top, 'Width': 0.01, 'Height': 0.01}
+        })
+        bounding_boxes.append({
+            'id': f"l{index}", 'type': 'LINE', 'text': f"Option {index}", 'confidence': 99.0,
+            'bbox': {'Left': left + 0.02, 'Top': top, 'Width': 0.1, 'Height': 0.01}
+        })
+    return {'text': '', 'tables': [], 'forms': [], 'checkboxes': selection_elements, 'bounding_boxes': bounding_boxes}
+
+
+def main():
+    target_blocks = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    for size in (target_blocks // 5, target_blocks, target_blocks * 4):
+        parsed = TextractResponseParser(synthetic_response(size)).parse()
+        convert_ms = _median_ms(lambda: MarkdownConverter(parsed_data=parsed).convert(), iterations)
+        build_ms = _median_ms(lambda: GeometryStore.from_blocks(parsed['bounding_boxes']), iterations)
+        print(
+            f"{len(parsed['bounding_boxes']):7d} boxes, {len(parsed['checkboxes']):4d} checkboxes: "
+            f"convert {convert_ms:8.2f} ms  build {build_ms:7.2f} ms"
+        )
+
+    for checkboxes in (100, 500, 2000):
+        parsed = dense_form(checkboxes)
+        convert_ms = _median_ms(lambda: MarkdownConverter(parsed_data=parsed).convert(), max(1, iterations // 4))
+        print(f"dense form, {checkboxes:4d} checkboxes: {convert_ms:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""End-to-end page pipeline against the local stand-ins, no network or AWS account needed.
+
+    SERVICE_BACKEND=synthetic python -m benchmarks.bench_pipeline_offline [pages] [documents]
+
+Each document is uploaded to the stub S3 store, fetched back through the
+source reader, rasterized, analyzed by the stub Textract under the adaptive
+limiter, parsed and converted to markdown; the first pages are then refined
+by the stub Gemini on the main thread, where its SIGALRM timeout works. Run once with SERVICE_BACKEND=record against real
+services to capture responses, then with SERVICE_BACKEND=replay to load-test
+with them. Latency, error and throttle rates come from the STUB_* settings.
+"""
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image, ImageDraw
+
+from app.core.config import settings
+from app.services.gemini.gemini_service import GeminiService
+from app.services.markdown.markdown_converter import MarkdownConverter
+from app.services.s3_service import S3Service
+from app.services.stubs.backends import backend_stats
+from app.services.textract.document_processor import DocumentProcessor
+from app.services.textract.response_parser import TextractResponseParser
+from app.services.textract.source_reader import get_source_reader
+from app.services.textract.textract_client import TextractClient
+
+
+def make_document(pages: int, seed: int) -> str:
+    frames = []
+    for page in range(pages):
+        image = Image.new('L', (1275, 1650), 255)
+        draw = ImageDraw.Draw(image)
+        for line in range(30):
+            draw.text((100, 100 + line * 45), f"Document {seed} page {page + 1} line {line + 1} " * 3, fill=0)
+        frames.append(image)
+    fd, path = tempfile.mkstemp(suffix='.tiff')
+    os.close(fd)
+    frames[0].save(path, save_all=True, append_images=frames[1:], dpi=(150, 150), compression='tiff_deflate')
+    return path
+
+
+def process(path: str, timings: dict):
+    start = time.perf_counter()
+    s3 = S3Service()
+    url = s3.upload_file(path, f"bench/{uuid.uuid4().hex}.tiff", 'image/tiff')
+    timings['upload'].append(time.perf_counter() - start)
+
+    processor = DocumentProcessor()
+    textract_client = TextractClient()
+    start = time.perf_counter()
+    with get_source_reader().open_local(url) as local_path:
+        with textract_client.batch() as batch:
+            for page_number, image_bytes, encoding in processor.iter_document_pages(local_path):
+                batch.submit(page_number, image_bytes)
+            pages = batch.results()
+    timings['analyze'].append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    markdown = []
+    for page in pages:
+        if page['status'] != 'success':
+            continue
+        parsed = TextractResponseParser(page['response'], page.get('feature_types')).parse()
+        markdown.append(MarkdownConverter(parsed_data=parsed, page_number=page['page_number']).convert())
+    timings['convert'].append(time.perf_counter() - start)
+
+    failed = sum(1 for page in pages if page['status'] != 'success')
+    return failed, markdown[0] if markdown else ''
+
+
+def refine(path: str, markdown: str, timings: dict) -> None:
+    start = time.perf_counter()
+    with open(path, 'rb') as f:
+        first_page = io.BytesIO()
+        Image.open(f).save(first_page, format='PNG')
+    GeminiService().refine_markdown(markdown, first_page.getvalue(), 0, 1)
+    timings['refine'].append(time.perf_counter() - start)
+
+
+def main():
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    documents = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    if not settings.S3_BUCKET_NAME:
+        settings.S3_BUCKET_NAME = 'bench'
+
+    paths = [make_document(pages, seed) for seed in range(documents)]
+    timings = {stage: [] for stage in ('upload', 'analyze', 'convert', 'refine')}
+    try:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=min(4, documents)) as pool:
+            results = list(pool.map(lambda path: process(path, timings), paths))
+        for path, (_, markdown) in zip(paths, results):
+            refine(path, markdown, timings)
+        failed = sum(failed_pages for failed_pages, _ in results)
+        elapsed = time.perf_counter() - start
+    finally:
+        for path in paths:
+            os.unlink(path)
+
+    print(f"{documents} documents x {pages} pages in {elapsed:.2f} s ({documents * pages / elapsed:.1f} pages/s), {failed} failed pages")
+    for stage, values in timings.items():
+        print(f"  {stage:>8}: median {statistics.median(values) * 1000:8.1f} ms  max {max(values) * 1000:8.1f} ms")
+    for upstream, stats in backend_stats().items():
+        print(f"  {upstream:>8}: {stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""TextractResponseParser.parse on large synthetic AnalyzeDocument responses.
+
+    python -m benchmarks.bench_response_parser [blocks] [iterations]
+
+Each response is a dense page: LINE/WORD text plus tables, key-value pairs
+and selection elements in roughly the proportions of a busy form, scaled
+to about `blocks` blocks.
+"""
+import statistics
+import sys
+import time
+
+from app.services.textract.response_parser import TextractResponseParser
+
+
+def _geometry(left, top, width=0.05, height=0.01):
+    return {'BoundingBox': {'Width': width, 'Height': height, 'Left': left, 'Top': top}}
+
+
+def synthetic_response(target_blocks: int) -> dict:
+    blocks = []
+    page_children = []
+    counter = iter(range(1, 10 ** 9))
+
+    def word(text, left, top):
+        block_id = f"w{next(counter)}"
+        blocks.append({'BlockType': 'WORD', 'Id': block_id, 'Text': text, 'Confidence': 98.5, 'Geometry': _geometry(left, top)})
+        return block_id
+
+    unit = max(1, target_blocks // 100)
+    # Text: ~60% of blocks, 8 words per line.
+    for line_index in range(unit * 6):
+        top = (line_index % 90) / 100
+        word_ids = [word(f"word{line_index}_{i}", 0.05 + i * 0.1, top) for i in range(7)]
+        line_id = f"l{next(counter)}"
+        blocks.append({
+            'BlockType': 'LINE', 'Id': line_id, 'Text': ' '.join(f"word{line_index}_{i}" for i in range(7)),
+            'Confidence': 99.1, 'Geometry': _geometry(0.05, top, 0.7),
+            'Relationships': [{'Type': 'CHILD', 'Ids': word_ids}]
+        })
+        page_children.append(line_id)
+
+    # Tables: ~25% of blocks, 5x4 cells with one word each.
+    for table_index in range(max(1, unit // 2)):
+        cell_ids = []
+        for row in range(1, 6):
+            for col in range(1, 5):
+                cell_id = f"c{next(counter)}"
+                blocks.append({
+                    'BlockType': 'CELL', 'Id': cell_id, 'RowIndex': row, 'ColumnIndex': col,
+                    'RowSpan': 1, 'ColumnSpan': 1, 'Confidence': 95.0,
+                    'Geometry': _geometry(col * 0.2, row * 0.02),
+                    'Relationships': [{'Type': 'CHILD', 'Ids': [word(f"t{table_index}r{row}c{col}", col * 0.2, row * 0.02)]}]
+                })
+                cell_ids.append(cell_id)
+        table_id = f"t{next(counter)}"
+        blocks.append({
+            'BlockType': 'TABLE', 'Id': table_id, 'Confidence': 97.0, 'Geometry': _geometry(0.2, 0.5, 0.8, 0.1),
+            'Relationships': [{'Type': 'CHILD', 'Ids': cell_ids}]
+        })
+        page_children.append(table_id)
+
+    # Forms and checkboxes: the remainder.
+    for pair_index in range(unit * 2):
+        top = (pair_index % 50) / 60
+        value_id = f"v{next(counter)}"
+        key_id = f"k{next(counter)}"
+        blocks.append({
+            'BlockType': 'KEY_VALUE_SET', 'Id': value_id, 'EntityTypes': ['VALUE'], 'Confidence': 90.0,
+            'Geometry': _geometry(0.5, top),
+            'Relationships': [{'Type': 'CHILD', 'Ids': [word(f"value{pair_index}", 0.5, top)]}]
+        })
+        blocks.append({
+            'BlockType': 'KEY_VALUE_SET', 'Id': key_id, 'EntityTypes': ['KEY'], 'Confidence': 92.0,
+            'Geometry': _geometry(0.1, top),
+            'Relationships': [
+                {'Type': 'VALUE', 'Ids': [value_id]},
+                {'Type': 'CHILD', 'Ids': [word(f"key{pair_index}", 0.1, top), word("label", 0.15, top)]}
+            ]
+        })
+        blocks.append({
+            'BlockType': 'SELECTION_ELEMENT', 'Id': f"s{next(counter)}",
+            'SelectionStatus': 'SELECTED' if pair_index % 2 else 'NOT_SELECTED', 'Confidence': 88.0,
+            'Geometry': _geometry(0.9, top, 0.01)
+        })
+
+    blocks.insert(0, {
+        'BlockType': 'PAGE', 'Id': 'page', 'Geometry': _geometry(0, 0, 1, 1),
+        'Relationships': [{'Type': 'CHILD', 'Ids': page_children}]
+    })
+    return {'DocumentMetadata': {'Pages': 1}, 'Blocks': blocks}
+
+
+def main():
+    target_blocks = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    for size in (target_blocks // 5, target_blocks, target_blocks * 4):
+        response = synthetic_response(size)
+        timings = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            parsed = TextractResponseParser(response).parse()
+            timings.append(time.perf_counter() - start)
+        median = statistics.median(timings)
+        print(
+            f"{len(response['Blocks']):7d} blocks: median {median * 1000:8.2f} ms  "
+            f"({median / len(response['Blocks']) * 1e6:5.2f} us/block)  "
+            f"tables {len(parsed['tables'])}  forms {len(parsed['forms'])}  boxes {len(parsed['bounding_boxes'])}"
+        )
+
+
+if __name__ == "__main__":
+    main()
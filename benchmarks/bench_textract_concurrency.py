@@ -0,0 +1,55 @@
+"""Serial versus adaptive-concurrency page analysis against a local fake Textract.
+
+    python -m benchmarks.bench_textract_concurrency [pages] [latency_ms] [capacity]
+
+The fake rejects calls beyond `capacity` in flight with ThrottlingException,
+so the concurrent run shows the AIMD window settling under the quota. The
+response cache and the shared rate limiter are switched off: with the cache on,
+the second pass would be answered from the first pass's responses, and the
+TEXTRACT_TPS bucket would throttle both passes before the fake's capacity does.
+"""
+import sys
+import time
+
+from app.core.config import settings
+from app.services.stubs.textract_stub import FakeTextractClient
+from app.services.textract.adaptive_limiter import AdaptiveConcurrencyLimiter
+from app.services.textract.textract_client import TextractClient
+
+
+def run(pages: int, latency_ms: float, capacity: int, max_concurrency: int):
+    settings.TEXTRACT_CACHE_ENABLED = False
+    settings.RATE_LIMIT_ENABLED = False
+    fake = FakeTextractClient(latency_ms=latency_ms, capacity=capacity, seed=7)
+    limiter = AdaptiveConcurrencyLimiter(
+        initial=min(settings.TEXTRACT_INITIAL_CONCURRENCY, max_concurrency),
+        minimum=settings.TEXTRACT_MIN_CONCURRENCY,
+        maximum=max_concurrency
+    )
+    client = TextractClient(client=fake, limiter=limiter)
+
+    start = time.perf_counter()
+    results = client.analyze_document_batch([b'x' * page for page in range(1, pages + 1)], max_concurrency=max_concurrency)
+    elapsed = time.perf_counter() - start
+
+    in_order = [result['page_number'] for result in results] == list(range(1, pages + 1))
+    failed = sum(1 for result in results if result['status'] != 'success')
+    return elapsed, fake, limiter.stats(), in_order, failed
+
+
+def main():
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    latency_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 200
+    capacity = int(sys.argv[3]) if len(sys.argv) > 3 else 6
+
+    for label, max_concurrency in (("serial", 1), ("adaptive", settings.TEXTRACT_MAX_CONCURRENCY * 2)):
+        elapsed, fake, stats, in_order, failed = run(pages, latency_ms, capacity, max_concurrency)
+        print(
+            f"{label:>9}: {elapsed:7.2f} s  calls {fake.calls:4d}  throttled {fake.throttled:3d}  "
+            f"peak in flight {fake.peak_in_flight:2d}  final limit {stats['limit']:2d}  "
+            f"failed {failed}  ordered {in_order}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import os
+import tempfile
+
+# Settings are read once at import, so the test environment has to be in place
+# before anything under app/ is imported.
+_STATE_DIR = tempfile.mkdtemp(prefix="lanidrac-tests-")
+os.environ.update({
+    "DATABASE_URL": "sqlite://",
+    "SERVICE_BACKEND": "synthetic",
+    "STUB_DIR": os.path.join(_STATE_DIR, "stubs"),
+    "STUB_SEED": "0",
+    "STUB_REPLAY_FALLBACK": "false",
+    "TEXTRACT_STUB_LATENCY_MS": "0",
+    "TEXTRACT_STUB_JITTER_MS": "0",
+    "GEMINI_STUB_LATENCY_MS": "0",
+    "GEMINI_STUB_JITTER_MS": "0",
+    "S3_STUB_LATENCY_MS": "0",
+    "S3_STUB_JITTER_MS": "0",
+    "S3_BUCKET_NAME": "lanidrac-test",
+    "UPLOAD_DIR": os.path.join(_STATE_DIR, "uploads"),
+    "RATE_LIMIT_DIR": os.path.join(_STATE_DIR, "ratelimit"),
+    "PAGE_CACHE_ENABLED": "false",
+    "TEXTRACT_CACHE_ENABLED": "false",
+    "SOURCE_CACHE_ENABLED": "false",
+    "TEXTRACT_ASYNC_POLL_SECONDS": "0.01",
+    "TEXTRACT_RETRY_BASE_SECONDS": "0",
+})
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.config import settings
+from app.core.database import Base
+from app.services.aws_clients import get_s3_client, reset_clients
+import app.models  # noqa: F401 - registers the tables on Base
+
+@compiles(UUID, "sqlite")
+def _uuid_on_sqlite(type_, compiler, **kwargs):
+    return "CHAR(36)"
+
+@pytest.fixture
+def stub_dir(tmp_path, monkeypatch):
+    """Fresh stub state (local S3 objects, recordings) for each test"""
+    monkeypatch.setattr(settings, "STUB_DIR", str(tmp_path / "stubs"))
+    reset_clients()
+    yield tmp_path / "stubs"
+    reset_clients()
+
+@pytest.fixture
+def s3_client(stub_dir):
+    return get_s3_client()
+
+@pytest.fixture
+def db_factory():
+    """Sessions sharing one in-memory database, so a test can act as a second request"""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+    yield factory
+    engine.dispose()
+
+@pytest.fixture
+def db(db_factory):
+    session = db_factory()
+    yield session
+    session.close()
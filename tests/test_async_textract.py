@@ -0,0 +1,95 @@
+import json
+
+import pytest
+
+from app.core.config import settings
+from app.services.stubs import backends
+from app.services.stubs.textract_stub import FakeTextractClient
+from app.services.textract import textract_client as textract_module
+from app.services.textract.textract_client import TextractClient, NOTIFICATION_MAX_RECEIVES
+
+THREE_PAGE_PDF = b"%PDF-1.4\n" + b"".join(b"<< /Type /Page >>\n" for _ in range(3)) + b"<< /Type /Pages >>\n"
+
+class FakeSQS:
+    """Hands out one batch of messages and records what the waiter does with each"""
+
+    def __init__(self, messages):
+        self.messages = messages
+        self.deleted = []
+        self.released = []
+
+    def receive_message(self, **kwargs):
+        messages, self.messages = self.messages, []
+        return {'Messages': messages}
+
+    def delete_message(self, QueueUrl, ReceiptHandle):
+        self.deleted.append(ReceiptHandle)
+
+    def change_message_visibility(self, QueueUrl, ReceiptHandle, VisibilityTimeout):
+        self.released.append((ReceiptHandle, VisibilityTimeout))
+
+def _notification(handle: str, job_id: str, receives: int = 1) -> dict:
+    body = {'Message': json.dumps({'JobId': job_id, 'Status': 'SUCCEEDED'})}
+    return {'ReceiptHandle': handle, 'Body': json.dumps(body), 'Attributes': {'ApproximateReceiveCount': str(receives)}}
+
+def test_stored_document_is_polled_until_done_and_split_per_page(s3_client, monkeypatch):
+    monkeypatch.setattr(settings, "TEXTRACT_SQS_QUEUE_URL", "")
+    s3_client.put_object(Bucket=settings.S3_BUCKET_NAME, Key="docs/scan.pdf", Body=THREE_PAGE_PDF)
+    stub = FakeTextractClient(
+        latency_ms=0, jitter_ms=0, seed=0, async_job_ms=50, async_page_size=5,
+        object_reader=backends._read_stored_object
+    )
+    statuses = []
+    get_document_analysis = stub.get_document_analysis
+
+    def recording_get(**kwargs):
+        response = get_document_analysis(**kwargs)
+        statuses.append(response['JobStatus'])
+        return response
+
+    monkeypatch.setattr(stub, "get_document_analysis", recording_get)
+
+    pages = TextractClient(client=stub).analyze_stored_document(settings.S3_BUCKET_NAME, "docs/scan.pdf")
+
+    assert statuses[0] == 'IN_PROGRESS'
+    assert statuses.count('SUCCEEDED') > 1  # results span several NextToken pages
+    assert [page['page_number'] for page in pages] == [1, 2, 3]
+    assert all(page['status'] == 'success' for page in pages)
+    for page in pages:
+        assert {block['Page'] for block in page['response']['Blocks']} == {page['page_number']}
+
+@pytest.fixture
+def sqs(monkeypatch):
+    def install(messages):
+        fake = FakeSQS(messages)
+        monkeypatch.setattr(textract_module, "get_sqs_client", lambda: fake)
+        return fake
+    monkeypatch.setattr(settings, "TEXTRACT_SQS_QUEUE_URL", "https://sqs.test/queue")
+    return install
+
+def test_notification_for_this_job_is_deleted(sqs):
+    fake = sqs([_notification("ours", "job-1")])
+
+    TextractClient(client=FakeTextractClient(latency_ms=0))._wait_for_notification("job-1", 1)
+
+    assert fake.deleted == ["ours"]
+    assert fake.released == []
+
+def test_other_jobs_notifications_are_released_immediately(sqs):
+    fake = sqs([_notification("theirs", "job-2")])
+
+    TextractClient(client=FakeTextractClient(latency_ms=0))._wait_for_notification("job-1", 1)
+
+    assert fake.deleted == []
+    assert fake.released == [("theirs", 0)]
+
+def test_stale_and_unreadable_notifications_are_dropped(sqs):
+    fake = sqs([
+        _notification("stale", "job-2", receives=NOTIFICATION_MAX_RECEIVES),
+        {'ReceiptHandle': "garbage", 'Body': "not json"}
+    ])
+
+    TextractClient(client=FakeTextractClient(latency_ms=0))._wait_for_notification("job-1", 1)
+
+    assert sorted(fake.deleted) == ["garbage", "stale"]
+    assert fake.released == []
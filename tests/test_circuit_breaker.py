@@ -0,0 +1,127 @@
+import time
+
+import pytest
+
+from app.core.config import settings
+from app.services.aws_clients import get_textract_client, reset_clients
+from app.services.circuit_breaker import CircuitBreaker, CircuitOpenError, CLOSED, OPEN, HALF_OPEN
+from app.services.deadline import Deadline, DeadlineExceeded
+
+class UpstreamDown(Exception):
+    pass
+
+class Throttled(Exception):
+    pass
+
+def _breaker(**kwargs) -> CircuitBreaker:
+    options = {'failure_rate': 0.5, 'window_size': 4, 'min_calls': 4, 'open_seconds': 0.05, 'half_open_calls': 1}
+    options.update(kwargs)
+    return CircuitBreaker("test", **options)
+
+def _call(breaker: CircuitBreaker, error=None) -> None:
+    try:
+        with breaker.guard(failures=(UpstreamDown,), ignore=(Throttled,)):
+            if error:
+                raise error
+    except (UpstreamDown, Throttled):
+        pass
+
+def test_opens_only_after_min_calls_at_the_failure_rate():
+    breaker = _breaker()
+    for error in (UpstreamDown(), UpstreamDown(), UpstreamDown()):
+        _call(breaker, error)
+    assert breaker.state == CLOSED  # three calls are below min_calls
+
+    _call(breaker, UpstreamDown())
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+    assert breaker.stats()["rejected"] == 1
+
+def test_successes_keep_it_closed():
+    breaker = _breaker()
+    for error in (UpstreamDown(), None, None, None, UpstreamDown(), None):
+        _call(breaker, error)
+    assert breaker.state == CLOSED
+
+def test_half_open_probe_closes_on_success():
+    breaker = _breaker(min_calls=1, window_size=1)
+    _call(breaker, UpstreamDown())
+    assert breaker.state == OPEN
+
+    time.sleep(0.06)
+    assert breaker.state == HALF_OPEN
+    breaker.allow()
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()  # only one probe at a time
+    breaker.record_success()
+    assert breaker.state == CLOSED
+
+def test_half_open_probe_reopens_on_failure():
+    breaker = _breaker(min_calls=1, window_size=1)
+    _call(breaker, UpstreamDown())
+    time.sleep(0.06)
+
+    _call(breaker, UpstreamDown())
+
+    assert breaker.state == OPEN
+    assert breaker.stats()["opened"] == 2
+
+def test_ignored_errors_neither_count_nor_use_up_the_probe():
+    breaker = _breaker(min_calls=1, window_size=1)
+    for _ in range(5):
+        _call(breaker, Throttled())
+    assert breaker.state == CLOSED
+
+    _call(breaker, UpstreamDown())
+    time.sleep(0.06)
+    _call(breaker, Throttled())
+    assert breaker.state == HALF_OPEN
+    _call(breaker)
+    assert breaker.state == CLOSED
+
+def test_other_errors_count_as_success():
+    breaker = _breaker(min_calls=1, window_size=1)
+    _call(breaker, UpstreamDown())
+    time.sleep(0.06)
+
+    with pytest.raises(ValueError):
+        with breaker.guard(failures=(UpstreamDown,)):
+            raise ValueError("bad input")
+    assert breaker.state == CLOSED
+
+def test_deadline_timeout_shrinks_to_the_time_left():
+    deadline = Deadline(0.2)
+
+    assert deadline.timeout(30, "call") <= 0.2
+    assert deadline.timeout(0.05, "call") == 0.05
+    assert Deadline(None).timeout(30, "call") == 30
+    assert Deadline(None).remaining() is None
+
+def test_deadline_timeout_raises_once_expired():
+    deadline = Deadline(0.01)
+    time.sleep(0.02)
+
+    assert deadline.expired
+    with pytest.raises(DeadlineExceeded, match="before upload"):
+        deadline.timeout(30, "upload")
+
+@pytest.fixture
+def live_textract(monkeypatch):
+    # Building a boto3 client needs no network, only credentials and a region.
+    monkeypatch.setattr(settings, "TEXTRACT_BACKEND", "live")
+    monkeypatch.setattr(settings, "AWS_ACCESS_KEY_ID", "test")
+    monkeypatch.setattr(settings, "AWS_SECRET_ACCESS_KEY", "test")
+    monkeypatch.setattr(settings, "TEXTRACT_READ_TIMEOUT_SECONDS", 30)
+    reset_clients()
+    yield
+    reset_clients()
+
+def test_textract_read_timeout_is_capped_by_the_time_left(live_textract):
+    shared = get_textract_client()
+
+    assert shared.meta.config.read_timeout == 30
+    assert get_textract_client(read_timeout=60) is shared
+    assert get_textract_client(read_timeout=7.5).meta.config.read_timeout == 5
+    assert get_textract_client(read_timeout=0.3).meta.config.read_timeout == 1
+    assert get_textract_client(read_timeout=9) is get_textract_client(read_timeout=5)
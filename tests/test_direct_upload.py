@@ -0,0 +1,107 @@
+import base64
+import json
+
+import boto3
+import pytest
+from fastapi import HTTPException
+
+from app.core.config import settings, MAX_FILE_SIZE_BYTES
+from app.models import Document
+from app.schemas import UploadUrlRequest
+from app.services.s3_service import S3Service
+from app.services.upload_service import UploadService
+from app.utils.file_utils import generate_job_id
+
+PDF = b"%PDF-1.4\n" + b"body" * 256
+
+def _put_upload(s3_client, job_id: str, data: bytes, content_type: str = "application/pdf") -> str:
+    """What the browser's presigned POST leaves in the bucket"""
+    key = f"uploads/user-1/{job_id}/20260101_000000_abcd1234.pdf"
+    s3_client.put_object(
+        Bucket=settings.S3_BUCKET_NAME, Key=key, Body=data,
+        ContentType=content_type, Metadata={"original-filename": "scan.pdf"}
+    )
+    return key
+
+def _exists(s3_client, key: str) -> bool:
+    return bool(s3_client.list_objects_v2(Bucket=settings.S3_BUCKET_NAME, Prefix=key).get("Contents"))
+
+def test_presigned_post_policy_caps_the_size(monkeypatch):
+    # Signing is local, so a real client with dummy credentials shows the policy S3 would enforce.
+    client = boto3.client(
+        "s3", region_name="eu-north-1", aws_access_key_id="test", aws_secret_access_key="test"
+    )
+    service = S3Service()
+    monkeypatch.setattr(service, "s3_client", client)
+
+    presigned = service.generate_presigned_upload_post(
+        "uploads/user-1/job/file.pdf", "application/pdf", {"original-filename": "scan.pdf"}, MAX_FILE_SIZE_BYTES
+    )
+
+    policy = json.loads(base64.b64decode(presigned["fields"]["policy"]))
+    assert ["content-length-range", 1, MAX_FILE_SIZE_BYTES] in policy["conditions"]
+    assert {"Content-Type": "application/pdf"} in policy["conditions"]
+    assert presigned["fields"]["x-amz-meta-original-filename"] == "scan.pdf"
+
+def test_upload_url_returns_post_fields(db, s3_client):
+    request = UploadUrlRequest(filename="scan.pdf", content_type="application/pdf", file_size_bytes=len(PDF))
+
+    response = UploadService(db).create_upload_url(request, "user-1")
+
+    assert response.method == "POST"
+    assert response.fields["key"].startswith(f"uploads/user-1/{response.job_id}/")
+    assert response.fields["Content-Type"] == "application/pdf"
+
+def test_complete_upload_registers_the_document_once(db, s3_client):
+    job_id = generate_job_id()
+    _put_upload(s3_client, job_id, PDF)
+
+    response = UploadService(db).complete_upload(job_id, "user-1")
+
+    assert response.file_size_bytes == len(PDF)
+    assert response.filename == "scan.pdf"
+    with pytest.raises(HTTPException) as error:
+        UploadService(db).complete_upload(job_id, "user-1")
+    assert error.value.status_code == 409
+
+@pytest.mark.parametrize("data, status", [
+    (b"", 400),
+    (b"\x89PNG\r\n\x1a\n" + b"pixels", 415),
+    (b"%PDF" + b"\0" * MAX_FILE_SIZE_BYTES, 413),
+])
+def test_complete_upload_rejects_and_deletes_bad_objects(db, s3_client, data, status):
+    job_id = generate_job_id()
+    key = _put_upload(s3_client, job_id, data)
+
+    with pytest.raises(HTTPException) as error:
+        UploadService(db).complete_upload(job_id, "user-1")
+
+    assert error.value.status_code == status
+    assert not _exists(s3_client, key)
+    assert db.query(Document).count() == 0
+
+def test_concurrent_completion_gets_409_and_keeps_the_object(db, db_factory, s3_client, monkeypatch):
+    job_id = generate_job_id()
+    key = _put_upload(s3_client, job_id, PDF)
+    commit = db.commit
+
+    def racing_commit():
+        # Another request completes the same upload between our check and our insert.
+        other = db_factory()
+        other.add(Document(
+            job_id=job_id, user_id="user-1", filename="other.pdf", original_filename="scan.pdf",
+            file_path="https://example/other.pdf", file_size_bytes=len(PDF), mime_type="application/pdf"
+        ))
+        other.commit()
+        other.close()
+        monkeypatch.setattr(db, "commit", commit)
+        commit()
+
+    monkeypatch.setattr(db, "commit", racing_commit)
+
+    with pytest.raises(HTTPException) as error:
+        UploadService(db).complete_upload(job_id, "user-1")
+
+    assert error.value.status_code == 409
+    assert _exists(s3_client, key)
+    assert db.query(Document).filter(Document.job_id == job_id).count() == 1
@@ -0,0 +1,109 @@
+import os
+import time
+
+import pytest
+
+from app.utils import disk_cache
+from app.utils.disk_cache import DiskLRUCache
+
+def _age(cache: DiskLRUCache, key: str, seconds_ago: float) -> None:
+    """Backdates an entry so recency does not hinge on filesystem timestamp resolution"""
+    stamp = time.time() - seconds_ago
+    os.utime(cache._path(cache._filename(key)), (stamp, stamp))
+
+def test_least_recently_used_entries_are_evicted_first(tmp_path):
+    cache = DiskLRUCache(str(tmp_path), max_bytes=300)
+    for age, key in ((30, "a"), (20, "b"), (10, "c")):
+        cache.set(key, b"x" * 100)
+        _age(cache, key, age)
+
+    assert cache.get("a") is not None  # now the most recent
+    cache.set("d", b"x" * 100)
+
+    assert [key for key in "abcd" if cache.get(key) is not None] == ["a", "d"]
+    assert cache.stats()["size_bytes"] <= 300
+
+def test_values_larger_than_the_cache_are_not_stored(tmp_path):
+    cache = DiskLRUCache(str(tmp_path), max_bytes=100)
+
+    cache.set("big", b"x" * 101)
+
+    assert cache.get("big") is None
+    assert cache.stats()["entries"] == 0
+
+def test_eviction_counts_other_workers_entries(tmp_path, monkeypatch):
+    monkeypatch.setattr(disk_cache, "INDEX_REFRESH_SECONDS", 0)
+    first = DiskLRUCache(str(tmp_path), max_bytes=300)
+    second = DiskLRUCache(str(tmp_path), max_bytes=300)
+
+    first.set("a", b"x" * 200)
+    _age(first, "a", 10)
+    second.set("b", b"x" * 200)
+
+    # Neither worker wrote more than 300 bytes itself, but together they did.
+    assert first.get("a") is None
+    assert second.get("b") is not None
+
+def test_pinned_file_survives_eviction_until_released(tmp_path):
+    cache = DiskLRUCache(str(tmp_path), max_bytes=350)
+    cache.set("a", b"x" * 200)
+    _age(cache, "a", 30)
+    cache.set("b", b"x" * 100)
+    _age(cache, "b", 20)
+
+    with cache.pinned("a") as path:
+        cache.set("c", b"x" * 100)
+        # The oldest entry is in use, so the next oldest goes instead.
+        assert cache.get("b") is None
+        with open(path, "rb") as f:
+            assert f.read() == b"x" * 200
+
+    cache.set("d", b"x" * 100)
+    assert not os.path.exists(path)
+    assert cache.get("c") is not None and cache.get("d") is not None
+
+def test_pinned_miss_yields_none(tmp_path):
+    cache = DiskLRUCache(str(tmp_path), max_bytes=300)
+
+    with cache.pinned("missing") as path:
+        assert path is None
+    assert cache.stats()["misses"] == 1
+
+def test_put_file_moves_the_file_in(tmp_path):
+    cache = DiskLRUCache(str(tmp_path / "cache"), max_bytes=300)
+    source = tmp_path / "download.tmp"
+    source.write_bytes(b"%PDF" + b"x" * 96)
+
+    with cache.pinned("doc", ".pdf") as missing:
+        assert missing is None
+    cache.put_file("doc", str(source), ".pdf")
+
+    assert not source.exists()
+    with cache.pinned("doc", ".pdf") as path:
+        assert path.endswith(".pdf")
+        assert open(path, "rb").read(4) == b"%PDF"
+
+def test_purge_keeps_pinned_files(tmp_path):
+    cache = DiskLRUCache(str(tmp_path), max_bytes=1000)
+    cache.set("a", b"x" * 10)
+    cache.set("b", b"x" * 10)
+
+    with cache.pinned("a"):
+        assert cache.purge() == 1
+
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+
+def test_stale_temp_files_are_removed_on_start(tmp_path):
+    stale = tmp_path / "ab" / "leftover.tmp"
+    fresh = tmp_path / "ab" / "writing.tmp"
+    stale.parent.mkdir()
+    stale.write_bytes(b"x")
+    fresh.write_bytes(b"x")
+    old = time.time() - disk_cache.STALE_TEMP_SECONDS - 10
+    os.utime(stale, (old, old))
+
+    DiskLRUCache(str(tmp_path), max_bytes=1000)
+
+    assert not stale.exists()
+    assert fresh.exists()
@@ -0,0 +1,70 @@
+import multiprocessing
+import time
+
+import pytest
+
+from app.core.config import settings
+from app.services.rate_limiter import SharedRateLimiter, RateLimitTimeout
+
+@pytest.fixture(autouse=True)
+def rate_limit_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_DIR", str(tmp_path))
+
+def test_concurrency_ceiling_holds_until_release():
+    limiter = SharedRateLimiter("ceiling", rate_per_second=1000, max_concurrent=1, burst=10)
+
+    lease = limiter.acquire()
+    with pytest.raises(RateLimitTimeout):
+        limiter.acquire(max_wait=0)
+    limiter.release(lease)
+
+    with limiter.slot(max_wait=0):
+        pass
+    assert limiter.stats()["timeouts"] == 1
+
+def test_a_lease_that_is_never_released_expires(monkeypatch):
+    # A worker that crashes mid-call never releases; its slot frees itself after the lease time.
+    monkeypatch.setattr(settings, "RATE_LIMIT_LEASE_SECONDS", 0.1)
+    limiter = SharedRateLimiter("lease", rate_per_second=1000, max_concurrent=1, burst=10)
+
+    limiter.acquire()
+    with pytest.raises(RateLimitTimeout):
+        limiter.acquire(max_wait=0)
+
+    time.sleep(0.15)
+    limiter.acquire(max_wait=0)
+
+def test_tokens_refill_at_the_configured_rate():
+    limiter = SharedRateLimiter("refill", rate_per_second=20, max_concurrent=10, burst=2)
+
+    start = time.monotonic()
+    for _ in range(6):
+        with limiter.slot(max_wait=5):
+            pass
+    elapsed = time.monotonic() - start
+
+    # Two come from the burst, the other four at 20/s.
+    assert 0.15 <= elapsed < 1.0
+    assert limiter.stats()["waited"] >= 3
+
+def _take_tokens(directory: str, count: int, results) -> None:
+    settings.RATE_LIMIT_DIR = directory
+    limiter = SharedRateLimiter("shared", rate_per_second=20, max_concurrent=10, burst=1)
+    for _ in range(count):
+        with limiter.slot(max_wait=10):
+            results.put(time.monotonic())
+
+def test_worker_processes_draw_from_one_bucket(tmp_path):
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    workers = [context.Process(target=_take_tokens, args=(str(tmp_path), 4, results)) for _ in range(3)]
+
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=30)
+
+    assert all(worker.exitcode == 0 for worker in workers)
+    granted = sorted(results.get(timeout=1) for _ in range(12))
+    # Separate buckets would grant all twelve within about 3/20 s; one shared bucket needs about 11/20 s.
+    assert granted[-1] - granted[0] >= 0.5
@@ -0,0 +1,30 @@
+import uuid
+
+from app.core.config import settings
+from app.services.stubs import backends
+from app.services.stubs.textract_stub import FakeTextractClient
+from app.services.textract.textract_client import TextractClient
+
+TWO_PAGE_PDF = b"%PDF-1.4\n<< /Type /Page >>\n<< /Type /Page >>\n"
+
+def _store_upload(s3_client) -> str:
+    # Every upload lands under a fresh job UUID, so the recorded and replayed keys differ.
+    key = f"uploads/user-1/{uuid.uuid4()}/scan.pdf"
+    s3_client.put_object(Bucket=settings.S3_BUCKET_NAME, Key=key, Body=TWO_PAGE_PDF)
+    return key
+
+def test_async_job_recorded_once_replays_for_a_new_upload(s3_client):
+    live = FakeTextractClient(
+        latency_ms=0, jitter_ms=0, seed=1, async_job_ms=0, object_reader=backends._read_stored_object
+    )
+    recording = backends._build('textract', 'record', lambda: live)
+    recorded = TextractClient(client=recording).analyze_stored_document(settings.S3_BUCKET_NAME, _store_upload(s3_client))
+
+    backends.reset_backends()
+    replaying = backends._build('textract', 'replay', lambda: None)
+    replayed = TextractClient(client=replaying).analyze_stored_document(settings.S3_BUCKET_NAME, _store_upload(s3_client))
+
+    assert [page['response'] for page in replayed] == [page['response'] for page in recorded]
+    stats = backends._store('textract').stats()
+    assert stats['misses'] == 0
+    assert stats['hits'] == 2  # start + one result page
@@ -0,0 +1,130 @@
+import random
+
+import pytest
+
+from app.services.textract.response_parser import TextractResponseParser
+from benchmarks.bench_response_parser import synthetic_response
+
+def _reference_parse(response: dict, feature_types=None) -> dict:
+    """The parser as it was before the single-pass index: every section rescans all blocks"""
+    blocks = response.get('Blocks', [])
+    block_map = {block['Id']: block for block in blocks}
+
+    def get_text(block_id):
+        block = block_map.get(block_id)
+        if block is None:
+            return ""
+        if 'Text' in block:
+            return block['Text']
+        words = []
+        for relationship in block.get('Relationships', []):
+            if relationship['Type'] == 'CHILD':
+                for child_id in relationship['Ids']:
+                    child = block_map.get(child_id)
+                    if child and child.get('BlockType') == 'WORD':
+                        words.append(child.get('Text', ''))
+        return ' '.join(words)
+
+    def bbox(block):
+        return block.get('Geometry', {}).get('BoundingBox', {})
+
+    tables = []
+    for table in [block for block in blocks if block.get('BlockType') == 'TABLE']:
+        table_data = {'id': table['Id'], 'confidence': table.get('Confidence', 0), 'rows': [], 'bbox': bbox(table)}
+        row_map = {}
+        for relationship in table.get('Relationships', []):
+            if relationship['Type'] == 'CHILD':
+                for cell_id in relationship['Ids']:
+                    cell = block_map.get(cell_id)
+                    if cell and cell.get('BlockType') == 'CELL':
+                        row_map.setdefault(cell.get('RowIndex', 1), {})[cell.get('ColumnIndex', 1)] = {
+                            'text': get_text(cell['Id']),
+                            'confidence': cell.get('Confidence', 0),
+                            'row_span': cell.get('RowSpan', 1),
+                            'col_span': cell.get('ColumnSpan', 1)
+                        }
+        for row_index in sorted(row_map):
+            table_data['rows'].append([row_map[row_index][column] for column in sorted(row_map[row_index])])
+        tables.append(table_data)
+
+    forms = []
+    for key in [b for b in blocks if b.get('BlockType') == 'KEY_VALUE_SET' and 'KEY' in b.get('EntityTypes', [])]:
+        value_text = ""
+        for relationship in key.get('Relationships', []):
+            if relationship['Type'] == 'VALUE':
+                for value_id in relationship['Ids']:
+                    value_text = get_text(value_id)
+        forms.append({'key': get_text(key['Id']), 'value': value_text, 'confidence': key.get('Confidence', 0), 'bbox': bbox(key)})
+
+    checkboxes = [
+        {'id': b['Id'], 'status': b.get('SelectionStatus', 'NOT_SELECTED'), 'confidence': b.get('Confidence', 0), 'bbox': bbox(b)}
+        for b in blocks if b.get('BlockType') == 'SELECTION_ELEMENT'
+    ]
+
+    lines = sorted(
+        [block for block in blocks if block.get('BlockType') == 'LINE'],
+        key=lambda block: (bbox(block).get('Top', 0), bbox(block).get('Left', 0))
+    )
+    boxed = ['LINE', 'WORD', 'TABLE', 'CELL', 'KEY_VALUE_SET', 'SELECTION_ELEMENT']
+
+    def requested(*features):
+        return feature_types is None or any(feature in feature_types for feature in features)
+
+    return {
+        'text': '\n'.join(line['Text'] for line in lines if 'Text' in line),
+        'tables': tables if requested('TABLES') else [],
+        'forms': forms if requested('FORMS') else [],
+        'checkboxes': checkboxes if requested('TABLES', 'FORMS') else [],
+        'bounding_boxes': [
+            {'id': b['Id'], 'type': b['BlockType'], 'text': b.get('Text', ''), 'confidence': b.get('Confidence', 0), 'bbox': bbox(b)}
+            for b in blocks if b.get('BlockType') in boxed
+        ],
+        'document_metadata': response.get('DocumentMetadata', {}),
+        'feature_types': feature_types
+    }
+
+def _messy_response(seed: int) -> dict:
+    """Random blocks with the irregularities real responses have: shared ids, dangling links, missing fields"""
+    rng = random.Random(seed)
+    ids = [f"b{index}" for index in range(rng.randint(5, 80))]
+    block_types = ['PAGE', 'LINE', 'WORD', 'WORD', 'TABLE', 'CELL', 'KEY_VALUE_SET', 'SELECTION_ELEMENT', 'MERGED_CELL']
+    blocks = []
+    for _ in range(len(ids) + rng.randint(0, 5)):
+        block = {'Id': rng.choice(ids), 'BlockType': rng.choice(block_types)}
+        if rng.random() < 0.8:
+            block['Geometry'] = {'BoundingBox': {'Top': rng.random(), 'Left': rng.random(), 'Width': 0.1, 'Height': 0.02}}
+        if rng.random() < 0.7:
+            block['Text'] = f"text{rng.randint(0, 9)}"
+        if rng.random() < 0.7:
+            block['Confidence'] = rng.uniform(50, 100)
+        if block['BlockType'] == 'CELL':
+            block.update({'RowIndex': rng.randint(1, 3), 'ColumnIndex': rng.randint(1, 3)})
+        if block['BlockType'] == 'KEY_VALUE_SET':
+            block['EntityTypes'] = [rng.choice(['KEY', 'VALUE'])]
+        if block['BlockType'] == 'SELECTION_ELEMENT' and rng.random() < 0.5:
+            block['SelectionStatus'] = 'SELECTED'
+        if rng.random() < 0.6:
+            block['Relationships'] = [
+                {'Type': rng.choice(['CHILD', 'VALUE']), 'Ids': rng.sample(ids + ['missing'], rng.randint(0, 4))}
+                for _ in range(rng.randint(1, 3))
+            ]
+        blocks.append(block)
+    return {'Blocks': blocks, 'DocumentMetadata': {'Pages': 1}}
+
+FEATURE_TIERS = [None, [], ['TABLES'], ['FORMS'], ['TABLES', 'FORMS', 'SIGNATURES']]
+
+@pytest.mark.parametrize("feature_types", FEATURE_TIERS)
+def test_matches_the_reference_on_synthetic_pages(feature_types):
+    response = synthetic_response(2000)
+
+    assert TextractResponseParser(response, feature_types).parse() == _reference_parse(response, feature_types)
+
+@pytest.mark.parametrize("seed", range(200))
+def test_matches_the_reference_on_irregular_responses(seed):
+    response = _messy_response(seed)
+    feature_types = FEATURE_TIERS[seed % len(FEATURE_TIERS)]
+
+    assert TextractResponseParser(response, feature_types).parse() == _reference_parse(response, feature_types)
+
+def test_empty_response():
+    assert TextractResponseParser({}).parse() == _reference_parse({})
@@ -0,0 +1,107 @@
+import random
+
+import numpy as np
+import pytest
+
+from app.services.markdown.utils.spatial_index import SpatialIndex
+from app.services.textract.geometry_store import GeometryStore
+
+def _coordinate(rng: random.Random) -> float:
+    """Mostly uniform, with some values exactly on grid edges and some off the page"""
+    roll = rng.random()
+    if roll < 0.3:
+        return rng.randint(0, 20) * 0.05
+    if roll < 0.4:
+        return rng.uniform(-0.2, 1.2)
+    return rng.random()
+
+def _page(seed: int) -> list:
+    rng = random.Random(seed)
+    blocks = []
+    for index in range(rng.randint(0, 300)):
+        block = {'id': f"b{index}", 'type': rng.choice(['LINE', 'LINE', 'WORD']), 'text': rng.choice(['', 'text'])}
+        if rng.random() < 0.9:
+            block['bbox'] = {
+                'Left': _coordinate(rng), 'Top': _coordinate(rng),
+                'Width': rng.uniform(0, 0.4), 'Height': rng.uniform(0, 0.05)
+            }
+        blocks.append(block)
+    return blocks
+
+class BruteForce:
+    """Checks every indexed block in response order: the reference the grid must agree with"""
+
+    def __init__(self, geometry: GeometryStore, indices: np.ndarray):
+        self.rows = [int(index) for index in indices]
+        self.lefts = geometry.column('left', indices=indices).tolist()
+        self.tops = geometry.column('top', indices=indices).tolist()
+        self.widths = geometry.column('width', indices=indices).tolist()
+        self.heights = geometry.column('height', indices=indices).tolist()
+
+    def _closest(self, candidates):
+        return self.rows[min(candidates)[1]] if candidates else None
+
+    def nearest_right(self, left, top, max_dx, max_dy):
+        return self._closest([
+            (abs(self.lefts[p] - left), p) for p in range(len(self.rows))
+            if abs(self.tops[p] - top) < max_dy and self.lefts[p] > left and self.lefts[p] - left < max_dx
+        ])
+
+    def nearest_above(self, left, top, max_dy, max_dx):
+        return self._closest([
+            (top - self.tops[p], p) for p in range(len(self.rows))
+            if self.tops[p] < top and top - self.tops[p] < max_dy and abs(self.lefts[p] - left) < max_dx
+        ])
+
+    def region(self, left, top, right, bottom):
+        return [
+            self.rows[p] for p in range(len(self.rows))
+            if left <= self.lefts[p] <= right and top <= self.tops[p] <= bottom
+        ]
+
+    def overlapping(self, bbox):
+        left, top = bbox['Left'], bbox['Top']
+        right, bottom = left + bbox['Width'], top + bbox['Height']
+        return [
+            self.rows[p] for p in range(len(self.rows))
+            if self.lefts[p] < right and self.lefts[p] + self.widths[p] > left
+            and self.tops[p] < bottom and self.tops[p] + self.heights[p] > top
+        ]
+
+@pytest.mark.parametrize("cell_size", [0.05, 0.013, 0.3, 1.0])
+@pytest.mark.parametrize("seed", range(25))
+def test_queries_match_a_brute_force_scan(seed, cell_size):
+    geometry = GeometryStore.from_blocks(_page(seed))
+    indices = geometry.select('LINE', non_empty=True)
+    index = SpatialIndex(geometry, indices, cell_size)
+    reference = BruteForce(geometry, indices)
+    rng = random.Random(seed + 1000)
+
+    assert len(index) == len(indices)
+    for _ in range(50):
+        left, top = _coordinate(rng), _coordinate(rng)
+        max_dx, max_dy = rng.uniform(0, 0.6), rng.uniform(0, 0.1)
+        right, bottom = left + rng.uniform(0, 0.5), top + rng.uniform(0, 0.5)
+        bbox = {'Left': left, 'Top': top, 'Width': right - left, 'Height': bottom - top}
+
+        assert index.nearest_right(left, top, max_dx, max_dy) == reference.nearest_right(left, top, max_dx, max_dy)
+        assert index.nearest_above(left, top, max_dy, max_dx) == reference.nearest_above(left, top, max_dy, max_dx)
+        assert index.region(left, top, right, bottom) == reference.region(left, top, right, bottom)
+        assert index.overlapping(bbox) == reference.overlapping(bbox)
+
+def test_distance_ties_go_to_the_earlier_block():
+    blocks = [
+        {'type': 'LINE', 'text': 'late', 'bbox': {'Left': 0.5, 'Top': 0.51, 'Width': 0.1, 'Height': 0.02}},
+        {'type': 'LINE', 'text': 'early', 'bbox': {'Left': 0.5, 'Top': 0.49, 'Width': 0.1, 'Height': 0.02}},
+    ]
+    index = SpatialIndex.for_lines(GeometryStore.from_blocks(blocks))
+
+    assert index.nearest_right(0.4, 0.5, 0.2, 0.05) == 0
+
+def test_empty_page():
+    index = SpatialIndex.for_lines(GeometryStore.from_blocks([]))
+
+    assert len(index) == 0
+    assert index.nearest_right(0.1, 0.1, 1, 1) is None
+    assert index.region(0, 0, 1, 1) == []
+    assert index.overlapping({'Left': 0, 'Top': 0, 'Width': 1, 'Height': 1}) == []
@@ -0,0 +1,203 @@
+import pytest
+from botocore.exceptions import ClientError
+from PIL import Image, ImageDraw
+
+from app.core.config import settings
+from app.models import Document, DocumentPage
+from app.services.deadline import Deadline
+from app.services.stubs.textract_stub import FakeTextractClient
+from app.services.textract.document_processor import DocumentProcessor
+from app.services.textract.textract_client import TextractClient
+from app.services.textract_service import TextractService
+
+class FailingTextract(FakeTextractClient):
+    """Stub Textract that answers InternalServerError for the given page images"""
+
+    def __init__(self, failing_pages=(), **kwargs):
+        super().__init__(latency_ms=0, jitter_ms=0, seed=0, **kwargs)
+        self.failing_pages = set(failing_pages)
+        self.analyzed = []
+
+    def _maybe_fail(self, image_bytes: bytes) -> None:
+        self.analyzed.append(image_bytes)
+        if image_bytes in self.failing_pages:
+            raise ClientError({'Error': {'Code': 'InternalServerError', 'Message': 'boom'}}, 'AnalyzeDocument')
+
+    def analyze_document(self, Document, FeatureTypes, **kwargs):
+        self._maybe_fail(Document['Bytes'])
+        return super().analyze_document(Document=Document, FeatureTypes=FeatureTypes, **kwargs)
+
+    def detect_document_text(self, Document, **kwargs):
+        self._maybe_fail(Document['Bytes'])
+        return super().detect_document_text(Document=Document, **kwargs)
+
+def _text_page(label: str) -> Image.Image:
+    image = Image.new('L', (1700, 2200), 250)
+    draw = ImageDraw.Draw(image)
+    for line in range(40):
+        draw.text((100, 100 + line * 40), f"{label} line {line} " * 4, fill=0)
+    return image
+
+@pytest.fixture
+def tiff_document(db, tmp_path):
+    """Four-page TIFF: three distinct text pages with a blank third page"""
+    path = str(tmp_path / "scan.tiff")
+    frames = [_text_page("first"), _text_page("second"), Image.new('L', (1700, 2200), 250), _text_page("fourth")]
+    frames[0].save(path, save_all=True, append_images=frames[1:], dpi=(200, 200))
+    document = Document(
+        job_id="JOB_1", user_id="user-1", filename="scan.tiff", original_filename="scan.tiff", file_path=path,
+        file_size_bytes=1, mime_type="image/tiff", status="uploaded"
+    )
+    db.add(document)
+    db.commit()
+    return document
+
+@pytest.fixture(autouse=True)
+def no_retries(monkeypatch):
+    monkeypatch.setattr(settings, "TEXTRACT_PAGE_RETRIES", 0)
+    monkeypatch.setattr(settings, "TEXTRACT_ASYNC_ENABLED", False)
+
+def _page_bytes(document: Document, page_number: int) -> bytes:
+    return DocumentProcessor.get_page(document.file_path, page_number)[0]
+
+def _service(db, stub: FakeTextractClient) -> TextractService:
+    service = TextractService(db)
+    service.textract_client = TextractClient(client=stub)
+    return service
+
+def _page_rows(db, document: Document) -> dict:
+    rows = db.query(DocumentPage).filter(DocumentPage.document_id == document.id).all()
+    return {row.page_number: row.status for row in rows}
+
+def test_failed_page_finishes_partial_and_keeps_the_rest(db, tiff_document):
+    stub = FailingTextract(failing_pages=[_page_bytes(tiff_document, 2)])
+
+    result = _service(db, stub).process_document("JOB_1", "user-1")
+
+    assert result["status"] == "partial"
+    assert [page["page_number"] for page in result["failed_pages"]] == [2]
+    assert tiff_document.status == "partial"
+    assert "page_number': 2" in tiff_document.error_message
+    assert _page_rows(db, tiff_document) == {1: "success", 2: "failed", 3: "blank", 4: "success"}
+    assert "--- Page 2 ---" not in tiff_document.raw_text
+
+def test_resume_redoes_only_unfinished_pages(db, tiff_document):
+    failing = FailingTextract(failing_pages=[_page_bytes(tiff_document, 2)])
+    _service(db, failing).process_document("JOB_1", "user-1")
+
+    healthy = FailingTextract()
+    result = _service(db, healthy).process_document("JOB_1", "user-1", resume=True)
+
+    assert result["status"] == "complete"
+    assert healthy.analyzed == [_page_bytes(tiff_document, 2)]
+    assert result["summary"]["resumed_pages"] == 3
+    assert result["pages_processed"] == 3
+    assert tiff_document.textract_response["blank_pages"] == [3]
+    assert tiff_document.error_message is None
+    assert _page_rows(db, tiff_document) == {}
+
+def test_resume_redoes_pages_from_a_cheaper_tier(db, tiff_document):
+    failing = FailingTextract(failing_pages=[_page_bytes(tiff_document, 2)])
+    _service(db, failing).process_document("JOB_1", "user-1", features="text")
+
+    healthy = FailingTextract()
+    result = _service(db, healthy).process_document("JOB_1", "user-1", features="all", resume=True)
+
+    assert result["status"] == "complete"
+    assert len(healthy.analyzed) == 3  # every non-blank page, not just the one that failed
+    assert result["summary"]["resumed_pages"] == 1
+    assert result["feature_types"] == "TABLES,FORMS,SIGNATURES"
+
+def test_without_resume_a_rerun_starts_over(db, tiff_document):
+    failing = FailingTextract(failing_pages=[_page_bytes(tiff_document, 2)])
+    _service(db, failing).process_document("JOB_1", "user-1")
+
+    healthy = FailingTextract()
+    result = _service(db, healthy).process_document("JOB_1", "user-1")
+
+    assert result["status"] == "complete"
+    assert len(healthy.analyzed) == 3
+    assert result["summary"]["resumed_pages"] == 0
+
+def test_every_page_failing_marks_the_document_failed(db, tiff_document):
+    stub = FailingTextract(failing_pages=[_page_bytes(tiff_document, page) for page in (1, 2, 4)])
+
+    result = _service(db, stub).process_document("JOB_1", "user-1")
+
+    assert result["status"] == "failed"
+    assert tiff_document.status == "failed"
+    assert [page["page_number"] for page in result["failed_pages"]] == [1, 2, 4]
+
+def test_repeated_page_is_analyzed_once(db, tmp_path):
+    path = str(tmp_path / "repeat.tiff")
+    first = _text_page("first")
+    first.save(path, save_all=True, append_images=[_text_page("second"), first.copy()], dpi=(200, 200))
+    document = Document(
+        job_id="JOB_2", user_id="user-1", filename="repeat.tiff", original_filename="repeat.tiff", file_path=path,
+        file_size_bytes=1, mime_type="image/tiff", status="uploaded"
+    )
+    db.add(document)
+    db.commit()
+    stub = FailingTextract()
+
+    scan = _service(db, stub)._analyze_rendered_pages(document, None, ["TABLES"], Deadline(None))
+
+    assert len(stub.analyzed) == 2
+    assert scan['responses'][3]['engine'] == 'duplicate'
+    assert scan['responses'][3]['duplicate_of'] == 1
+    assert scan['responses'][3]['response'] == scan['responses'][1]['response']
+    assert set(scan['fingerprints']) == {'1', '2', '3'}
+
+def test_plan_skips_native_and_finished_pages(db, tiff_document):
+    service = _service(db, FailingTextract())
+    completed = {2: {'status': 'success'}}
+
+    assert service._plan_pages(tiff_document, None, 0, {}, {}) == (None, None)
+    assert service._plan_pages(tiff_document, None, 4, {1: {}}, completed) == ([1, 2, 3, 4], [3, 4])
+    assert service._plan_pages(tiff_document, [2, 3], 0, {}, completed) == ([2, 3], [3])
+
+def _table_page() -> Image.Image:
+    image = _text_page("table")
+    draw = ImageDraw.Draw(image)
+    for row in range(5):
+        draw.line([(200, 1000 + row * 80), (1500, 1000 + row * 80)], fill=0, width=4)
+    for column in range(3):
+        draw.line([(200 + column * 650, 1000), (200 + column * 650, 1320)], fill=0, width=4)
+    return image
+
+@pytest.fixture
+def text_layer_document(db, tmp_path, monkeypatch):
+    """Two pages that both carry a text layer; only the second has a ruled table"""
+    path = str(tmp_path / "digital.tiff")
+    _text_page("plain").save(path, save_all=True, append_images=[_table_page()], dpi=(200, 200))
+    document = Document(
+        job_id="JOB_3", user_id="user-1", filename="digital.tiff", original_filename="digital.tiff", file_path=path,
+        file_size_bytes=1, mime_type="image/tiff", status="uploaded"
+    )
+    db.add(document)
+    db.commit()
+    text_layer = FakeTextractClient(latency_ms=0, jitter_ms=0)
+    native = {page: text_layer.detect_document_text(Document={'Bytes': f"native {page}".encode()}) for page in (1, 2)}
+    monkeypatch.setattr(TextractService, "_extract_native_text", lambda self, document, selected_pages: (native, 2))
+    return document
+
+@pytest.mark.parametrize("features", [None, "all", "auto"])
+def test_text_layer_is_used_where_no_structure_is_detected(db, text_layer_document, features):
+    stub = FailingTextract()
+
+    result = _service(db, stub).process_document("JOB_3", "user-1", features=features)
+
+    assert result["status"] == "complete"
+    assert text_layer_document.textract_response["page_engines"] == {"1": "native", "2": "textract"}
+    assert stub.analyzed == [_page_bytes(text_layer_document, 2)]
+    assert result["summary"]["native_text_pages"] == 1
+
+def test_text_only_run_uses_the_text_layer_without_rendering(db, text_layer_document, monkeypatch):
+    stub = FailingTextract()
+    monkeypatch.setattr(DocumentProcessor, "iter_document_pages", lambda *args, **kwargs: pytest.fail("rendered a page"))
+
+    result = _service(db, stub).process_document("JOB_3", "user-1", features="text")
+
+    assert text_layer_document.textract_response["page_engines"] == {"1": "native", "2": "native"}
+    assert stub.analyzed == []
+    assert result["feature_types"] == "text"
@@ -0,0 +1,83 @@
+import asyncio
+import hashlib
+import io
+import os
+
+import pytest
+from fastapi import HTTPException
+from starlette.datastructures import Headers, UploadFile
+
+from app.core.config import settings, MAX_FILE_SIZE_BYTES, S3_MULTIPART_PART_SIZE_BYTES
+from app.models import Document
+from app.services.upload_service import UploadService
+
+PDF_HEADER = b"%PDF-1.4\n"
+PNG_HEADER = b"\x89PNG\r\n\x1a\n"
+
+def _upload_file(data: bytes, filename: str = "scan.pdf", content_type: str = "application/pdf") -> UploadFile:
+    return UploadFile(io.BytesIO(data), filename=filename, headers=Headers({"content-type": content_type}))
+
+def _upload(db, data: bytes, **kwargs):
+    return asyncio.run(UploadService(db).upload_document(_upload_file(data, **kwargs), "user-1"))
+
+def _stored_keys(stub_dir) -> list:
+    root = os.path.join(stub_dir, "s3", settings.S3_BUCKET_NAME, "objects")
+    return sorted(
+        os.path.relpath(os.path.join(current, name), root)
+        for current, _, names in os.walk(root) for name in names if not name.endswith(".tmp")
+    )
+
+def _open_multipart_uploads(stub_dir) -> list:
+    root = os.path.join(stub_dir, "s3", ".multipart")
+    return os.listdir(root) if os.path.isdir(root) else []
+
+def test_small_upload_streams_to_s3_with_its_hash(db, stub_dir, s3_client):
+    data = PDF_HEADER + b"body" * 1000
+
+    response = _upload(db, data)
+
+    document = db.query(Document).filter(Document.job_id == response.job_id).one()
+    assert document.file_path.startswith("https://")
+    assert document.file_size_bytes == len(data)
+    assert document.content_hash == hashlib.sha256(data).hexdigest()
+    key = _stored_keys(stub_dir)[0]
+    assert s3_client.get_object(Bucket=settings.S3_BUCKET_NAME, Key=key)["Body"].read() == data
+
+def test_large_upload_goes_up_in_parts(db, stub_dir, s3_client):
+    data = PDF_HEADER + os.urandom(S3_MULTIPART_PART_SIZE_BYTES + 1024)
+    assert len(data) <= MAX_FILE_SIZE_BYTES
+
+    response = _upload(db, data)
+
+    document = db.query(Document).filter(Document.job_id == response.job_id).one()
+    assert document.content_hash == hashlib.sha256(data).hexdigest()
+    key = _stored_keys(stub_dir)[0]
+    assert s3_client.get_object(Bucket=settings.S3_BUCKET_NAME, Key=key)["Body"].read() == data
+    assert _open_multipart_uploads(stub_dir) == []
+
+def test_signature_mismatch_is_rejected_before_anything_is_stored(db, stub_dir):
+    with pytest.raises(HTTPException) as error:
+        _upload(db, PNG_HEADER + b"pixels" * 100)
+
+    assert error.value.status_code == 415
+    assert error.value.detail["error"] == "FileContentMismatch"
+    assert _stored_keys(stub_dir) == []
+    assert db.query(Document).count() == 0
+
+def test_empty_upload_is_rejected(db, stub_dir):
+    with pytest.raises(HTTPException) as error:
+        _upload(db, b"")
+
+    assert error.value.status_code == 400
+    assert error.value.detail["error"] == "EmptyFile"
+    assert _stored_keys(stub_dir) == []
+
+def test_oversized_upload_aborts_its_multipart_upload(db, stub_dir):
+    data = PDF_HEADER + b"\0" * MAX_FILE_SIZE_BYTES
+
+    with pytest.raises(HTTPException) as error:
+        _upload(db, data)
+
+    assert error.value.status_code == 413
+    assert _stored_keys(stub_dir) == []
+    assert _open_multipart_uploads(stub_dir) == []